@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build
+
+# 큐브 차원: 필터에 사용되는 컬럼 (연/월/분기/반기는 Period/Year에서 파생되므로 포함됨)
+CUBE_DIMENSIONS = ["Division", "FundsCenter", "Country", "Supplier", "Period/Year"]
+CUBE_METRICS = ["매출수량(M/T)", "1.매출액", "5.영업이익", "8.세전이익"]
+
+# 각 큐브 셀에 집계된 원본 행 수
+ROW_COUNT_COLUMN = "_row_count"
+
+# 셀 수가 원본 행 수의 이 비율을 넘으면 큐브 이점이 없으므로 생성하지 않음
+MAX_CUBE_RATIO = 0.5
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+class AggregateCube:
+    """Division × FundsCenter × Country × Supplier × Period/Year 단위로 미리 합산한 집계 큐브입니다.
+
+    frame은 원본과 같은 차원 컬럼 이름을 가지므로 기존 필터 로직을 그대로 적용할 수 있고,
+    지표 합계는 원본 행을 스캔한 결과와 같습니다.
+    """
+
+    def __init__(self, frame: pd.DataFrame, source_rows: int, build_seconds: float):
+        self.frame = frame
+        self.source_rows = source_rows
+        self.build_seconds = build_seconds
+
+    @property
+    def dimensions(self) -> list:
+        return [col for col in CUBE_DIMENSIONS if col in self.frame.columns]
+
+    @property
+    def metrics(self) -> list:
+        return [col for col in CUBE_METRICS if col in self.frame.columns]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(deep=True).sum())
+
+
+def _build_cube(df: pd.DataFrame):
+    """업로드된 DataFrame으로 집계 큐브를 생성합니다. 이점이 없으면 None을 반환합니다."""
+    dimensions = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    metrics = [col for col in CUBE_METRICS
+               if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+    if not dimensions or not metrics or len(df) == 0:
+        return None
+
+    start = time.perf_counter()
+    # sort=False: 셀 순서를 원본 첫 등장 순서로 유지하여 고유값 순서가 원본과 같도록 함
+    grouped = df.groupby(dimensions, dropna=False, sort=False, observed=True)
+    frame = grouped[metrics].sum()
+    frame[ROW_COUNT_COLUMN] = grouped.size()
+    frame = frame.reset_index()
+
+    if len(frame) > len(df) * MAX_CUBE_RATIO:
+        print(f"집계 큐브 생략: {len(frame):,}개 셀 (원본 {len(df):,}행)")
+        return None
+
+    cube = AggregateCube(frame, len(df), time.perf_counter() - start)
+    print(f"집계 큐브 생성: {len(frame):,}개 셀, {cube.build_seconds:.2f}초")
+    return cube
+
+
+def get_cube(df: pd.DataFrame):
+    """DataFrame의 집계 큐브를 반환합니다. (DataFrame당 1회 생성, 없으면 None)"""
+    return get_or_build(df, "aggregate_cube", _build_cube)
+
+
+def is_cube_frame(frame: pd.DataFrame) -> bool:
+    """집계 큐브 프레임인지 확인합니다."""
+    return ROW_COUNT_COLUMN in frame.columns
+
+
+def resolve_frame(df: pd.DataFrame, metrics: list, filter_columns: list = ()) -> pd.DataFrame:
+    """질의가 큐브로 표현 가능하면 큐브 프레임을, 아니면 원본 DataFrame을 반환합니다."""
+    cube = get_cube(df)
+    expressible = (
+        cube is not None
+        and all(metric in cube.metrics for metric in metrics)
+        and all(col in cube.dimensions for col in filter_columns)
+    )
+    with _stats_lock:
+        _stats["hits" if expressible else "misses"] += 1
+    return cube.frame if expressible else df
+
+
+def count_records(frame: pd.DataFrame, mask: np.ndarray) -> int:
+    """마스크에 해당하는 원본 레코드 수를 반환합니다. (큐브는 셀별 행 수 합계)"""
+    if is_cube_frame(frame):
+        return int(frame[ROW_COUNT_COLUMN].to_numpy()[mask].sum())
+    return int(np.count_nonzero(mask))
+
+
+def cube_stats(df: pd.DataFrame = None) -> dict:
+    """큐브 적중률과 (df가 주어지면) 해당 큐브의 크기/생성 시간을 반환합니다."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    stats = {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+
+    cube = get_cube(df) if df is not None else None
+    if cube is not None:
+        stats.update({
+            "cells": len(cube.frame),
+            "source_rows": cube.source_rows,
+            "nbytes": cube.nbytes,
+            "build_seconds": cube.build_seconds,
+        })
+    return stats
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build
+from agent.dimension_encoding import contains_mask, match_values, unique_values
+from agent.period_parser import get_calendar
+
+# 역색인을 생성할 차원 컬럼들 ("year"는 Period/Year에서 파싱한 연도)
+INDEX_COLUMNS = ["Division", "Country", "Supplier", "FundsCenter", "Period/Year", "year"]
+
+# 행 비율이 이 값 미만인 값은 행 번호 목록(uint32), 이상이면 압축 비트맵으로 저장
+# (행 번호 4바이트 vs 비트맵 1/8바이트 → 1/32에서 두 표현의 크기가 같음)
+SPARSE_DENSITY = 1 / 32
+
+try:
+    _bit_count = np.bitwise_count
+except AttributeError:  # numpy < 2.0
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _bit_count(bits: np.ndarray) -> np.ndarray:
+        return _POPCOUNT_TABLE[bits]
+
+
+class RowBitmap:
+    """한 차원 값에 해당하는 행 집합입니다. 희소하면 행 번호, 밀집하면 packbits 비트맵으로 저장합니다."""
+
+    __slots__ = ("row_ids", "bits")
+
+    def __init__(self, row_ids: np.ndarray, row_count: int):
+        if len(row_ids) < row_count * SPARSE_DENSITY:
+            self.row_ids = row_ids.astype(np.uint32)
+            self.bits = None
+        else:
+            dense = np.zeros(row_count, dtype=bool)
+            dense[row_ids] = True
+            self.row_ids = None
+            self.bits = np.packbits(dense)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes if self.bits is not None else self.row_ids.nbytes
+
+    def mark(self, dense: np.ndarray):
+        """bool 배열 dense에 이 비트맵의 행들을 표시합니다. (OR)"""
+        if self.bits is not None:
+            dense |= np.unpackbits(self.bits, count=len(dense)).astype(bool)
+        else:
+            dense[self.row_ids] = True
+
+
+class DimensionIndex:
+    """하나의 차원 컬럼에 대한 값 → 행 비트맵 역색인입니다."""
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        row_count = len(codes)
+        self.values = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+
+        # 코드별로 안정 정렬하면 각 값의 행 번호가 오름차순으로 연속 구간에 모입니다.
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.values))
+        start = int((codes < 0).sum())
+        self.bitmaps = []
+        for count in counts:
+            self.bitmaps.append(RowBitmap(order[start:start + count], row_count))
+            start += count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bitmap.nbytes for bitmap in self.bitmaps) + self.values.memory_usage(deep=True)
+
+    def union(self, value_hits: np.ndarray, row_count: int) -> np.ndarray:
+        """매칭된 값들의 비트맵을 OR하여 packbits 비트맵으로 반환합니다."""
+        positions = np.flatnonzero(value_hits)
+        if len(positions) == 1 and self.bitmaps[positions[0]].bits is not None:
+            return self.bitmaps[positions[0]].bits.copy()
+
+        dense = np.zeros(row_count, dtype=bool)
+        for position in positions:
+            self.bitmaps[position].mark(dense)
+        return np.packbits(dense)
+
+
+class DatasetIndex:
+    """데이터셋 단위의 비트맵 역색인입니다.
+
+    조건별 비트맵을 AND로 결합하고, 지표 컬럼은 최종 행 번호로 한 번만 접근합니다.
+    원본 DataFrame은 참조하지 않으므로 캐시가 DataFrame 수명을 늘리지 않습니다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.row_count = len(df)
+        self.dimensions = {}
+
+        calendar = get_calendar(df)
+        for col in INDEX_COLUMNS:
+            if col in df.columns:
+                self.dimensions[col] = DimensionIndex(df[col])
+            elif col in calendar.columns and "Period/Year" in df.columns:
+                self.dimensions[col] = DimensionIndex(calendar[col])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(index.nbytes for index in self.dimensions.values())
+
+    @property
+    def value_count(self) -> int:
+        return sum(len(index.values) for index in self.dimensions.values())
+
+    def all_rows(self) -> np.ndarray:
+        """모든 행이 선택된 비트맵을 반환합니다."""
+        return self.from_mask(np.ones(self.row_count, dtype=bool))
+
+    def no_rows(self) -> np.ndarray:
+        """아무 행도 선택되지 않은 비트맵을 반환합니다."""
+        return self.from_mask(np.zeros(self.row_count, dtype=bool))
+
+    def from_mask(self, mask: np.ndarray) -> np.ndarray:
+        """bool 마스크를 packbits 비트맵으로 변환합니다."""
+        return np.packbits(mask)
+
+    def to_mask(self, bits: np.ndarray) -> np.ndarray:
+        """packbits 비트맵을 bool 마스크로 변환합니다."""
+        return np.unpackbits(bits, count=self.row_count).astype(bool)
+
+    def count(self, bits: np.ndarray) -> int:
+        """비트맵에서 선택된 행 수를 반환합니다."""
+        return int(_bit_count(bits).sum())
+
+    def row_ids(self, bits: np.ndarray) -> np.ndarray:
+        """비트맵에서 선택된 행 번호를 반환합니다."""
+        return np.flatnonzero(self.to_mask(bits))
+
+    def values(self, col: str) -> pd.Series:
+        """색인된 컬럼의 고유값 목록을 반환합니다."""
+        return self.dimensions[col].values
+
+    def contains(self, col: str, pattern: str, case: bool = True, as_text: bool = False,
+                 regex: bool = True) -> np.ndarray:
+        """고유값에 부분 문자열 매칭을 수행하고 해당 행 비트맵을 반환합니다. (regex=False면 문자 그대로 매칭)"""
+        index = self.dimensions[col]
+        return index.union(match_values(index.values, pattern, case, as_text, regex), self.row_count)
+
+    def equals(self, col: str, value, as_text: bool = False) -> np.ndarray:
+        """값이 정확히 일치하는 행 비트맵을 반환합니다."""
+        index = self.dimensions[col]
+        values = index.values.astype(str) if as_text else index.values
+        return index.union((values == value).to_numpy(dtype=bool), self.row_count)
+
+    def matching(self, col: str, value_hits: np.ndarray) -> np.ndarray:
+        """고유값(values(col) 순서)별 매칭 여부 배열에 해당하는 행 비트맵을 반환합니다."""
+        return self.dimensions[col].union(np.asarray(value_hits, dtype=bool), self.row_count)
+
+    def series_contains(self, series: pd.Series, pattern: str, case: bool = True, as_text: bool = False,
+                        regex: bool = True) -> np.ndarray:
+        """색인하지 않은 컬럼(고객사 등)에 부분 문자열 매칭을 수행하고 행 비트맵을 반환합니다."""
+        return self.from_mask(contains_mask(series, pattern, case, as_text, regex))
+
+    def selected_values(self, series: pd.Series, bits: np.ndarray, as_text: bool = False) -> list:
+        """선택된 행에 나타나는 컬럼 고유값을 등장 순서대로 반환합니다."""
+        return unique_values(series, self.to_mask(bits), as_text)
+
+    def total(self, series: pd.Series, bits: np.ndarray):
+        """선택된 행의 컬럼 합계를 반환합니다. (지표 컬럼은 최종 행 번호로 한 번만 접근)"""
+        return series.iloc[self.row_ids(bits)].sum()
+
+
+def get_dataset_index(df: pd.DataFrame) -> DatasetIndex:
+    """DataFrame의 비트맵 역색인을 반환합니다. (DataFrame당 1회 생성)"""
+    return get_or_build(df, "bitmap_index", DatasetIndex)
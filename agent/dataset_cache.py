@@ -0,0 +1,56 @@
+import threading
+import weakref
+
+import pandas as pd
+
+# DataFrame 객체별 파생 데이터 캐시 {id(df): {artifact_name: value}}
+_artifacts: dict = {}
+_lock = threading.Lock()
+
+
+def _release(df_id: int):
+    """DataFrame이 소멸되면 해당 파생 데이터를 정리합니다.
+
+    파생 데이터(집계 큐브 등)가 다른 DataFrame을 담고 있으면 해제될 때 그 finalizer가
+    다시 _release를 호출하므로, 잠금을 놓은 뒤에 참조를 해제합니다.
+    """
+    with _lock:
+        entry = _artifacts.pop(df_id, None)
+    del entry
+
+
+def get_or_build(df: pd.DataFrame, name: str, builder):
+    """DataFrame별로 한 번만 계산되는 파생 데이터를 반환합니다.
+
+    같은 DataFrame 객체에 대해서는 builder(df)를 최초 1회만 호출하고,
+    이후에는 캐시된 값을 재사용합니다.
+    """
+    df_id = id(df)
+    with _lock:
+        entry = _artifacts.get(df_id)
+        if entry is not None and name in entry:
+            return entry[name]
+
+    value = builder(df)
+
+    with _lock:
+        entry = _artifacts.get(df_id)
+        if entry is None:
+            entry = {}
+            _artifacts[df_id] = entry
+            weakref.finalize(df, _release, df_id)
+        entry.setdefault(name, value)
+        return entry[name]
+
+
+def invalidate(df: pd.DataFrame):
+    """DataFrame의 모든 파생 데이터를 제거합니다."""
+    _release(id(df))
+
+
+def discard(df: pd.DataFrame, name: str):
+    """DataFrame의 특정 파생 데이터만 제거합니다. (다음 조회 시 다시 생성)"""
+    with _lock:
+        entry = _artifacts.get(id(df))
+        value = entry.pop(name, None) if entry is not None else None
+    del value  # 잠금 밖에서 해제 (_release 참고)
@@ -0,0 +1,70 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 다중 데이터셋 도구의 데이터셋별 부분 계산 작업자 스레드 수 (기본: CPU 코어 수, 최대 8)
+DATASET_MAX_WORKERS = int(os.getenv("DATASET_MAX_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """재사용하는 데이터셋 계산용 스레드 풀을 반환합니다.
+
+    부분 계산은 GIL을 해제하는 NumPy/pandas 리듀션 위주라 프로세스 대신 스레드를 사용합니다.
+    (DataFrame 전송 비용 없음)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(DATASET_MAX_WORKERS, 1),
+                                           thread_name_prefix="dataset")
+        return _executor
+
+
+def shutdown():
+    """스레드 풀을 종료합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def _timed(func, datasets, name, args):
+    start = time.perf_counter()
+    value = func(datasets[name], *args)
+    return value, time.perf_counter() - start
+
+
+def map_datasets(datasets, func, *args) -> list:
+    """데이터셋마다 func(df, *args)를 스레드 풀에서 동시에 계산합니다.
+
+    datasets[name] 조회도 작업자에서 수행하므로 지연 로딩 데이터셋은 필요한 시트만 불러옵니다.
+
+    Returns:
+        [(데이터셋 이름, 결과, 소요 시간(초)), ...] 데이터셋 등록 순서 그대로.
+        작업 중 발생한 예외는 호출 측으로 다시 발생합니다.
+    """
+    names = list(datasets)
+    # 지연 로딩 데이터셋은 순회할 시트 중 파싱 전인 것만 프로세스 풀에서 미리 병렬 파싱
+    # (실패한 시트는 작업자에서 조회할 때 오류가 발생)
+    if len(names) > 1 and hasattr(datasets, "prefetch"):
+        datasets.prefetch()
+    if len(names) <= 1 or DATASET_MAX_WORKERS <= 1:
+        return [(name, *_timed(func, datasets, name, args)) for name in names]
+
+    # 작업자 스레드에서도 호출 측 실행 컨텍스트(세션 데이터셋 등)를 그대로 사용
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, _timed, func, datasets, name, args)
+               for name in names]
+    return [(name, *future.result()) for name, future in zip(names, futures)]
+
+
+def format_timings(results: list) -> str:
+    """map_datasets 결과의 데이터셋별 소요 시간을 한 줄 요약으로 만듭니다."""
+    timings = " · ".join(f"{name} {seconds:.3f}초" for name, _, seconds in results)
+    return f"⏱️ 데이터셋별 처리 시간 (작업자 {min(max(DATASET_MAX_WORKERS, 1), len(results))}개): {timings}"
@@ -0,0 +1,158 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build, discard
+from agent.dimension_encoding import is_categorical
+from agent.sketches import SKETCH_CHUNK_ROWS, HyperLogLog, KLLSketch, hash_values
+
+# 텍스트 컬럼 최빈값 개수 및 샘플 값 개수
+TOP_K_VALUES = 10
+SAMPLE_VALUES = 5
+
+# 행 수가 이 값 이상이면 수치 컬럼의 고유값 수·분위수를 스케치로 근사 프로파일링
+PROFILE_APPROX_ROWS = int(os.getenv("PROFILE_APPROX_ROWS", "1000000"))
+
+# 프로파일에 함께 저장하는 분위수
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _column_kind(series: pd.Series) -> str:
+    """컬럼 종류를 'text' / 'numeric' / 'other'로 구분합니다."""
+    if series.dtype == object or pd.api.types.is_string_dtype(series) or is_categorical(series):
+        return "text"
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return "numeric"
+    return "other"
+
+
+class ColumnProfile:
+    """한 컬럼의 타입, 결측값/고유값 수, 최빈값 또는 수치 요약 통계입니다.
+
+    approximate=True이면 수치 컬럼의 고유값 수는 HyperLogLog, 분위수는 KLL 스케치로
+    추정하고 오차 범위를 error_bounds에 기록합니다. 텍스트 컬럼은 한 번의 factorize로
+    고유값 수/최빈값/샘플을 정확히 계산합니다. (값 해싱 기반 스케치보다 빠름)
+    """
+
+    def __init__(self, name, series: pd.Series, approximate: bool = False):
+        self.name = name
+        self.dtype = str(series.dtype)
+        self.kind = _column_kind(series)
+        self.null_count = int(series.isnull().sum())
+        self.top_values = []
+        self.sample_values = []
+        self.min = self.max = self.mean = self.median = None
+        self.quantiles = {}
+        self.approximate = approximate and self.kind == "numeric"
+        self.error_bounds = {}
+
+        if self.approximate:
+            self._profile_approximate(series)
+        elif self.kind == "text" and not is_categorical(series):
+            self._profile_text(series)
+        else:
+            self._profile_exact(series)
+
+    def _profile_exact(self, series: pd.Series):
+        self.distinct_count = int(series.nunique())
+        if self.kind == "text":
+            # 범주형의 미사용 카테고리 제외
+            counts = series.value_counts()
+            counts = counts[counts > 0].head(TOP_K_VALUES)
+            self.top_values = [(value, int(count)) for value, count in counts.items()]
+            # 샘플 값은 데이터 등장 순서 기준
+            self.sample_values = list(series.dropna().unique()[:SAMPLE_VALUES])
+        elif self.kind == "numeric":
+            self.min = series.min()
+            self.max = series.max()
+            self.mean = float(series.mean())
+            self.quantiles = {q: float(value) for q, value in series.quantile(list(PROFILE_QUANTILES)).items()}
+            self.median = float(series.median())
+
+    def _profile_text(self, series: pd.Series):
+        """factorize 한 번으로 고유값 수, 최빈값, 등장 순서 샘플을 계산합니다.
+
+        최빈값 순서는 value_counts와 같습니다.
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(uniques)), index=uniques)
+        # value_counts와 같은 정렬 (등장 순서의 빈도 목록을 내림차순 정렬)
+        counts = counts.sort_values(ascending=False).head(TOP_K_VALUES)
+        self.distinct_count = len(uniques)
+        self.top_values = [(value, int(count)) for value, count in counts.items()]
+        self.sample_values = list(uniques[:SAMPLE_VALUES])
+
+    def _profile_approximate(self, series: pd.Series):
+        """청크 단위로 스케치를 갱신하여 고유값 수와 분위수를 추정합니다. (최솟값/최댓값/평균은 정확)"""
+        distinct = HyperLogLog()
+        quantiles = KLLSketch()
+        values = series.dropna()
+        for start in range(0, len(values), SKETCH_CHUNK_ROWS):
+            chunk = values.iloc[start:start + SKETCH_CHUNK_ROWS].to_numpy()
+            distinct.update_hashes(hash_values(chunk))
+            quantiles.update(chunk)
+
+        self.distinct_count = distinct.estimate()
+        self.min = series.min()
+        self.max = series.max()
+        self.mean = float(series.mean())
+        self.quantiles = {q: quantiles.quantile(q) for q in PROFILE_QUANTILES}
+        self.median = self.quantiles[0.5]
+        self.error_bounds["distinct"] = distinct.relative_error
+        self.error_bounds["quantiles"] = quantiles.rank_error
+
+
+class DatasetProfile:
+    """탐색 도구와 UI 패널이 공유하는 데이터셋 프로파일입니다.
+
+    메모리 사용량, 결측값 수, 컬럼별 고유값/최빈값/수치 통계를 한 번 계산해 두고
+    explore_dataset, get_column_info, compare_datasets_summary 등이 재사용합니다.
+    원본 DataFrame은 참조하지 않습니다.
+
+    approximate가 None이면 행 수가 PROFILE_APPROX_ROWS 이상일 때 근사 모드를 사용합니다.
+    """
+
+    def __init__(self, df: pd.DataFrame, approximate: bool = None):
+        start = time.perf_counter()
+        self.signature = _signature(df)
+        self.rows = len(df)
+        self.approximate = self.rows >= PROFILE_APPROX_ROWS if approximate is None else approximate
+        self.memory_bytes = int(df.memory_usage(deep=True).sum())
+        self.columns = {col: ColumnProfile(col, df[col], self.approximate) for col in df.columns}
+        self.null_count = sum(column.null_count for column in self.columns.values())
+        self.numeric_columns = [col for col, column in self.columns.items() if column.kind == "numeric"]
+        self.build_seconds = time.perf_counter() - start
+
+    @property
+    def column_count(self) -> int:
+        return len(self.columns)
+
+
+def _signature(df: pd.DataFrame) -> tuple:
+    """데이터 버전 확인용 (행 수, 컬럼, dtype) 서명입니다."""
+    return len(df), tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes)
+
+
+def get_profile(df: pd.DataFrame, exact: bool = False) -> DatasetProfile:
+    """DataFrame의 프로파일을 반환합니다.
+
+    DataFrame별로 한 번만 계산하며, 새로 업로드된 데이터(새 DataFrame)나 행/컬럼 구성이
+    바뀐 DataFrame은 새로 계산합니다. 대용량 데이터는 기본적으로 근사 프로파일을 사용하고,
+    exact=True이면 정확 프로파일을 따로 계산해 캐시합니다.
+    """
+    name, builder = "profile", DatasetProfile
+    if exact and len(df) >= PROFILE_APPROX_ROWS:
+        name, builder = "profile_exact", lambda frame: DatasetProfile(frame, approximate=False)
+    profile = get_or_build(df, name, builder)
+    if profile.signature != _signature(df):
+        discard(df, name)
+        profile = get_or_build(df, name, builder)
+    return profile
+
+
+def invalidate_profile(df: pd.DataFrame):
+    """DataFrame의 캐시된 프로파일을 제거합니다."""
+    discard(df, "profile")
+    discard(df, "profile_exact")
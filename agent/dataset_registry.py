@@ -0,0 +1,107 @@
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import pandas as pd
+
+from agent.result_cache import dataframe_fingerprint
+
+# 보관하는 핸들 수 (초과 시 가장 오래 사용되지 않은 핸들부터 해제)
+DATASET_REGISTRY_SIZE = int(os.getenv("DATASET_REGISTRY_SIZE", "64"))
+
+
+class DatasetRegistry:
+    """그래프 상태 대신 데이터셋을 보관하는 프로세스 단위 핸들 레지스트리입니다.
+
+    LangGraph 상태에는 핸들 문자열과 이름/개수 같은 가벼운 메타데이터만 넣고, 노드는 핸들로
+    데이터를 조회합니다. 체크포인터가 상태를 직렬화해도 DataFrame이 포함되지 않습니다.
+
+    핸들은 내용 기준으로 만들어 같은 데이터는 같은 핸들을 받습니다.
+    DataFrame과 데이터셋 묶음({이름: DataFrame} 매핑)은 모두 약한 참조로 보관하여 호출 측(세션)이
+    보유하는 동안만 조회됩니다. (레지스트리가 데이터 수명을 늘리지 않음)
+    핸들 수는 크기 제한 LRU로 관리합니다. (DATASET_REGISTRY_SIZE)
+    """
+
+    def __init__(self, max_entries: int = DATASET_REGISTRY_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 핸들 → 등록된 객체를 반환하는 약한 참조 (해제되었으면 None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _put(self, handle: str, ref):
+        with self._lock:
+            self._entries[handle] = ref
+            self._entries.move_to_end(handle)
+            while len(self._entries) > max(self.max_entries, 1):
+                self._entries.popitem(last=False)
+
+    def register_dataframe(self, df: pd.DataFrame) -> str:
+        """DataFrame을 등록하고 내용 지문 기반 핸들을 반환합니다."""
+        handle = f"df:{dataframe_fingerprint(df)}"
+        self._put(handle, weakref.ref(df))
+        return handle
+
+    def register_datasets(self, datasets: Mapping) -> str:
+        """{이름: DataFrame} 매핑을 등록하고 이름과 각 데이터 출처 기반 핸들을 반환합니다.
+
+        매핑에 source_key(name)가 있으면(LazyDatasets) 시트를 파싱하지 않고 출처 키를 사용합니다.
+        약한 참조를 만들 수 없는 dict는 DataFrame별 약한 참조로 보관하고 조회할 때 다시 묶습니다.
+        """
+        source_key = getattr(datasets, "source_key", None)
+        digest = hashlib.blake2b(digest_size=16)
+        for name in datasets:
+            key = source_key(name) if source_key else dataframe_fingerprint(datasets[name])
+            digest.update(repr((name, key)).encode("utf-8"))
+        handle = f"datasets:{digest.hexdigest()}"
+        try:
+            ref = weakref.ref(datasets)
+        except TypeError:
+            ref = _frames_ref(datasets)
+        self._put(handle, ref)
+        return handle
+
+    def resolve(self, handle: str):
+        """핸들의 데이터를 반환합니다. 없거나(다른 프로세스의 핸들, 만료) 해제되었으면 None을 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(handle) if handle else None
+            value = None
+            if entry is not None:
+                value = entry()
+                if value is None:
+                    del self._entries[handle]
+                else:
+                    self._entries.move_to_end(handle)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def stats(self) -> dict:
+        """조회 적중/실패 횟수와 현재 보관 중인 핸들 수를 반환합니다."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _frames_ref(datasets: Mapping):
+    """{이름: DataFrame} dict의 약한 참조 대용입니다. DataFrame이 하나라도 해제되면 None을 반환합니다."""
+    refs = {name: weakref.ref(df) for name, df in datasets.items()}
+
+    def resolve():
+        frames = {name: ref() for name, ref in refs.items()}
+        return None if any(df is None for df in frames.values()) else frames
+
+    return resolve
+
+
+# 프로세스 공용 데이터셋 레지스트리
+dataset_registry = DatasetRegistry()
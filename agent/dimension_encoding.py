@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# 필터 조건으로 사용되는 차원 컬럼들
+DIMENSION_COLUMNS = ["Division", "FundsCenter", "Country", "Supplier", "Period/Year"]
+
+# 고유값 비율이 이 값 이하인 컬럼만 범주형으로 변환 (고객번호 등 고유 컬럼 제외)
+MAX_CATEGORY_RATIO = 0.5
+
+
+def is_categorical(series: pd.Series) -> bool:
+    """범주형(dictionary-encoded) 컬럼인지 확인합니다."""
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def encode_dimensions(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """차원 컬럼들을 pandas 범주형(정수 코드 + 사전)으로 변환합니다.
+
+    변환은 제자리(in-place)에서 이루어지며, 같은 DataFrame을 반환합니다.
+    """
+    columns = columns or DIMENSION_COLUMNS
+    row_count = max(len(df), 1)
+
+    for col in columns:
+        if col not in df.columns or is_categorical(df[col]):
+            continue
+        if df[col].dtype != object and not pd.api.types.is_string_dtype(df[col]):
+            continue
+        if df[col].nunique(dropna=True) / row_count <= MAX_CATEGORY_RATIO:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def _category_text(series: pd.Series, as_text: bool) -> pd.Series:
+    """범주 사전(카테고리 목록)을 문자열 연산이 가능한 Series로 반환합니다."""
+    categories = pd.Series(series.cat.categories, dtype=object)
+    return categories.astype(str) if as_text else categories
+
+
+def match_values(values: pd.Series, pattern: str, case: bool = True, as_text: bool = False,
+                 regex: bool = True) -> np.ndarray:
+    """고유값 목록에 str.contains를 적용하여 매칭 여부 배열을 반환합니다. (regex=False면 문자 그대로 매칭)"""
+    values = values.astype(str) if as_text else values
+    return values.str.contains(pattern, case=case, na=False, regex=regex).to_numpy(dtype=bool)
+
+
+def _codes_mask(series: pd.Series, category_hits: np.ndarray) -> np.ndarray:
+    """매칭된 카테고리 코드 집합으로 행 마스크를 만듭니다."""
+    matched_codes = np.flatnonzero(category_hits)
+    return np.isin(series.cat.codes.to_numpy(), matched_codes)
+
+
+def contains_mask(series: pd.Series, pattern: str, case: bool = True, as_text: bool = False,
+                  regex: bool = True) -> np.ndarray:
+    """str.contains와 동일한 결과의 행 마스크를 반환합니다.
+
+    범주형 컬럼은 수백 개의 카테고리 값에만 부분 문자열 매칭을 수행한 뒤
+    정수 코드 isin으로 행을 필터링합니다.
+    as_text=True이면 astype(str) 후 매칭하는 것과 같이 동작합니다.
+    사용자/추출기 값처럼 괄호 등이 들어갈 수 있는 값은 regex=False로 문자 그대로 매칭합니다.
+    """
+    if is_categorical(series):
+        categories = pd.Series(series.cat.categories, dtype=object)
+        return _codes_mask(series, match_values(categories, pattern, case, as_text, regex))
+
+    return match_values(series, pattern, case, as_text, regex)
+
+
+def equals_mask(series: pd.Series, value, as_text: bool = False) -> np.ndarray:
+    """값이 정확히 일치하는 행의 마스크를 반환합니다."""
+    if is_categorical(series):
+        categories = _category_text(series, as_text)
+        return _codes_mask(series, (categories == value).to_numpy(dtype=bool))
+
+    values = series.astype(str) if as_text else series
+    return (values == value).to_numpy(dtype=bool)
+
+
+def unique_values(series: pd.Series, mask: np.ndarray = None, as_text: bool = False) -> list:
+    """마스크에 해당하는 행의 고유값을 등장 순서대로 반환합니다. (결측값 제외)"""
+    if is_categorical(series):
+        codes = series.cat.codes.to_numpy()
+        if mask is not None:
+            codes = codes[mask]
+        codes = pd.unique(codes)
+        codes = codes[codes >= 0]
+        categories = _category_text(series, as_text)
+        return categories.take(codes).tolist()
+
+    values = series if mask is None else series[mask]
+    values = values.dropna()
+    if as_text:
+        values = values.astype(str)
+    return values.unique().tolist()
@@ -0,0 +1,127 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from agent.aggregate_cube import CUBE_METRICS
+from agent.dimension_encoding import DIMENSION_COLUMNS, encode_dimensions, is_categorical
+
+# 지표 컬럼 판별: 주요 지표 + 번호가 붙은 손익 항목("2.매출원가") + 물량 단위 컬럼
+_METRIC_NAME_PATTERN = re.compile(r'^\d+\.|\(M/T\)$|\(톤\)$')
+
+# 지표 컬럼은 연산 중 오버플로가 없도록 이 크기보다 작게 줄이지 않음
+MIN_METRIC_INT_DTYPE = np.int32
+
+# 컬럼이 없어지면 도구 동작이 달라지는 분석 스키마 컬럼은 비어 있어도 유지
+_KEEP_EMPTY_COLUMNS = set(DIMENSION_COLUMNS + CUBE_METRICS)
+
+# DataFrame.attrs에 저장하는 압축 보고서 키
+REPORT_KEY = "compaction"
+
+
+def is_metric_column(name) -> bool:
+    """컬럼명이 지표(수치) 컬럼인지 판별합니다."""
+    name = str(name)
+    return name in CUBE_METRICS or bool(_METRIC_NAME_PATTERN.search(name))
+
+
+def _coerce_numeric(series: pd.Series):
+    """천 단위 콤마/공백이 섞인 텍스트 지표를 수치로 변환합니다.
+
+    비어 있지 않은 값이 모두 숫자로 해석될 때만 변환하고, 아니면 None을 반환합니다.
+    """
+    text = series.astype("string").str.replace(r'[,\s]', '', regex=True)
+    text = text.mask(text == "").to_numpy(dtype=object, na_value=np.nan)
+    numeric = pd.to_numeric(text, errors="coerce")
+    if (np.isnan(numeric) & ~pd.isna(text)).any():
+        return None
+    return pd.Series(numeric, index=series.index, name=series.name)
+
+
+def _downcast(series: pd.Series, metric: bool) -> pd.Series:
+    """값 손실 없이 표현 가능한 가장 작은 정수/실수 타입으로 줄입니다."""
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        downcast = pd.to_numeric(series, downcast="integer")
+        if metric and downcast.dtype.itemsize < np.dtype(MIN_METRIC_INT_DTYPE).itemsize:
+            downcast = series.astype(MIN_METRIC_INT_DTYPE)
+        return downcast
+    if pd.api.types.is_float_dtype(series) and series.dtype.itemsize > 4:
+        values = series.to_numpy()
+        # 결측 없이 정수 값만 있으면 정수로
+        if values.size and not np.isnan(values).any() and np.array_equal(values, np.trunc(values)) \
+                and np.abs(values).max() < 2 ** 53:
+            return _downcast(series.astype(np.int64), metric)
+        # 지표는 합계 정밀도를 위해 float64 유지, 그 외는 float32로 왕복해도 같으면 float32로
+        if not metric:
+            with np.errstate(over="ignore"):
+                narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+                return series.astype(np.float32)
+    return series
+
+
+def compact_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """불러온 시트의 컬럼 타입을 메모리 효율적인 타입으로 바꿉니다.
+
+    - 텍스트로 들어온 지표 컬럼을 벡터 연산으로 수치 변환
+    - 정수/실수 컬럼을 값 손실 없는 범위에서 축소
+    - 고유값 비율이 낮은 텍스트 컬럼을 범주형(사전 인코딩)으로 변환
+    - 모든 값이 비어 있는 컬럼 제거 (분석 스키마 컬럼 제외)
+
+    변환 전후 메모리 보고서는 df.attrs["compaction"]에 저장하며, compaction_report로 조회합니다.
+    """
+    before_bytes = int(df.memory_usage(deep=True).sum())
+    before_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+    empty = [col for col in df.columns
+             if col not in _KEEP_EMPTY_COLUMNS and df[col].isna().all()]
+    if empty:
+        df = df.drop(columns=empty)
+
+    text_columns = []
+    for col in df.columns:
+        series = df[col]
+        if is_categorical(series):
+            continue
+        metric = is_metric_column(col)
+        if series.dtype == object and metric:
+            numeric = _coerce_numeric(series)
+            if numeric is not None:
+                series = numeric
+        if series.dtype == object:
+            text_columns.append(col)
+        else:
+            series = _downcast(series, metric)
+        if series is not df[col]:
+            df[col] = series
+
+    # 차원 컬럼과 같은 기준(고유값 비율)으로 텍스트 컬럼 사전 인코딩
+    encode_dimensions(df, columns=DIMENSION_COLUMNS + text_columns)
+
+    after_bytes = int(df.memory_usage(deep=True).sum())
+    df.attrs[REPORT_KEY] = {
+        "before_bytes": before_bytes,
+        "after_bytes": after_bytes,
+        "dropped_columns": empty,
+        "converted": {col: (before_dtypes[col], str(dtype)) for col, dtype in df.dtypes.items()
+                      if before_dtypes[col] != str(dtype)},
+    }
+    return df
+
+
+def compaction_report(df: pd.DataFrame):
+    """compact_dataframe이 저장한 보고서를 반환합니다. 압축하지 않은 데이터면 None을 반환합니다."""
+    return df.attrs.get(REPORT_KEY) if df is not None else None
+
+
+def format_compaction_report(report: dict) -> str:
+    """압축 보고서를 한 줄 요약으로 만듭니다."""
+    before = report["before_bytes"] / 1024 / 1024
+    after = report["after_bytes"] / 1024 / 1024
+    saved = (1 - report["after_bytes"] / report["before_bytes"]) * 100 if report["before_bytes"] else 0.0
+    summary = f"{before:.1f}MB → {after:.1f}MB (-{saved:.0f}%), 타입 변환 {len(report['converted'])}개 컬럼"
+    if report["dropped_columns"]:
+        summary += f", 빈 컬럼 {len(report['dropped_columns'])}개 제거"
+    return summary
@@ -0,0 +1,231 @@
+import re
+from collections import deque
+
+import pandas as pd
+
+from agent.dataset_cache import get_or_build
+from agent.dimension_encoding import unique_values
+
+# 엔티티 키 → 데이터 컬럼 (질문에서 값을 추출할 차원)
+ENTITY_COLUMNS = {
+    "division": "Division",
+    "funds_center": "FundsCenter",
+    "country": "Country",
+    "supplier": "Supplier",
+    "customer": "Customer",
+}
+
+# 별칭 → 데이터에 존재하는 표기 (표기가 데이터에 있을 때만 등록)
+ENTITY_ALIASES = {
+    "division": {"스테인레스": "스테인리스"},
+    "country": {"대한민국": "한국", "국내": "한국"},
+    "supplier": {"포스코": "POSCO"},
+}
+
+# 값 앞뒤의 코드/상태 표기와 일반 접미사 (제거한 핵심어도 별칭으로 등록)
+_PREFIX_PATTERN = re.compile(r'^(?:\(폐지\)\s*|[A-Z]{1,3}\d{2,4}\s+)+')
+_GENERIC_SUFFIXES = ("사업실", "사업부", "부문")
+
+# 너무 짧은 패턴은 질문 속 다른 단어와 오매칭되므로 제외
+MIN_PATTERN_LENGTH = 2
+
+
+def _normalize(text: str) -> tuple:
+    """대소문자/공백을 무시하도록 정규화하고, 정규화 문자 → 원문 위치 목록을 함께 반환합니다."""
+    chars, positions = [], []
+    for i, ch in enumerate(str(text)):
+        if not ch.isspace():
+            chars.append(ch.casefold())
+            positions.append(i)
+    return "".join(chars), positions
+
+
+def _is_ascii_word(text: str) -> bool:
+    return bool(text) and text.isascii() and text.isalnum()
+
+
+def _surface_forms(value: str) -> list:
+    """데이터 값 하나에서 질문에 등장할 수 있는 표기들을 만듭니다. (값 자체 + 핵심어)"""
+    forms = [value]
+    stem = _PREFIX_PATTERN.sub("", value).strip()
+    if stem != value:
+        forms.append(stem)
+    for suffix in _GENERIC_SUFFIXES:
+        if stem.endswith(suffix) and len(stem) > len(suffix):
+            forms.append(stem[:-len(suffix)].strip())
+    return forms
+
+
+class AhoCorasick:
+    """여러 패턴을 하나의 오토마톤으로 컴파일하여 텍스트를 한 번만 훑어 모든 출현을 찾습니다."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload):
+        """패턴과 매칭 시 반환할 값을 등록합니다."""
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        """BFS로 실패 링크를 계산하고, 접미사 패턴의 출력을 합칩니다."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+                queue.append(next_state)
+        self._built = True
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def iter(self, text: str):
+        """(끝 위치 + 1, 패턴 길이, payload)를 텍스트 순서대로 생성합니다."""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, payload in output[state]:
+                yield i + 1, length, payload
+
+
+class EntityExtractor:
+    """업로드된 데이터셋의 차원 고유값(+별칭)으로 만든 질문 엔티티 추출기입니다.
+
+    Division/FundsCenter/Country/Supplier/Customer 고유값을 하나의 Aho–Corasick
+    오토마톤으로 컴파일하여, 질문을 한 번 훑는 것으로 모든 차원 값을 찾습니다.
+    원본 DataFrame은 참조하지 않습니다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._automaton = AhoCorasick()
+        self.value_counts = {}
+        seen = set()
+
+        surfaces = {}
+        for key, col in ENTITY_COLUMNS.items():
+            if col not in df.columns:
+                continue
+            values = [str(value).strip() for value in unique_values(df[col], as_text=True)]
+            self.value_counts[key] = len(values)
+            forms = surfaces.setdefault(key, {})
+            for value in values:
+                for form in _surface_forms(value):
+                    normalized, _ = _normalize(form)
+                    if len(normalized) >= MIN_PATTERN_LENGTH and any(ch.isalpha() for ch in normalized):
+                        forms.setdefault(normalized, form)
+
+        for key, aliases in ENTITY_ALIASES.items():
+            forms = surfaces.get(key)
+            if not forms:
+                continue
+            for alias, canonical in aliases.items():
+                canonical_normalized, _ = _normalize(canonical)
+                if canonical_normalized in forms:
+                    forms.setdefault(_normalize(alias)[0], forms[canonical_normalized])
+
+        for key, forms in surfaces.items():
+            for normalized, form in forms.items():
+                if (normalized, key) not in seen:
+                    seen.add((normalized, key))
+                    self._automaton.add(normalized, (key, form))
+        self._automaton.build()
+        self.pattern_count = len(seen)
+
+    @property
+    def entity_keys(self) -> list:
+        return list(self.value_counts)
+
+    def find(self, text: str) -> list:
+        """질문에서 차원 값 출현을 찾습니다.
+
+        겹치는 출현은 가장 왼쪽·가장 긴 것만 남깁니다. (같은 구간의 서로 다른 컬럼은 모두 유지)
+
+        Returns:
+            [{'entity', 'column', 'value', 'text', 'start', 'end'}, ...] (등장 순서)
+        """
+        if not text:
+            return []
+        normalized, positions = _normalize(text)
+
+        hits = []
+        for end, length, (key, form) in self._automaton.iter(normalized):
+            start = end - length
+            # 영문/숫자 패턴은 단어 경계에서만 인정 (예: "KR"이 "KRW" 안에서 매칭되지 않도록)
+            if _is_ascii_word(normalized[start:end]) and (
+                (start > 0 and _is_ascii_word(normalized[start - 1]))
+                or (end < len(normalized) and _is_ascii_word(normalized[end]))
+            ):
+                continue
+            hits.append((start, end, key, form))
+
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+        selected = []
+        covered_end = -1
+        last_span = None
+        for start, end, key, form in hits:
+            if (start, end) != last_span and start < covered_end:
+                continue
+            last_span = (start, end)
+            covered_end = max(covered_end, end)
+            selected.append({
+                "entity": key,
+                "column": ENTITY_COLUMNS[key],
+                "value": form,
+                "text": text[positions[start]:positions[end - 1] + 1],
+                "start": positions[start],
+                "end": positions[end - 1] + 1,
+            })
+        return selected
+
+    def extract(self, text: str) -> dict:
+        """엔티티별로 처음 등장한 값을 반환합니다. {'division': '스테인리스', ...}"""
+        entities = {}
+        for hit in self.find(text):
+            entities.setdefault(hit["entity"], hit["value"])
+        return entities
+
+
+def get_entity_extractor(df: pd.DataFrame):
+    """DataFrame의 엔티티 추출기를 반환합니다. (DataFrame당 1회 생성, df가 없으면 None)"""
+    if df is None or not any(col in df.columns for col in ENTITY_COLUMNS.values()):
+        return None
+    return get_or_build(df, "entity_extractor", EntityExtractor)
+
+
+def is_covered(hits: list, text: str, keyword: str) -> bool:
+    """keyword의 모든 출현이 이미 추출된 엔티티 구간 안에 있는지 확인합니다."""
+    start = text.find(keyword)
+    if start < 0:
+        return False
+    while start >= 0:
+        end = start + len(keyword)
+        if not any(hit["start"] <= start and end <= hit["end"] for hit in hits):
+            return False
+        start = text.find(keyword, start + 1)
+    return True
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from pandas.io.parsers import TextParser
+
+from agent.aggregate_cube import CUBE_METRICS
+from agent.dimension_encoding import DIMENSION_COLUMNS, MAX_CATEGORY_RATIO
+
+# 분석에 사용하는 스키마 컬럼 (컬럼 제한 로드 시 이 컬럼만 파싱)
+SCHEMA_COLUMNS = DIMENSION_COLUMNS + CUBE_METRICS
+
+# 한 번에 파싱하는 행 수 (행 버퍼 크기)
+INGEST_CHUNK_ROWS = 20000
+
+
+def normalize_column_name(name) -> str:
+    """app.py와 같은 규칙으로 컬럼명을 정규화합니다. (앞뒤 공백, 공백/탭 제거)"""
+    return str(name).strip().replace(" ", "").replace("\t", "")
+
+
+def _convert_cell(cell):
+    """pandas openpyxl 리더와 같은 규칙으로 셀 값을 변환합니다."""
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == "e":
+        return np.nan
+    if cell.data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+class _ColumnBuffers:
+    """청크별로 파싱한 컬럼 조각을 모았다가 마지막에 컬럼 단위로 합칩니다.
+
+    차원 컬럼은 청크마다 범주형으로 바꿔 두어 반복되는 문자열 객체가 쌓이지 않게 합니다.
+    """
+
+    def __init__(self, names: list):
+        self.names = names
+        self.dimensions = {name for name in names if normalize_column_name(name) in DIMENSION_COLUMNS}
+        self.pieces = {name: [] for name in names}
+        self.row_count = 0
+
+    def append(self, rows: list):
+        chunk = TextParser(rows, header=None, names=self.names, skip_blank_lines=False).read()
+        for name in self.names:
+            piece = chunk[name].reset_index(drop=True)
+            if name in self.dimensions and piece.dtype == object:
+                piece = piece.astype("category")
+            self.pieces[name].append(piece)
+        self.row_count += len(rows)
+
+    def _combine(self, name: str) -> pd.Series:
+        pieces = self.pieces.pop(name)
+        if not pieces:
+            return pd.Series([], dtype=object)
+        if all(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+            try:
+                combined = union_categoricals(pieces)
+                # 카테고리 순서를 astype("category")와 같게 맞춤 (혼합 타입 포함)
+                ordered = pd.Categorical(np.asarray(combined.categories, dtype=object)).categories
+                series = pd.Series(combined.reorder_categories(ordered))
+                # encode_dimensions와 같은 기준: 고유값 비율이 높으면 일반 컬럼으로 유지
+                if series.cat.categories.size / max(len(series), 1) > MAX_CATEGORY_RATIO:
+                    series = series.astype(object)
+                return series
+            except TypeError:
+                pass
+        pieces = [piece.astype(object) if isinstance(piece.dtype, pd.CategoricalDtype) else piece
+                  for piece in pieces]
+        return pd.concat(pieces, ignore_index=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = {}
+        for name in self.names:
+            columns[name] = self._combine(name)
+        return pd.DataFrame(columns, columns=self.names)
+
+
+def read_sheet(worksheet, columns: list = None, chunk_rows: int = INGEST_CHUNK_ROWS, progress=None) -> pd.DataFrame:
+    """읽기 전용 워크시트를 행 단위로 스트리밍하여 DataFrame으로 만듭니다.
+
+    Args:
+        worksheet: openpyxl 읽기 전용 워크시트
+        columns: 정규화된 컬럼명 목록. 주어지면 해당 컬럼만 파싱합니다.
+        chunk_rows: 한 번에 파싱하는 행 수
+        progress: progress(읽은 행 수, 예상 전체 행 수) 콜백
+    """
+    # 진행률용 예상 행 수 (파일에 기록된 범위, 헤더 제외)
+    total_rows = max((worksheet.max_row or 1) - 1, 0) if worksheet.max_row else None
+    worksheet.reset_dimensions()
+    rows = worksheet.iter_rows()
+
+    header = None
+    for row in rows:
+        header = [_convert_cell(cell) for cell in row]
+        while header and header[-1] == "":
+            header.pop()
+        if header:
+            break
+    if not header:
+        return pd.DataFrame()
+
+    # 헤더 이름은 read_excel과 같이 TextParser로 생성 (Unnamed: n, 중복 .1 처리)
+    names = list(TextParser([header], header=0).read().columns)
+    keep = [i for i, name in enumerate(names)
+            if columns is None or normalize_column_name(name) in columns]
+    width = len(header)
+    buffers = _ColumnBuffers([names[i] for i in keep])
+
+    chunk, pending_blank = [], []
+    for row in rows:
+        values = [_convert_cell(cell) for cell in row[:width]]
+        values.extend([""] * (width - len(values)))
+        selected = [values[i] for i in keep]
+        # 끝부분의 빈 행은 read_excel과 같이 제외 (중간의 빈 행은 유지)
+        if all(value == "" for value in values):
+            pending_blank.append(selected)
+            continue
+        if pending_blank:
+            chunk.extend(pending_blank)
+            pending_blank = []
+        chunk.append(selected)
+        if len(chunk) >= chunk_rows:
+            buffers.append(chunk)
+            chunk = []
+            if progress:
+                progress(buffers.row_count, total_rows)
+    if chunk:
+        buffers.append(chunk)
+    if progress:
+        progress(buffers.row_count, buffers.row_count)
+
+    return buffers.to_frame()
+
+
+def read_workbook(source, columns: list = None, chunk_rows: int = INGEST_CHUNK_ROWS, progress=None) -> dict:
+    """엑셀 워크북의 모든 시트를 읽기 전용 스트리밍으로 파싱합니다.
+
+    Args:
+        source: 파일 경로 또는 파일 객체
+        columns: 정규화된 컬럼명 목록 (예: SCHEMA_COLUMNS). None이면 모든 컬럼
+        progress: progress(시트명, 읽은 행 수, 예상 전체 행 수) 콜백
+
+    Returns:
+        {시트명: DataFrame}
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for worksheet in workbook.worksheets:
+            sheet_progress = None
+            if progress:
+                sheet_progress = lambda done, total, name=worksheet.title: progress(name, done, total)
+            sheets[worksheet.title] = read_sheet(worksheet, columns, chunk_rows, sheet_progress)
+        return sheets
+    finally:
+        workbook.close()
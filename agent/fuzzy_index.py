@@ -0,0 +1,254 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# 기존 매칭 규칙으로 후보가 없을 때 자모 n-gram 유사도로 인정하는 최소 점수
+JAMO_MIN_SIMILARITY = 0.85
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ",
+              "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해합니다. (한글 외 문자는 그대로 유지)"""
+    chars = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            chars.append(_CHOSEONG[code // 588])
+            chars.append(_JUNGSEONG[(code % 588) // 28])
+            chars.append(_JONGSEONG[code % 28])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def _ngrams(text: str, n: int) -> set:
+    """문자 n-gram 집합을 반환합니다. (n보다 짧으면 문자열 자체)"""
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class _SubstringIndex:
+    """문자/바이그램 역색인으로 부분 문자열 포함 관계를 빠르게 찾습니다."""
+
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.exact = defaultdict(list)
+        self.unigrams = defaultdict(list)
+        self.bigrams = defaultdict(list)
+        for i, text in enumerate(texts):
+            self.exact[text].append(i)
+            for gram in set(text):
+                self.unigrams[gram].append(i)
+            for gram in _ngrams(text, 2):
+                self.bigrams[gram].append(i)
+
+    def containing(self, s: str) -> list:
+        """s를 부분 문자열로 포함하는 텍스트 id 목록을 반환합니다."""
+        if not s:
+            return list(range(len(self.texts)))
+        postings = self.unigrams if len(s) == 1 else self.bigrams
+        grams = _ngrams(s, 1 if len(s) == 1 else 2)
+        lists = sorted((postings.get(gram, []) for gram in grams), key=len)
+        survivors = set(lists[0])
+        for posting in lists[1:]:
+            survivors.intersection_update(posting)
+            if not survivors:
+                break
+        return [i for i in survivors if s in self.texts[i]]
+
+    def contained_in(self, s: str) -> list:
+        """s의 부분 문자열과 정확히 같은 텍스트 id 목록을 반환합니다."""
+        ids = list(self.exact.get("", []))
+        substrings = {s[i:j] for i in range(len(s)) for j in range(i + 1, len(s) + 1)}
+        for substring in substrings:
+            ids.extend(self.exact.get(substring, []))
+        return ids
+
+
+class FuzzyIndex:
+    """한 컬럼의 고유값에 대해 한 번만 생성하는 퍼지 매칭 색인입니다.
+
+    정규화된 문자열, 문자/바이그램 역색인, 한글 자모 트라이그램 역색인을 미리 계산하고
+    점수 계산 전에 조건을 만족할 수 있는 후보만 추려냅니다.
+    """
+
+    def __init__(self, values: list, normalize):
+        self.normalize = normalize
+        self.values = [str(value) for value in values]
+        self.normalized = [normalize(value) for value in self.values]
+        self.position = {}
+        for i, value in enumerate(self.values):
+            self.position.setdefault(value, i)
+
+        self._text_index = _SubstringIndex(self.normalized)
+        self._lengths = np.array([len(text) for text in self.normalized], dtype=np.int64)
+
+        # 문자 빈도 역색인: SequenceMatcher.quick_ratio 상한을 벡터로 계산하기 위함
+        self._char_postings = {}
+        char_rows = defaultdict(lambda: ([], []))
+        for i, text in enumerate(self.normalized):
+            for ch, count in Counter(text).items():
+                ids, counts = char_rows[ch]
+                ids.append(i)
+                counts.append(count)
+        for ch, (ids, counts) in char_rows.items():
+            self._char_postings[ch] = (np.array(ids, dtype=np.int64), np.array(counts, dtype=np.int64))
+
+        # 그룹명 키워드 ("열연수출" 등) 역색인
+        bases = [re.sub(r'\d*그룹.*', '', text) if '그룹' in text else "" for text in self.normalized]
+        self._group_bases = bases
+        self._base_index = _SubstringIndex(bases)
+
+        # 키워드(한글 덩어리/숫자) 및 첫 번째 숫자 역색인
+        self.keywords = [re.findall(r'[가-힣]+|\d+', text) for text in self.normalized]
+        self._keyword_postings = defaultdict(list)
+        for i, keywords in enumerate(self.keywords):
+            for keyword in set(keywords):
+                self._keyword_postings[keyword].append(i)
+        self._first_number_postings = defaultdict(list)
+        for i, value in enumerate(self.values):
+            number = re.search(r'\d+', value)
+            if number:
+                self._first_number_postings[number.group(0)].append(i)
+
+        # 한글 자모 트라이그램 역색인
+        self._jamo_grams = [_ngrams(decompose_jamo(text), 3) for text in self.normalized]
+        self._jamo_postings = defaultdict(list)
+        for i, grams in enumerate(self._jamo_grams):
+            for gram in grams:
+                self._jamo_postings[gram].append(i)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def exact_ids(self, normalized: str) -> list:
+        """정규화 문자열이 정확히 같은 후보 id 목록을 반환합니다."""
+        return self._text_index.exact.get(normalized, [])
+
+    def partial_ids(self, normalized: str) -> set:
+        """양방향 부분 문자열 관계에 있는 후보 id 집합을 반환합니다."""
+        return set(self._text_index.containing(normalized)) | set(self._text_index.contained_in(normalized))
+
+    def group_keyword_ids(self, normalized: str) -> list:
+        """그룹명 핵심 키워드가 포함되는 후보 id 목록을 반환합니다."""
+        if '그룹' not in normalized:
+            return []
+        target_base = re.sub(r'\d*그룹.*', '', normalized)
+        if not target_base:
+            return []
+        return [i for i in self._base_index.containing(target_base) if self._group_bases[i]]
+
+    def keyword_ids(self, keywords: list) -> set:
+        """키워드를 하나 이상 공유하는 후보 id 집합을 반환합니다."""
+        ids = set()
+        for keyword in set(keywords):
+            ids.update(self._keyword_postings.get(keyword, []))
+        return ids
+
+    def first_number_ids(self, number: str) -> list:
+        """원본 값의 첫 번째 숫자가 number인 후보 id 목록을 반환합니다."""
+        return self._first_number_postings.get(number, [])
+
+    def similar(self, normalized: str, min_ratio: float) -> dict:
+        """SequenceMatcher 유사도가 min_ratio 이상인 후보 {id: 유사도}를 반환합니다.
+
+        문자 빈도 겹침으로 quick_ratio 상한을 먼저 계산하여, 상한이 기준에 못 미치는
+        후보는 SequenceMatcher를 실행하지 않습니다.
+        """
+        overlap = np.zeros(len(self.values), dtype=np.int64)
+        for ch, count in Counter(normalized).items():
+            posting = self._char_postings.get(ch)
+            if posting is not None:
+                ids, counts = posting
+                overlap[ids] += np.minimum(counts, count)
+
+        total_lengths = self._lengths + len(normalized)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            upper_bound = np.where(total_lengths > 0, 2.0 * overlap / total_lengths, 1.0)
+
+        # ratio()는 인자 순서에 따라 달라질 수 있으므로 기존과 같이 (대상, 후보) 순서 유지
+        matcher = SequenceMatcher(None, normalized, "")
+        scores = {}
+        for i in np.flatnonzero(upper_bound >= min_ratio):
+            matcher.set_seq2(self.normalized[i])
+            ratio = matcher.ratio()
+            if ratio >= min_ratio:
+                scores[int(i)] = ratio
+        return scores
+
+    def jamo_similar(self, normalized: str, min_score: float) -> dict:
+        """자모 트라이그램 Dice 계수가 min_score 이상인 후보 {id: 점수}를 반환합니다."""
+        target_grams = _ngrams(decompose_jamo(normalized), 3)
+        if not target_grams:
+            return {}
+        shared = Counter()
+        for gram in target_grams:
+            shared.update(self._jamo_postings.get(gram, []))
+        scores = {}
+        for i, common in shared.items():
+            dice = 2.0 * common / (len(target_grams) + len(self._jamo_grams[i]))
+            if dice >= min_score:
+                scores[i] = dice
+        return scores
+
+    def candidate_order(self, candidates) -> np.ndarray:
+        """후보 목록 순서를 색인 id 기준 순위 배열로 변환합니다. (목록에 없으면 제외)"""
+        if candidates is None:
+            return np.arange(len(self.values))
+        order = np.full(len(self.values), -1, dtype=np.int64)
+        for rank, candidate in enumerate(candidates):
+            i = self.position.get(str(candidate))
+            if i is not None and order[i] < 0:
+                order[i] = rank
+        return order
+
+    def match(self, target: str, candidates: list = None, min_similarity: float = 0.7) -> tuple:
+        """_find_best_match와 같은 규칙으로 최적 후보를 찾습니다.
+
+        점수 규칙: 정확 매칭 1.0, 부분 매칭 0.9, 유사도(min_similarity 이상), 그룹 키워드 0.8.
+        최고 점수가 같으면 candidates 순서상 앞선 후보를 선택합니다.
+        candidates를 주면 그 목록에 포함된 값만 후보로 사용합니다.
+
+        Returns:
+            (best_match, confidence, match_type)
+        """
+        if not target or not self.values:
+            return None, 0.0, 'no_input'
+
+        order = self.candidate_order(candidates)
+        allowed = lambda i: order[i] >= 0
+
+        normalized = self.normalize(target)
+        exact = [i for i in self.exact_ids(normalized) if allowed(i)]
+        if exact:
+            best = min(exact, key=lambda i: order[i])
+            return self.values[best], 1.0, 'exact'
+
+        scored = {}
+        for i in self.partial_ids(normalized):
+            scored[i] = (0.9, 'partial')
+        for i, ratio in self.similar(normalized, min_similarity).items():
+            if ratio > scored.get(i, (0.0, None))[0]:
+                scored[i] = (ratio, 'similarity')
+        for i in self.group_keyword_ids(normalized):
+            if 0.8 > scored.get(i, (0.0, None))[0]:
+                scored[i] = (0.8, 'group_keyword')
+
+        scored = {i: value for i, value in scored.items() if allowed(i)}
+        if not scored:
+            # 기존 규칙으로 후보가 없을 때만 자모 단위 오타 허용 매칭
+            jamo = {i: score for i, score in self.jamo_similar(normalized, JAMO_MIN_SIMILARITY).items() if allowed(i)}
+            if not jamo:
+                return None, 0.0, 'no_match'
+            scored = {i: (score, 'jamo_match') for i, score in jamo.items()}
+
+        best = min(scored, key=lambda i: (-scored[i][0], order[i]))
+        score, match_type = scored[best]
+        return self.values[best], score, match_type
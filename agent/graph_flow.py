@@ -1,18 +1,39 @@
 import os
 import operator
-from typing import TypedDict, Annotated, List, Any
+import threading
+import time
+from typing import TypedDict, Annotated, List
 
 from dotenv import load_dotenv
 from langchain_core.messages import AnyMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_openai import ChatOpenAI
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+
+from agent.entity_extractor import get_entity_extractor
+from agent.dataset_registry import dataset_registry
+from agent.parallel_tools import ParallelToolAgentExecutor
+from agent.tool_registry import registered_tools, select_tools, tool_schema_tokens
+from agent.plan_executor import execute_plan, is_scalar_question, plan_messages, plan_step
 
 # --- 1. 설정 (Configuration) ---
 # 스크립트의 주요 설정을 상단에 상수로 정의하여 관리합니다.
 MODEL_NAME = "gpt-4o"
 ROUTING_KEYWORDS = ["사업실", "그룹", "판매량", "매출액", "영업이익", "세전이익","공급사", "고객사", "국가"]
+# 실행 계획 신뢰도가 이 값 이상일 때만 LLM 없이 빠른 답변 경로를 사용 (환경변수로 조정 가능)
+QUICK_ANSWER_MIN_CONFIDENCE = float(os.getenv("QUICK_ANSWER_MIN_CONFIDENCE", "0.5"))
+# 빠른 답변 경로가 처리하는 실행 전략 (비교 분석 등은 에이전트가 처리)
+QUICK_ANSWER_STRATEGIES = ["single_column_query", "multi_column_query", "general_analysis"]
+# 지표-키워드 매핑 (tools.py와 동일)
+METRIC_KEYWORDS = {
+    "매출수량(M/T)": ["매출수량", "판매량", "수량", "톤"],
+    "1.매출액": ["매출액", "매출", "sales"],
+    "5.영업이익": ["영업이익", "이익", "profit"],
+    "8.세전이익": ["세전이익", "세전"]
+}
 
 # 프롬프트 로더 import
 try:
@@ -27,9 +48,11 @@ class AgentState(TypedDict):
     input: str
     output: str
     chat_history: Annotated[List[AnyMessage], operator.add]
-    df: Any
+    # 데이터는 상태에 넣지 않고 dataset_registry 핸들로 참조 (체크포인트 직렬화 크기 최소화)
+    dataset_handle: str  # 현재 활성 데이터셋 핸들
     # 다중 데이터셋 관련
-    datasets_info: dict  # 다중 데이터셋 정보 {name: dataframe}
+    datasets_handle: str  # 다중 데이터셋 {name: dataframe} 핸들
+    dataset_names: list  # 다중 데이터셋 이름 목록
     dataset_count: int   # 업로드된 데이터셋 수
     is_multi_dataset: bool  # 다중 파일 여부
     active_dataset_name: str  # 현재 활성 데이터셋 이름
@@ -42,29 +65,136 @@ class AgentState(TypedDict):
     processing_path: str
     # Query Planning Node 관련
     query_plan: dict
+    plan_execution: dict  # 실행 계획 사전 실행 결과 (도구, 입력, 결과)
+    # 답변 출처 및 도구 실행 내역
+    source_info: str
+    intermediate_steps: list
+    tool_scope: dict  # 답변 에이전트에 노출한 도구와 스키마 토큰 수
+    # 다중 데이터셋 분기(데이터셋별 서브 에이전트) 결과 - 병렬 분기들의 결과를 이어 붙임
+    dataset_results: Annotated[list, operator.add]
+
+def state_dataframe(state: AgentState):
+    """상태의 핸들로 현재 활성 DataFrame을 조회합니다. 등록되지 않은 핸들이면 None을 반환합니다."""
+    return dataset_registry.resolve(state.get("dataset_handle"))
+
+def state_datasets(state: AgentState) -> dict:
+    """상태의 핸들로 다중 데이터셋 {name: dataframe}을 조회합니다. 없으면 빈 dict를 반환합니다."""
+    return dataset_registry.resolve(state.get("datasets_handle")) or {}
 
 # --- 3. 에이전트 및 그래프 구성 요소 (Agent & Graph Components) ---
 
 def create_agent_executor(api_key: str, tools: list) -> AgentExecutor:
-    """AgentExecutor를 생성하고 반환합니다."""
+    """AgentExecutor를 생성하고 반환합니다.
+
+    모델이 한 번의 응답에 여러 도구 호출(tool_calls)을 담을 수 있고, 이 호출들은 동시에 실행됩니다.
+    """
     llm = ChatOpenAI(model=MODEL_NAME, temperature=0, openai_api_key=api_key)
     
     prompt = ChatPromptTemplate.from_messages([
         ("system", SYSTEM_PROMPT),
         MessagesPlaceholder("chat_history"),
         ("human", "{input}"),
+        # 실행 계획 단계에서 미리 실행한 도구 호출/결과 (없으면 비어 있음)
+        MessagesPlaceholder("precomputed_steps", optional=True),
         MessagesPlaceholder("agent_scratchpad")
     ])
     
-    agent = create_openai_functions_agent(llm=llm, tools=tools, prompt=prompt)
+    agent = create_openai_tools_agent(llm=llm, tools=tools, prompt=prompt)
     
-    return AgentExecutor(
+    return ParallelToolAgentExecutor(
         agent=agent,
         tools=tools,
         verbose=True,
         handle_parsing_errors=True # 파싱 에러 발생 시 에이전트가 강건하게 대응하도록 설정
     )
 
+class AgentExecutorCache:
+    """노출 도구 부분집합별 AgentExecutor 캐시입니다.
+
+    요청마다 의도에 맞는 도구만 모델에 전달하여 함수 스키마 토큰을 줄이고,
+    같은 부분집합의 실행기는 다시 만들지 않고 재사용합니다.
+    """
+
+    def __init__(self, build):
+        self.build = build  # build(tools) → AgentExecutor
+        self._executors = {}  # 도구명 튜플 → (AgentExecutor, 도구 범위 정보)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tools: list) -> tuple:
+        """도구 목록에 해당하는 (AgentExecutor, 도구 범위 정보)를 반환합니다. 없으면 만들어 보관합니다."""
+        key = tuple(tool.name for tool in tools)
+        with self._lock:
+            entry = self._executors.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            tokens, exact = tool_schema_tokens(tools)
+            all_tokens, _ = tool_schema_tokens(registered_tools)
+            scope = {
+                "tools": list(key),
+                "tool_count": len(tools),
+                "all_tool_count": len(registered_tools),
+                "schema_tokens": tokens,
+                "all_schema_tokens": all_tokens,
+                "exact_tokens": exact,
+            }
+            entry = (self.build(tools), scope)
+            self._executors[key] = entry
+        print(f"에이전트 실행기 생성: 도구 {len(tools)}/{len(registered_tools)}개, "
+              f"스키마 토큰 {tokens:,}/{all_tokens:,}{'' if exact else ' (추정)'}")
+        return entry
+
+    def for_request(self, predicted_tools: list = None, dataset_count: int = 1, required: list = None,
+                    confidence: float = None) -> tuple:
+        """예측 도구, 의도 신뢰도, 데이터셋 수로 고른 도구 부분집합(select_tools)의 실행기를 반환합니다."""
+        return self.get(select_tools(predicted_tools, dataset_count, required, confidence))
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 횟수와 부분집합별 스키마 토큰 수를 반환합니다."""
+        with self._lock:
+            return {
+                "entries": len(self._executors),
+                "hits": self.hits,
+                "misses": self.misses,
+                "subsets": [scope for _, scope in self._executors.values()],
+            }
+
+# 스트리밍 진행 이벤트에 포함하는 도구 결과 미리보기 길이
+PROGRESS_PREVIEW_CHARS = 300
+
+def emit_progress(event: dict):
+    """그래프를 stream_mode="custom"으로 실행 중이면 진행 이벤트를 보냅니다. (invoke 실행에서는 무시)"""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:  # 그래프 밖에서 노드 함수를 직접 호출한 경우
+        return
+    writer(event)
+
+def run_agent(agent_executor: AgentExecutor, inputs: dict, dataset_name: str = None) -> dict:
+    """에이전트를 단계별로 실행하며 도구 호출 시작/완료를 진행 이벤트로 보냅니다.
+
+    답변 토큰은 LLM 콜백을 통해 그래프의 "messages" 스트림으로 전달됩니다.
+    dataset_name이 있으면(데이터셋별 분기) 진행 이벤트에 데이터셋 이름을 함께 넣습니다.
+
+    Returns:
+        {'output', 'intermediate_steps'} (intermediate_steps는 (AgentAction, observation) 목록)
+    """
+    output, steps = "", []
+    origin = {"dataset": dataset_name} if dataset_name else {}
+    for chunk in agent_executor.stream(inputs):
+        for action in chunk.get("actions", []):
+            emit_progress({"type": "tool_start", "tool": action.tool, "tool_input": action.tool_input, **origin})
+        for step in chunk.get("steps", []):
+            steps.append((step.action, step.observation))
+            emit_progress({"type": "tool_end", "tool": step.action.tool,
+                           "observation": str(step.observation)[:PROGRESS_PREVIEW_CHARS], **origin})
+        if "output" in chunk:
+            output = chunk["output"]
+    return {"output": output, "intermediate_steps": steps}
+
 # --- 노드 함수들 ---
 def router_node(state: AgentState) -> dict:
     """상태를 변경하지 않는 라우팅 진입점 노드입니다."""
@@ -81,10 +211,14 @@ def context_aware_node(state: AgentState) -> dict:
     # 참조어 패턴 정의
     reference_patterns = ["그것", "이전", "앞서", "더", "또한", "그 결과", "그런데", "그리고"]
     
+    # 업로드 시 생성된 데이터 기반 엔티티 추출기 (데이터셋의 차원 고유값으로 구성)
+    extractor = get_entity_extractor(state_dataframe(state))
+    
     context_info = {
         "has_reference": False,
         "reference_type": None,
         "previous_entities": [],
+        "current_entities": extractor.extract(current_input) if extractor else {},
         "enhancement_applied": False
     }
     
@@ -103,7 +237,11 @@ def context_aware_node(state: AgentState) -> dict:
         entities = []
         
         for conv in last_conversations:
-            if isinstance(conv, str):
+            # 데이터에 존재하는 차원 값이 있으면 그 값을 엔티티로 사용
+            data_entities = [hit["value"] for hit in extractor.find(conv)] if extractor and isinstance(conv, str) else []
+            if data_entities:
+                entities.extend(data_entities)
+            elif isinstance(conv, str):
                 # 주요 키워드 추출
                 keywords = ["사업실", "그룹", "매출", "수량", "영업이익", "세전이익"]
                 for keyword in keywords:
@@ -207,7 +345,7 @@ def intent_classification_node(state: AgentState) -> dict:
     processing_path = "agent_node"  # 기본값
     
     if detected_intent == "aggregation" and complexity == "low":
-        processing_path = "quick_answer_node"  # 향후 구현 예정
+        processing_path = "quick_answer_node"  # LLM 없이 집계 엔진으로 바로 답변
     elif not any(keyword in input_text for keyword in ROUTING_KEYWORDS):
         processing_path = "fallback_node"
     
@@ -232,6 +370,26 @@ def intent_classification_node(state: AgentState) -> dict:
         "processing_path": processing_path
     }
 
+def detect_metrics(text: str) -> list:
+    """질문에 언급된 지표를 METRIC_KEYWORDS 순서로 반환합니다.
+
+    긴 키워드부터 매칭하고 이미 매칭된 구간 안의 짧은 키워드는 무시합니다.
+    ("세전이익"의 "이익"이 영업이익으로, "매출수량"의 "매출"이 매출액으로 잡히지 않도록)
+    """
+    keywords = sorted(((keyword, metric) for metric, words in METRIC_KEYWORDS.items() for keyword in words),
+                      key=lambda item: -len(item[0]))
+    taken = [False] * len(text)
+    found = set()
+    for keyword, metric in keywords:
+        start = text.find(keyword)
+        while start >= 0:
+            end = start + len(keyword)
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * len(keyword)
+                found.add(metric)
+            start = text.find(keyword, start + 1)
+    return [metric for metric in METRIC_KEYWORDS if metric in found]
+
 def query_planning_node(state: AgentState) -> dict:
     """복잡한 질문을 분석하고 최적의 실행 계획을 수립합니다."""
     print("--- Query Planning 노드 실행 ---")
@@ -249,24 +407,24 @@ def query_planning_node(state: AgentState) -> dict:
         "FundsCenter": ["그룹", "센터", "funds", "펀드"]
     }
     
-    metric_keywords = {
-        "매출수량(M/T)": ["매출수량", "판매량", "수량", "톤"],
-        "1.매출액": ["매출액", "매출", "sales"],
-        "5.영업이익": ["영업이익", "이익", "profit"],
-        "8.세전이익": ["세전이익", "세전"]
-    }
-    
     # 필요한 컬럼들 감지
     required_columns = []
     detected_metrics = []
     
+    # 데이터 기반 엔티티 추출 (질문에 실제 차원 값이 등장하면 해당 컬럼도 필요 컬럼으로 포함)
+    extractor = get_entity_extractor(state_dataframe(state))
+    entity_hits = extractor.find(state.get("enhanced_input", state["input"])) if extractor else []
+    hit_columns = {hit["column"] for hit in entity_hits}
+    detected_entities = {}
+    for hit in entity_hits:
+        detected_entities.setdefault(hit["entity"], hit["value"])
+    
     for column, keywords in column_keywords.items():
-        if any(keyword in input_text for keyword in keywords):
+        if column in hit_columns or any(keyword in input_text for keyword in keywords):
             required_columns.append(column)
+    required_columns.extend(col for col in sorted(hit_columns) if col not in column_keywords)
     
-    for metric, keywords in metric_keywords.items():
-        if any(keyword in input_text for keyword in keywords):
-            detected_metrics.append(metric)
+    detected_metrics = detect_metrics(input_text)
     
     # 기본 메트릭 설정
     if not detected_metrics:
@@ -304,8 +462,9 @@ def query_planning_node(state: AgentState) -> dict:
         execution_plan["strategy"] = "comparative_analysis"
         execution_plan["recommended_tools"] = ["comparative_analysis_tool"]
         
-        # 비교 대상 추출 시도
-        comparison_entities = extract_comparison_entities(input_text)
+        # 비교 대상 추출 시도 (데이터 값이 2개 이상 언급되면 그 값을 우선 사용)
+        data_values = list(dict.fromkeys(hit["value"] for hit in entity_hits))
+        comparison_entities = data_values[:4] if len(data_values) >= 2 else extract_comparison_entities(input_text)
         execution_plan["parameters"] = {
             "comparison_detected": True,
             "entities": comparison_entities,
@@ -319,6 +478,7 @@ def query_planning_node(state: AgentState) -> dict:
         execution_plan["parameters"] = {
             "filter_columns": required_columns,
             "metrics": detected_metrics,
+            "entities": detected_entities,
             "complexity": query_complexity
         }
     
@@ -328,7 +488,8 @@ def query_planning_node(state: AgentState) -> dict:
         execution_plan["recommended_tools"] = ["existing_single_tools"]
         execution_plan["parameters"] = {
             "column": required_columns[0],
-            "metric": detected_metrics[0]
+            "metric": detected_metrics[0],
+            "entities": detected_entities
         }
     
     # 일반 계획
@@ -338,7 +499,8 @@ def query_planning_node(state: AgentState) -> dict:
     
     query_plan = {
         "required_columns": required_columns,
-        "detected_metrics": detected_metrics, 
+        "detected_metrics": detected_metrics,
+        "detected_entities": detected_entities,
         "complexity": query_complexity,
         "complexity_indicators": complexity_indicators,
         "execution_plan": execution_plan,
@@ -360,7 +522,7 @@ def multi_context_aware_node(state: AgentState) -> dict:
     
     current_input = state["input"]
     chat_history = state.get("chat_history", [])
-    datasets_info = state.get("datasets_info", {})
+    dataset_names = state.get("dataset_names", [])
     
     # 다중 파일 관련 참조어 패턴
     multi_ref_patterns = ["두 파일", "각 파일", "파일들", "비교", "차이", "모든", "전체"]
@@ -368,7 +530,7 @@ def multi_context_aware_node(state: AgentState) -> dict:
     context_info = {
         "has_reference": False,
         "multi_dataset_context": True,
-        "available_datasets": list(datasets_info.keys()),
+        "available_datasets": dataset_names,
         "enhancement_applied": False
     }
     
@@ -383,10 +545,10 @@ def multi_context_aware_node(state: AgentState) -> dict:
         context_info["has_reference"] = True
         
         # 데이터셋 정보를 컨텍스트에 추가
-        if len(datasets_info) >= 2:
-            dataset_hint = f"\n\n💡 업로드된 데이터셋: {', '.join(list(datasets_info.keys())[:3])}"
-            if len(datasets_info) > 3:
-                dataset_hint += f" 외 {len(datasets_info)-3}개"
+        if len(dataset_names) >= 2:
+            dataset_hint = f"\n\n💡 업로드된 데이터셋: {', '.join(dataset_names[:3])}"
+            if len(dataset_names) > 3:
+                dataset_hint += f" 외 {len(dataset_names)-3}개"
             enhanced_input = current_input + dataset_hint
             context_info["enhancement_applied"] = True
     
@@ -405,7 +567,7 @@ def multi_intent_classification_node(state: AgentState) -> dict:
     print("--- Multi Dataset Intent Classification 노드 실행 ---")
     
     input_text = state.get("enhanced_input", state["input"]).lower()
-    datasets_info = state.get("datasets_info", {})
+    dataset_names = state.get("dataset_names", [])
     
     # 다중 데이터셋 특화 의도 패턴
     multi_intent_patterns = {
@@ -429,7 +591,7 @@ def multi_intent_classification_node(state: AgentState) -> dict:
     
     # 다중 데이터셋 복잡도 분석
     complexity_indicators = {
-        "high": len(datasets_info) >= 3,  # 3개 이상 파일
+        "high": len(dataset_names) >= 3,  # 3개 이상 파일
         "comparison_complex": any(word in input_text for word in ["세부", "상세", "분석"]),
         "cross_reference": any(word in input_text for word in ["각각", "서로", "간의"])
     }
@@ -452,12 +614,12 @@ def multi_intent_classification_node(state: AgentState) -> dict:
         "complexity": complexity,
         "predicted_tools": predicted_tools,
         "processing_path": "multi_dataset_agent",
-        "dataset_count": len(datasets_info),
+        "dataset_count": len(dataset_names),
         "multi_dataset_specific": True
     }
     
     print(f"다중 데이터셋 의도: {detected_intent} (신뢰도: {confidence:.2f})")
-    print(f"복잡도: {complexity}, 데이터셋 수: {len(datasets_info)}")
+    print(f"복잡도: {complexity}, 데이터셋 수: {len(dataset_names)}")
     
     return {
         "intent_info": intent_info,
@@ -470,15 +632,15 @@ def multi_query_planning_node(state: AgentState) -> dict:
     
     input_text = state.get("enhanced_input", state["input"]).lower()
     intent_info = state.get("intent_info", {})
-    datasets_info = state.get("datasets_info", {})
+    dataset_names = state.get("dataset_names", [])
     
     # 다중 데이터셋 실행 계획
     execution_plan = {
         "strategy": "multi_dataset_analysis",
         "recommended_tools": [],
         "parameters": {
-            "dataset_count": len(datasets_info),
-            "dataset_names": list(datasets_info.keys())
+            "dataset_count": len(dataset_names),
+            "dataset_names": dataset_names
         }
     }
     
@@ -504,11 +666,11 @@ def multi_query_planning_node(state: AgentState) -> dict:
     query_plan = {
         "strategy": execution_plan["strategy"],
         "execution_plan": execution_plan,
-        "confidence": min(0.9, 0.5 + 0.1 * len(datasets_info)),
+        "confidence": min(0.9, 0.5 + 0.1 * len(dataset_names)),
         "multi_dataset_optimized": True,
         "dataset_info": {
-            "count": len(datasets_info),
-            "names": list(datasets_info.keys())[:3]  # 처음 3개만
+            "count": len(dataset_names),
+            "names": dataset_names[:3]  # 처음 3개만
         }
     }
     
@@ -547,25 +709,39 @@ def dataset_routing_node(state: AgentState) -> str:
         print(">> 경로: 단일 데이터셋 경로")
         return "single_dataset_path"
 
-def single_dataset_agent(state: AgentState, agent_executor: AgentExecutor) -> dict:
-    """단일 데이터셋 전용 처리 노드입니다."""
+def single_dataset_agent(state: AgentState, agent_executors: AgentExecutorCache) -> dict:
+    """단일 데이터셋 전용 처리 노드입니다. (의도에 맞는 단일 데이터셋 도구만 노출)"""
     print("--- 단일 데이터셋 에이전트 실행 ---")
     
     # 기존 agent_node와 동일한 로직
     import agent.tools as tools_module
-    if hasattr(tools_module, 'set_dataframe'):
-        tools_module.set_dataframe(state["df"])
     
     input_to_use = state.get("enhanced_input", state["input"])
     print(f"사용할 입력: {input_to_use}")
     
-    result = agent_executor.invoke({
-        "input": input_to_use,
-        "chat_history": state["chat_history"]
-    })
+    # 실행 계획 단계의 도구 결과를 관찰값으로 전달하여 추가 함수 호출 없이 답변하도록 함
+    plan_execution = state.get("plan_execution") or {}
+    # 미리 실행한 도구는 대화에 호출 기록이 남으므로 노출 도구에 포함
+    intent_info = state.get("intent_info") or {}
+    agent_executor, tool_scope = agent_executors.for_request(
+        intent_info.get("predicted_tools"),
+        dataset_count=1,
+        required=[plan_execution["tool"]] if plan_execution else None,
+        confidence=intent_info.get("confidence")
+    )
+    # 도구들은 이 요청의 DataFrame만 사용 (동시 세션과 분리)
+    with tools_module.dataset_context(df=state_dataframe(state)):
+        result = run_agent(agent_executor, {
+            "input": input_to_use,
+            "chat_history": state["chat_history"],
+            "precomputed_steps": plan_messages(plan_execution)
+        })
+    intermediate_steps = result.get("intermediate_steps", [])
+    if plan_execution:
+        intermediate_steps = [plan_step(plan_execution)] + list(intermediate_steps)
     
     # 단일 파일 출처 정보
-    df = state.get("df")
+    df = state_dataframe(state)
     dataset_name = state.get("active_dataset_name", "업로드된 파일")
     sheet_info = f"📊 **데이터 출처:** {dataset_name}"
     
@@ -574,61 +750,150 @@ def single_dataset_agent(state: AgentState, agent_executor: AgentExecutor) -> di
     
     return {
         "output": result["output"],
-        "intermediate_steps": result.get("intermediate_steps", []),
-        "source_info": sheet_info
+        "intermediate_steps": intermediate_steps,
+        "source_info": sheet_info,
+        "tool_scope": tool_scope
     }
 
-def multi_dataset_agent(state: AgentState, agent_executor: AgentExecutor) -> dict:
-    """다중 데이터셋 전용 처리 노드입니다."""
+def fan_out_datasets(state: AgentState):
+    """다중 데이터셋 경로를 데이터셋마다 하나의 분기(dataset_branch_agent)로 나눕니다.
+
+    분기들은 같은 단계에서 동시에 실행되므로, 파일 수가 늘어도 응답 시간은 가장 느린 분기 수준으로 유지됩니다.
+    데이터셋이 하나 이하이면 분기 없이 바로 다중 데이터셋 에이전트로 진행합니다.
+    """
+    dataset_names = state.get("dataset_names") or list(state_datasets(state))
+    if len(dataset_names) < 2:
+        return "multi_dataset_agent"
+
+    # 모든 분기가 각자의 시트를 사용하므로 파싱 전 시트를 프로세스 풀에서 미리 병렬 파싱
+    datasets_info = state_datasets(state)
+    if hasattr(datasets_info, "prefetch"):
+        for (file_name, sheet_name), error in datasets_info.prefetch().items():
+            print(f"시트 미리 파싱 실패 ({file_name} - {sheet_name}): {error}")
+
+    input_to_use = state.get("enhanced_input", state["input"])
+    print(f"데이터셋별 분기 실행: {dataset_names}")
+    return [
+        Send("dataset_branch_agent", {
+            "input": input_to_use,
+            "chat_history": state.get("chat_history", []),
+            "datasets_handle": state.get("datasets_handle"),
+            "dataset_name": name,
+        })
+        for name in dataset_names
+    ]
+
+def dataset_branch_agent(branch: dict, agent_executors: AgentExecutorCache) -> dict:
+    """데이터셋 하나만 분석하는 분기 노드입니다. (fan_out_datasets가 데이터셋마다 하나씩 실행)
+
+    도구는 이 분기의 데이터셋만 보도록 dataset_context로 범위를 좁히고, 단일 데이터셋 도구만 노출합니다.
+    분기 하나가 실패해도 나머지 결과로 종합할 수 있도록 오류는 결과에 기록합니다.
+    """
+    dataset_name = branch["dataset_name"]
+    print(f"--- 데이터셋 분기 에이전트 실행: {dataset_name} ---")
+    
+    import agent.tools as tools_module
+    
+    start = time.perf_counter()
+    result = {"dataset": dataset_name, "output": "", "intermediate_steps": [], "rows": None, "columns": None}
+    try:
+        df = state_datasets(branch)[dataset_name]
+        result["rows"], result["columns"] = len(df), len(df.columns)
+        
+        input_to_use = (f"{branch['input']}\n\n💡 참고: '{dataset_name}' 데이터셋만 분석합니다. "
+                        "이 데이터셋의 결과를 수치와 함께 간결하게 답변하세요.")
+        agent_executor, _ = agent_executors.for_request(dataset_count=1)
+        with tools_module.dataset_context(df=df, datasets={dataset_name: df}):
+            answer = run_agent(agent_executor, {
+                "input": input_to_use,
+                "chat_history": branch["chat_history"]
+            }, dataset_name=dataset_name)
+        result["output"] = answer["output"]
+        result["intermediate_steps"] = answer.get("intermediate_steps", [])
+    except Exception as e:
+        result["output"] = f"❌ 분석 중 오류가 발생했습니다: {str(e)}"
+    result["elapsed_seconds"] = time.perf_counter() - start
+    
+    return {"dataset_results": [result]}
+
+def multi_dataset_agent(state: AgentState, agent_executors: AgentExecutorCache) -> dict:
+    """다중 데이터셋 전용 처리 노드입니다.
+
+    데이터셋별 분기 결과(dataset_results)가 있으면 이를 모아(fan-in) 데이터셋 간 비교 답변을 종합합니다.
+    분기 결과가 없으면 다중 데이터셋 도구로 직접 분석합니다.
+    """
     print("--- 다중 데이터셋 에이전트 실행 ---")
     
-    datasets_info = state.get("datasets_info", {})
+    datasets_info = state_datasets(state)
     input_text = state.get("enhanced_input", state["input"]).lower()
     
-    # 다중 데이터셋 도구 설정
     import agent.tools as tools_module
-    if hasattr(tools_module, 'set_datasets'):
-        tools_module.set_datasets(datasets_info)
-        print(f"다중 데이터셋 설정 완료: {list(datasets_info.keys())}")
-    
-    # 현재 활성 데이터셋도 단일 도구들을 위해 설정
-    if hasattr(tools_module, 'set_dataframe') and state.get("df") is not None:
-        tools_module.set_dataframe(state["df"])
     
     input_to_use = state.get("enhanced_input", state["input"])
     
-    # 비교 분석 의도가 명확한 경우 힌트 추가
-    comparison_keywords = ["비교", "compare", "vs", "대비", "차이"]
-    has_comparison = any(keyword in input_text for keyword in comparison_keywords)
+    # 분기 결과를 업로드 순서대로 정렬 (병렬 분기의 완료 순서와 무관)
+    order = {name: i for i, name in enumerate(state.get("dataset_names") or datasets_info)}
+    dataset_results = sorted(state.get("dataset_results") or [],
+                             key=lambda item: order.get(item["dataset"], len(order)))
     
-    if has_comparison and len(datasets_info) >= 2:
-        comparison_hint = f"\n\n💡 참고: 현재 {len(datasets_info)}개 데이터셋 업로드됨 - "
-        comparison_hint += "compare_datasets_summary(), compare_datasets_metrics(), compare_datasets_by_division() 등의 도구 사용 권장"
-        input_to_use += comparison_hint
+    if dataset_results:
+        findings = "\n\n".join(f"### {item['dataset']}\n{item['output']}" for item in dataset_results)
+        input_to_use += (f"\n\n[데이터셋별 분석 결과]\n{findings}\n\n"
+                         "💡 참고: 위 데이터셋별 결과를 바탕으로 데이터셋 간 비교를 종합해 답변하세요. "
+                         "결과에 없는 수치가 필요할 때만 도구를 사용하세요.")
+    else:
+        # 비교 분석 의도가 명확한 경우 힌트 추가
+        comparison_keywords = ["비교", "compare", "vs", "대비", "차이"]
+        has_comparison = any(keyword in input_text for keyword in comparison_keywords)
+        
+        if has_comparison and len(datasets_info) >= 2:
+            comparison_hint = f"\n\n💡 참고: 현재 {len(datasets_info)}개 데이터셋 업로드됨 - "
+            comparison_hint += "compare_datasets_summary(), compare_datasets_metrics(), compare_datasets_by_division() 등의 도구 사용 권장"
+            input_to_use += comparison_hint
     
     print(f"다중 데이터셋 질문: {input_to_use}")
     
-    result = agent_executor.invoke({
-        "input": input_to_use,
-        "chat_history": state["chat_history"]
-    })
+    intent_info = state.get("intent_info") or {}
+    agent_executor, tool_scope = agent_executors.for_request(
+        intent_info.get("predicted_tools"),
+        dataset_count=len(datasets_info),
+        confidence=intent_info.get("confidence")
+    )
+    
+    # 다중 데이터셋 도구와, 단일 도구용 현재 활성 데이터셋을 이 요청 범위에서 설정
+    with tools_module.dataset_context(df=state_dataframe(state), datasets=datasets_info):
+        print(f"다중 데이터셋 설정 완료: {list(datasets_info.keys())}")
+        result = run_agent(agent_executor, {
+            "input": input_to_use,
+            "chat_history": state["chat_history"]
+        })
     
-    # 다중 파일 출처 정보
+    # 다중 파일 출처 정보 (분기 결과가 있으면 데이터셋별 분석 시간 포함)
     source_info = f"📊 **데이터 출처:** {len(datasets_info)}개 데이터셋\n"
-    for name, df in datasets_info.items():
-        source_info += f"  • {name}: {len(df):,}행 × {len(df.columns)}개 컬럼\n"
+    if dataset_results:
+        for item in dataset_results:
+            shape = f"{item['rows']:,}행 × {item['columns']}개 컬럼" if item["rows"] is not None else "불러오기 실패"
+            source_info += f"  • {item['dataset']}: {shape} (분석 {item['elapsed_seconds']:.1f}초)\n"
+    else:
+        for name, df in datasets_info.items():
+            source_info += f"  • {name}: {len(df):,}행 × {len(df.columns)}개 컬럼\n"
+    
+    # 계산 과정: 데이터셋별 분기의 도구 호출 후 종합 단계의 도구 호출
+    intermediate_steps = [step for item in dataset_results for step in item["intermediate_steps"]]
+    intermediate_steps += result.get("intermediate_steps", [])
     
     return {
         "output": result["output"],
-        "intermediate_steps": result.get("intermediate_steps", []),
-        "source_info": source_info.strip()
+        "intermediate_steps": intermediate_steps,
+        "source_info": source_info.strip(),
+        "tool_scope": tool_scope
     }
 
 def dataset_comparison_node(state: AgentState) -> dict:
     """데이터셋 간 비교 전용 노드입니다."""
     print("--- 데이터셋 비교 노드 실행 ---")
     
-    datasets_info = state.get("datasets_info", {})
+    datasets_info = state_datasets(state)
     
     if len(datasets_info) < 2:
         return {
@@ -638,33 +903,32 @@ def dataset_comparison_node(state: AgentState) -> dict:
     
     # 기본 비교 분석 수행
     import agent.tools as tools_module
-    if hasattr(tools_module, 'set_datasets'):
-        tools_module.set_datasets(datasets_info)
     
-    try:
-        # compare_datasets_summary 도구 직접 호출
-        if hasattr(tools_module, 'compare_datasets_summary'):
-            summary_result = tools_module.compare_datasets_summary()
-        else:
-            summary_result = "비교 도구를 사용할 수 없습니다."
+    with tools_module.dataset_context(datasets=datasets_info):
+        try:
+            # compare_datasets_summary 도구 직접 호출
+            if hasattr(tools_module, 'compare_datasets_summary'):
+                summary_result = tools_module.compare_datasets_summary()
+            else:
+                summary_result = "비교 도구를 사용할 수 없습니다."
         
-        # 추가 메트릭 비교
-        if hasattr(tools_module, 'compare_datasets_metrics'):
-            metrics_result = tools_module.compare_datasets_metrics("매출수량(M/T)")
-            full_result = f"{summary_result}\n\n{metrics_result}"
-        else:
-            full_result = summary_result
+            # 추가 메트릭 비교
+            if hasattr(tools_module, 'compare_datasets_metrics'):
+                metrics_result = tools_module.compare_datasets_metrics("매출수량(M/T)")
+                full_result = f"{summary_result}\n\n{metrics_result}"
+            else:
+                full_result = summary_result
         
-        return {
-            "output": full_result,
-            "source_info": f"📊 {len(datasets_info)}개 데이터셋 자동 비교 분석 완료"
-        }
+            return {
+                "output": full_result,
+                "source_info": f"📊 {len(datasets_info)}개 데이터셋 자동 비교 분석 완료"
+            }
         
-    except Exception as e:
-        return {
-            "output": f"❌ 데이터셋 비교 중 오류가 발생했습니다: {str(e)}",
-            "source_info": "비교 분석 오류"
-        }
+        except Exception as e:
+            return {
+                "output": f"❌ 데이터셋 비교 중 오류가 발생했습니다: {str(e)}",
+                "source_info": "비교 분석 오류"
+            }
 
 def extract_comparison_entities(text: str) -> list:
     """비교 대상 엔티티를 추출합니다."""
@@ -693,9 +957,10 @@ def enhanced_route_logic(state: AgentState) -> str:
     
     print(f">> Intent 기반 경로: {processing_path}")
     
-    # 현재는 quick_answer_node가 없으므로 agent_node로 라우팅
+    # 빠른 답변은 실행 계획 신뢰도가 기준 이상일 때만 사용
     if processing_path == "quick_answer_node":
-        return "agent_node"
+        if state.get("query_plan", {}).get("confidence", 0.0) < QUICK_ANSWER_MIN_CONFIDENCE:
+            return "agent_node"
     
     return processing_path
 
@@ -714,23 +979,22 @@ def agent_node(state: AgentState, agent_executor: AgentExecutor) -> dict:
     """데이터 분석을 수행하는 에이전트 노드입니다."""
     print("--- 에이전트 노드 실행 ---")
     
-    # df를 전역 변수로 설정하여 tools에서 접근 가능하도록 함
     import agent.tools as tools_module
-    if hasattr(tools_module, 'set_dataframe'):
-        tools_module.set_dataframe(state["df"])
     
     # Context Aware Node에서 향상된 질문이 있으면 사용, 없으면 원본 사용
     input_to_use = state.get("enhanced_input", state["input"])
     
     print(f"사용할 입력: {input_to_use}")
     
-    result = agent_executor.invoke({
-        "input": input_to_use,
-        "chat_history": state["chat_history"]
-    })
+    # df를 이 요청의 실행 컨텍스트에 설정하여 tools에서 접근 가능하도록 함 (동시 세션과 분리)
+    with tools_module.dataset_context(df=state_dataframe(state)):
+        result = run_agent(agent_executor, {
+            "input": input_to_use,
+            "chat_history": state["chat_history"]
+        })
     
     # 중간 단계와 출처 정보 포함
-    df = state.get("df")
+    df = state_dataframe(state)
     sheet_info = ""
     if df is not None:
         # 실제 사용된 컬럼들을 추정 (키워드 기반)
@@ -751,13 +1015,102 @@ def agent_node(state: AgentState, agent_executor: AgentExecutor) -> dict:
     
     return output_with_details
 
+def quick_answer_node(state: AgentState) -> dict:
+    """단순 집계 질문을 LLM 없이 집계 엔진으로 바로 계산하여 답변하는 노드입니다.
+    
+    실행 계획 신뢰도가 QUICK_ANSWER_MIN_CONFIDENCE 미만이거나 계산할 수 없으면
+    processing_path를 agent_node로 바꾸어 에이전트가 처리하도록 넘깁니다.
+    """
+    print("--- Quick Answer 노드 실행 ---")
+    
+    df = state_dataframe(state)
+    query_plan = state.get("query_plan", {})
+    strategy = query_plan.get("execution_plan", {}).get("strategy")
+    confidence = query_plan.get("confidence", 0.0)
+    
+    if df is None or strategy not in QUICK_ANSWER_STRATEGIES or confidence < QUICK_ANSWER_MIN_CONFIDENCE:
+        print(f"빠른 답변 생략 (전략: {strategy}, 신뢰도: {confidence:.2f}) → 에이전트 사용")
+        return {"processing_path": "agent_node"}
+    
+    import agent.tools as tools_module
+    
+    # 질문에서 추출한 엔티티 + 실행 계획의 데이터 기반 엔티티/지표로 바로 집계
+    input_to_use = state.get("enhanced_input", state["input"])
+    entities = tools_module._extract_complex_entities(input_to_use, df)
+    entities.update({key: value for key, value in query_plan.get("detected_entities", {}).items() if value})
+    metric = (query_plan.get("detected_metrics") or [entities.get("metric")])[0]
+    
+    # 항목별/순위 질문이나 값이 정해지지 않은 조건은 합계 하나로 답할 수 없으므로 에이전트가 처리
+    if not is_scalar_question(query_plan, input_to_use, entities):
+        print("항목별/순위 질문이거나 조건 값이 없음 → 에이전트 사용")
+        return {"processing_path": "agent_node"}
+    
+    with tools_module.dataset_context(df=df):
+        result = tools_module.aggregate_by_entities(entities, metric)
+    if result is None:
+        print("빠른 답변 계산 불가 → 에이전트 사용")
+        return {"processing_path": "agent_node"}
+    
+    conditions = ", ".join(result["filters_applied"]) or "전체 데이터"
+    ratio = result["filtered_count"] / result["original_count"] if result["original_count"] else 0.0
+    output = (
+        f"{conditions} 조건의 {result['metric']} 합계는 **{result['display_value']}**입니다.\n"
+        f"(총 {result['filtered_count']:,}개 레코드 집계, 전체 데이터의 {ratio:.1%})"
+    )
+    
+    dataset_name = state.get("active_dataset_name", "업로드된 파일")
+    source_info = f"📊 **데이터 출처:** {dataset_name} (총 {len(df):,}행, {len(df.columns)}개 컬럼)"
+    source_info += f"\n⚡ 빠른 답변 경로 (LLM 미사용, 계획 신뢰도: {confidence:.2f})"
+    
+    print(f"빠른 답변: {output}")
+    return {
+        "output": output,
+        "intermediate_steps": [],
+        "source_info": source_info,
+        "processing_path": "quick_answer_node"
+    }
+
+def quick_answer_route_logic(state: AgentState) -> str:
+    """빠른 답변 경로 사용 여부를 결정합니다. (아니면 실행 계획 사전 실행 후 에이전트)"""
+    if state.get("processing_path") == "quick_answer_node":
+        return "quick_answer_node"
+    return "plan_execution_node"
+
+def quick_answer_result_logic(state: AgentState) -> str:
+    """빠른 답변이 생성되었으면 종료하고, 아니면 실행 계획 단계로 넘깁니다."""
+    if state.get("processing_path") == "quick_answer_node" and state.get("output"):
+        return "end"
+    return "plan_execution_node"
+
+def plan_execution_node(state: AgentState) -> dict:
+    """query_planning_node의 실행 계획에 따라 추천 도구를 에이전트보다 먼저 실행하는 노드입니다.
+    
+    comparative_analysis / multi_column_query / single_column_query 전략만 실행하며,
+    결과는 에이전트에 도구 관찰값으로 전달됩니다.
+    """
+    print("--- Plan Execution 노드 실행 ---")
+    
+    input_to_use = state.get("enhanced_input", state["input"])
+    plan_execution = execute_plan(state.get("query_plan", {}), input_to_use, state_dataframe(state))
+    
+    if plan_execution:
+        print(f"사전 실행: {plan_execution['tool']}({plan_execution['tool_input']}) "
+              f"- {plan_execution['elapsed_seconds']:.3f}초")
+    else:
+        print("사전 실행할 계획 없음 → 에이전트가 도구 선택")
+    
+    return {"plan_execution": plan_execution or {}}
+
 def fallback_node(state: AgentState) -> dict:
     """분석 키워드가 없을 때 응답하는 폴백 노드입니다."""
     print("--- 폴백 노드 실행 ---")
     return {"output": "죄송합니다. 이해할 수 있는 분석 키워드를 찾지 못했어요. '사업부', '매출' 등의 키워드를 사용해 다시 질문해 주세요."}
 
-def create_graph_workflow(agent_executor: AgentExecutor) -> StateGraph:
-    """향상된 LangGraph 워크플로우를 생성하고 컴파일된 실행기를 반환합니다."""
+def create_graph_workflow(agent_executors: AgentExecutorCache) -> StateGraph:
+    """향상된 LangGraph 워크플로우를 생성하고 컴파일된 실행기를 반환합니다.
+
+    에이전트 노드는 agent_executors에서 요청의 의도/데이터셋 수에 맞는 도구 부분집합의 실행기를 받습니다.
+    """
     workflow = StateGraph(AgentState)
 
     # 노드들 추가
@@ -768,10 +1121,13 @@ def create_graph_workflow(agent_executor: AgentExecutor) -> StateGraph:
     workflow.add_node("multi_intent_classification_node", multi_intent_classification_node)
     workflow.add_node("query_planning_node", query_planning_node)
     workflow.add_node("multi_query_planning_node", multi_query_planning_node)
+    workflow.add_node("quick_answer_node", quick_answer_node)
+    workflow.add_node("plan_execution_node", plan_execution_node)
     
     # 데이터셋별 전용 노드들
-    workflow.add_node("single_dataset_agent", lambda state: single_dataset_agent(state, agent_executor))
-    workflow.add_node("multi_dataset_agent", lambda state: multi_dataset_agent(state, agent_executor))
+    workflow.add_node("single_dataset_agent", lambda state: single_dataset_agent(state, agent_executors))
+    workflow.add_node("dataset_branch_agent", lambda branch: dataset_branch_agent(branch, agent_executors))
+    workflow.add_node("multi_dataset_agent", lambda state: multi_dataset_agent(state, agent_executors))
 
     # 워크플로우 구성: Router → Dataset Routing → 각 경로별 최적화된 처리
     workflow.set_entry_point("router_node")
@@ -789,12 +1145,36 @@ def create_graph_workflow(agent_executor: AgentExecutor) -> StateGraph:
     # 단일 파일 경로: 기존 파이프라인
     workflow.add_edge("context_aware_node", "intent_classification_node")
     workflow.add_edge("intent_classification_node", "query_planning_node")
-    workflow.add_edge("query_planning_node", "single_dataset_agent")
+    
+    # 단순 집계 질문은 빠른 답변 경로 우선, 불가하면 실행 계획 사전 실행 후 에이전트
+    workflow.add_conditional_edges(
+        "query_planning_node",
+        quick_answer_route_logic,
+        {
+            "quick_answer_node": "quick_answer_node",
+            "plan_execution_node": "plan_execution_node"
+        }
+    )
+    workflow.add_conditional_edges(
+        "quick_answer_node",
+        quick_answer_result_logic,
+        {
+            "end": END,
+            "plan_execution_node": "plan_execution_node"
+        }
+    )
+    workflow.add_edge("plan_execution_node", "single_dataset_agent")
     
     # 다중 파일 경로: 완전한 파이프라인 (Intent/Query Planning 포함)
     workflow.add_edge("multi_context_aware_node", "multi_intent_classification_node")
     workflow.add_edge("multi_intent_classification_node", "multi_query_planning_node")  
-    workflow.add_edge("multi_query_planning_node", "multi_dataset_agent")
+    # 데이터셋마다 분기 에이전트를 병렬 실행(fan-out)하고 multi_dataset_agent에서 종합(fan-in)
+    workflow.add_conditional_edges(
+        "multi_query_planning_node",
+        fan_out_datasets,
+        ["dataset_branch_agent", "multi_dataset_agent"]
+    )
+    workflow.add_edge("dataset_branch_agent", "multi_dataset_agent")
     
     # 종료 엣지들
     workflow.add_edge("single_dataset_agent", END)
@@ -811,14 +1191,11 @@ def main():
     if not openai_api_key:
         raise ValueError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
         
-    # 툴 로드
-    from agent.tool_registry import registered_tools
-
-    # 1. 에이전트 실행기 생성
-    agent_executor = create_agent_executor(openai_api_key, registered_tools)
+    # 1. 에이전트 실행기 캐시 생성 (노출 도구 부분집합별로 필요할 때 생성)
+    agent_executors = AgentExecutorCache(lambda tools: create_agent_executor(openai_api_key, tools))
 
     # 2. 그래프 워크플로우 생성
-    app = create_graph_workflow(agent_executor)
+    app = create_graph_workflow(agent_executors)
 
 # The code snippet you provided is a part of the main execution function in a Python script. Here's
 # what it does:
@@ -839,9 +1216,8 @@ def main():
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 if openai_api_key:
-    from agent.tool_registry import registered_tools
-    agent_executor = create_agent_executor(openai_api_key, registered_tools)
-    graph_executor = create_graph_workflow(agent_executor)
+    agent_executors = AgentExecutorCache(lambda tools: create_agent_executor(openai_api_key, tools))
+    graph_executor = create_graph_workflow(agent_executors)
 else:
     print("Warning: OPENAI_API_KEY not found. Graph executor not initialized.")
     graph_executor = None
@@ -0,0 +1,286 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import pandas as pd
+
+from agent.dtype_compaction import compact_dataframe
+from agent.excel_ingest import read_sheet, normalize_column_name
+from agent.parallel_ingest import parse_sheet_task, run_tasks
+from agent.result_cache import dataframe_fingerprint
+from agent.sheet_cache import sheet_cache, content_key
+
+# 메모리에 유지하는 파싱 완료 시트 수 (초과 시 가장 오래 사용되지 않은 시트부터 해제)
+PARSED_SHEET_CACHE_SIZE = int(os.getenv("PARSED_SHEET_CACHE_SIZE", "4"))
+
+# 시트 메타데이터의 헤더 미리보기 컬럼 수
+HEADER_PREVIEW_COLUMNS = 8
+
+
+class ParsedSheetCache:
+    """(워크북 키, 시트명)별 파싱 완료 DataFrame을 보관하는 크기 제한 LRU 캐시입니다."""
+
+    def __init__(self, max_entries: int = PARSED_SHEET_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """캐시된 DataFrame을 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            df = self._entries.get(key)
+            if df is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return df
+
+    def put(self, key, df: pd.DataFrame):
+        """DataFrame을 저장하고, 최대 개수를 넘으면 가장 오래 사용되지 않은 시트를 제거합니다."""
+        with self._lock:
+            self._entries[key] = df
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_entries, 1):
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def stats(self) -> dict:
+        """적중/실패 횟수와 현재 보관 중인 시트 수를 반환합니다."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 업로드 워크북 공용 파싱 시트 캐시
+parsed_sheets = ParsedSheetCache()
+
+
+def _read_metadata(workbook) -> list:
+    """시트별 이름, 예상 행 수, 헤더 미리보기를 읽습니다. (데이터 행은 파싱하지 않음)"""
+    sheets = []
+    for worksheet in workbook.worksheets:
+        # 파일에 기록된 범위 기준 예상 행 수 (헤더 제외, 기록이 없으면 None)
+        estimated_rows = max(worksheet.max_row - 1, 0) if worksheet.max_row else None
+        header = []
+        for row in worksheet.iter_rows(min_row=1, max_row=1, values_only=True):
+            header = [normalize_column_name(value) for value in row if value is not None]
+        sheets.append({
+            "name": worksheet.title,
+            "estimated_rows": estimated_rows,
+            "columns": len(header),
+            "header_preview": header[:HEADER_PREVIEW_COLUMNS],
+        })
+    return sheets
+
+
+class LazyWorkbook(Mapping):
+    """시트 메타데이터만 등록해 두고, 시트를 처음 사용할 때 파싱하는 워크북입니다.
+
+    {시트명: DataFrame} 매핑처럼 사용하며, 이름 목록/개수 조회는 파싱하지 않습니다.
+    시트를 가져오면 파싱 시트 캐시 → 디스크 시트 캐시 → 엑셀 스트리밍 파싱 순으로 찾습니다.
+
+    Args:
+        data: 업로드된 파일 바이트
+        name: 원본 파일명
+        columns: 정규화된 컬럼명 목록. 주어지면 해당 컬럼만 파싱합니다.
+        prepare: 시트를 불러온 직후 호출할 prepare(df) 콜백 (색인/큐브 사전 생성 등)
+    """
+
+    def __init__(self, data: bytes, name: str, columns: list = None, prepare=None):
+        import openpyxl
+
+        self.name = name
+        self.columns = columns
+        self.prepare = prepare
+        self.key = content_key(data) + (":schema" if columns is not None else "")
+        self.sources = {}  # 시트명 → 'memory' | 'disk' | 'excel' (마지막으로 불러온 경로)
+        self._data = data
+        self._lock = threading.Lock()
+        self._workbook = None
+
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        try:
+            self.sheet_info = _read_metadata(workbook)
+        finally:
+            workbook.close()
+        self._positions = {info["name"]: i for i, info in enumerate(self.sheet_info)}
+
+    def __getitem__(self, sheet_name: str) -> pd.DataFrame:
+        if sheet_name not in self._positions:
+            raise KeyError(sheet_name)
+        return self.load(sheet_name)
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, sheet_name) -> bool:
+        return sheet_name in self._positions
+
+    def info(self, sheet_name: str) -> dict:
+        """시트 메타데이터를 반환합니다."""
+        return self.sheet_info[self._positions[sheet_name]]
+
+    def is_loaded(self, sheet_name: str) -> bool:
+        """시트가 파싱 시트 캐시에 올라와 있는지 확인합니다."""
+        return (self.key, sheet_name) in parsed_sheets
+
+    def is_cached(self, sheet_name: str) -> bool:
+        """시트가 디스크 시트 캐시에 저장되어 있는지 확인합니다. (불러오지 않음)"""
+        return self._disk_key(sheet_name) in sheet_cache
+
+    def _open(self):
+        """시트 파싱용 읽기 전용 워크북을 엽니다. (공유 문자열 재사용을 위해 한 번만 열어 둠)"""
+        if self._workbook is None:
+            import openpyxl
+            self._workbook = openpyxl.load_workbook(io.BytesIO(self._data), read_only=True, data_only=True)
+        return self._workbook
+
+    def load(self, sheet_name: str, progress=None) -> pd.DataFrame:
+        """시트를 불러옵니다.
+
+        Args:
+            sheet_name: 시트명
+            progress: 엑셀을 파싱하는 경우 progress(읽은 행 수, 예상 전체 행 수) 콜백
+        """
+        cache_key = (self.key, sheet_name)
+        df = parsed_sheets.get(cache_key)
+        if df is not None:
+            self.sources[sheet_name] = "memory"
+            return df
+
+        # 같은 워크북의 시트는 하나씩 파싱 (동시에 요청되어도 한 번만 파싱)
+        with self._lock:
+            if cache_key in parsed_sheets:
+                self.sources[sheet_name] = "memory"
+                return parsed_sheets.get(cache_key)
+
+            df = self.load_cached(sheet_name)
+            if df is not None:
+                return df
+            df = read_sheet(self._open()[sheet_name], self.columns, progress=progress)
+            df.columns = [normalize_column_name(col) for col in df.columns]
+            # 지표 수치 변환, 정수/실수 축소, 텍스트 사전 인코딩으로 메모리 절감
+            return self.register(sheet_name, compact_dataframe(df))
+
+    def _disk_key(self, sheet_name: str) -> str:
+        return f"{self.key}-{self._positions[sheet_name]}"
+
+    def load_cached(self, sheet_name: str):
+        """디스크 시트 캐시에 있으면 불러와 등록합니다. 없으면 None을 반환합니다."""
+        cached = sheet_cache.load(self._disk_key(sheet_name))
+        if cached is None or sheet_name not in cached:
+            return None
+        df = cached[sheet_name]
+        self.sources[sheet_name] = "disk"
+        if self.prepare:
+            self.prepare(df)
+        parsed_sheets.put((self.key, sheet_name), df)
+        return df
+
+    def register(self, sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """새로 파싱한 시트를 디스크 캐시에 저장하고 파싱 시트 캐시에 등록합니다."""
+        sheet_cache.store(self._disk_key(sheet_name), {sheet_name: df}, f"{self.name} - {sheet_name}")
+        self.sources[sheet_name] = "excel"
+        if self.prepare:
+            self.prepare(df)
+        parsed_sheets.put((self.key, sheet_name), df)
+        return df
+
+    def parse_task(self, sheet_name: str) -> tuple:
+        """프로세스 풀에서 시트를 파싱할 작업 (함수, 인자)을 반환합니다."""
+        return parse_sheet_task, (self._data, sheet_name, self.columns)
+
+    def close(self):
+        """열어 둔 읽기 전용 워크북을 닫습니다."""
+        with self._lock:
+            if self._workbook is not None:
+                self._workbook.close()
+                self._workbook = None
+
+
+def prefetch(requests: list) -> dict:
+    """여러 워크북의 시트들을 프로세스 풀에서 동시에 파싱하여 캐시에 올립니다.
+
+    이미 메모리에 올라와 있거나 디스크 캐시에 있는 시트는 건너뜁니다. 디스크 캐시 시트는
+    사용할 때 메모리 매핑으로 바로 읽으므로 미리 불러와 파싱 시트 캐시를 채우지 않습니다.
+
+    Args:
+        requests: [(LazyWorkbook, 시트명), ...]
+
+    Returns:
+        {(워크북 이름, 시트명): 오류} 파싱에 실패한 시트만 포함
+    """
+    tasks, owners = {}, {}
+    for workbook, sheet_name in requests:
+        key = (workbook.key, sheet_name)
+        if key in tasks or workbook.is_loaded(sheet_name) or workbook.is_cached(sheet_name):
+            continue
+        tasks[key] = workbook.parse_task(sheet_name)
+        owners[key] = workbook
+
+    errors = {}
+    for key, (df, error) in run_tasks(tasks).items():
+        workbook, sheet_name = owners[key], key[1]
+        if error is not None:
+            errors[(workbook.name, sheet_name)] = error
+        else:
+            workbook.register(sheet_name, df)
+    return errors
+
+
+class LazyDatasets(Mapping):
+    """{데이터셋 이름: DataFrame} 매핑으로, 값은 조회될 때 각 워크북에서 불러옵니다.
+
+    이름 목록/개수만 사용하는 노드는 시트를 파싱하지 않고, 다중 데이터셋 도구가
+    데이터셋을 순회할 때 필요한 시트만 파싱됩니다.
+    """
+
+    def __init__(self):
+        self._sources = {}
+
+    def add(self, name: str, sheets: Mapping, sheet_name: str):
+        """sheets[sheet_name]을 name으로 등록합니다. (sheets는 dict 또는 LazyWorkbook)"""
+        self._sources[name] = (sheets, sheet_name)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        sheets, sheet_name = self._sources[name]
+        return sheets[sheet_name]
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def __contains__(self, name) -> bool:
+        return name in self._sources
+
+    def source_key(self, name: str) -> str:
+        """데이터셋 출처 식별 키입니다. 엑셀 시트는 파싱하지 않고 (워크북 키, 시트명)으로 만듭니다."""
+        sheets, sheet_name = self._sources[name]
+        if isinstance(sheets, LazyWorkbook):
+            return f"{sheets.key}/{sheet_name}"
+        return dataframe_fingerprint(sheets[sheet_name])
+
+    def prefetch(self) -> dict:
+        """등록된 엑셀 시트 중 아직 파싱되지 않은 시트를 병렬로 미리 파싱합니다.
+
+        모든 데이터셋을 순회하는 다중 데이터셋 도구/분기 실행 직전에만 호출합니다.
+        """
+        return prefetch([(sheets, sheet_name) for sheets, sheet_name in self._sources.values()
+                         if isinstance(sheets, LazyWorkbook)])
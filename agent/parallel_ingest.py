@@ -0,0 +1,126 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from agent.dtype_compaction import compact_dataframe
+from agent.excel_ingest import read_sheet, normalize_column_name
+from agent.sheet_cache import frame_to_table, table_to_frame
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow가 없으면 DataFrame을 그대로 전달
+    pa = None
+
+# 파싱 작업자 프로세스 수 (기본: CPU 코어 수)
+INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """재사용하는 파싱용 프로세스 풀을 반환합니다.
+
+    Streamlit 스크립트 스레드에서 fork하지 않도록 spawn 방식으로 작업자를 만듭니다.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(INGEST_MAX_WORKERS, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown():
+    """프로세스 풀을 종료합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def _to_buffer(df: pd.DataFrame):
+    """DataFrame을 Arrow IPC 스트림 바이트로 변환합니다.
+
+    범주형 컬럼은 사전(dictionary) 인코딩 그대로 전달됩니다.
+    Arrow로 변환할 수 없으면 DataFrame을 그대로 반환합니다.
+    """
+    if pa is None or not all(isinstance(col, str) for col in df.columns):
+        return df
+    try:
+        table = frame_to_table(df)
+    except pa.ArrowException:
+        return df
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_buffer(payload) -> pd.DataFrame:
+    """_to_buffer 결과를 DataFrame으로 복원합니다."""
+    if isinstance(payload, pd.DataFrame):
+        return payload
+    table = pa.ipc.open_stream(payload).read_all()
+    return table_to_frame(table, split_blocks=True, self_destruct=True)
+
+
+def parse_sheet_task(data: bytes, sheet_name: str, columns: list = None):
+    """작업자 프로세스에서 엑셀 시트 하나를 파싱·타입 압축하여 열 지향 버퍼로 반환합니다."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        df = read_sheet(workbook[sheet_name], columns)
+    finally:
+        workbook.close()
+    df.columns = [normalize_column_name(col) for col in df.columns]
+    return _to_buffer(compact_dataframe(df))
+
+
+def parse_csv_task(data: bytes, columns: list = None):
+    """작업자 프로세스에서 CSV 파일 하나를 파싱·타입 압축하여 열 지향 버퍼로 반환합니다."""
+    usecols = (lambda col: normalize_column_name(col) in columns) if columns is not None else None
+    df = pd.read_csv(io.BytesIO(data), usecols=usecols)
+    df.columns = df.columns.str.strip().str.replace(" ", "").str.replace("\t", "")
+    return _to_buffer(compact_dataframe(df))
+
+
+def run_tasks(tasks: dict) -> dict:
+    """파싱 작업들을 프로세스 풀에서 동시에 실행합니다.
+
+    Args:
+        tasks: {작업 키: (함수, 인자 튜플)} (함수는 parse_sheet_task/parse_csv_task)
+
+    Returns:
+        {작업 키: (DataFrame 또는 None, 오류 또는 None)}. 작업별 오류는 다른 작업에 영향을 주지 않습니다.
+    """
+    results = {}
+    if not tasks:
+        return results
+
+    # 작업이 하나면 프로세스 간 전송 없이 현재 프로세스에서 실행
+    if len(tasks) == 1 or INGEST_MAX_WORKERS <= 1:
+        for key, (func, args) in tasks.items():
+            try:
+                results[key] = (_from_buffer(func(*args)), None)
+            except Exception as e:
+                results[key] = (None, e)
+        return results
+
+    executor = _get_executor()
+    futures = {executor.submit(func, *args): key for key, (func, args) in tasks.items()}
+    for future in as_completed(futures):
+        key = futures[future]
+        try:
+            results[key] = (_from_buffer(future.result()), None)
+        except Exception as e:
+            results[key] = (None, e)
+    return results
@@ -0,0 +1,285 @@
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build, discard
+from agent.dimension_encoding import DIMENSION_COLUMNS, is_categorical, match_values
+from agent.period_parser import PERIOD_COLUMN, parse_period_values
+
+# 행 수가 이 값 이상인 데이터는 공유 메모리 병렬 스캔으로 조건 필터링과 지표 합계를 계산
+SCAN_PARALLEL_ROWS = int(os.getenv("SCAN_PARALLEL_ROWS", "5000000"))
+
+# 스캔 작업자 프로세스 수 (기본: CPU 코어 수, 1이면 병렬 스캔 사용 안 함)
+SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """재사용하는 스캔용 프로세스 풀을 반환합니다. (Streamlit 스크립트 스레드에서 fork하지 않도록 spawn)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(SCAN_MAX_WORKERS, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown():
+    """프로세스 풀을 종료합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def _release_block(block: shared_memory.SharedMemory):
+    block.close()
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedArray:
+    """공유 메모리에 올린 1차원 NumPy 배열입니다. 객체가 소멸되면 블록을 해제합니다."""
+
+    def __init__(self, values: np.ndarray):
+        values = np.ascontiguousarray(values)
+        self._block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=self._block.buf)[:] = values
+        # 작업자에 전달하는 (블록 이름, dtype, 길이)
+        self.spec = (self._block.name, values.dtype.str, len(values))
+        self.nbytes = values.nbytes
+        self._finalizer = weakref.finalize(self, _release_block, self._block)
+
+    def release(self):
+        self._finalizer()
+
+
+class CodeFilter:
+    """병렬 스캔의 행 선택 조건입니다. 코드 컬럼별 고유값 매칭 여부 배열을 AND로 결합합니다.
+
+    비트맵과 달리 행 수에 비례하는 배열을 만들지 않으며, 행 마스크는 작업자가 구간별로 만듭니다.
+    """
+
+    __slots__ = ("hits", "empty")
+
+    def __init__(self, hits: dict = None, empty: bool = False):
+        self.hits = hits or {}
+        self.empty = empty
+
+    def __and__(self, other: "CodeFilter") -> "CodeFilter":
+        hits = dict(self.hits)
+        for col, col_hits in other.hits.items():
+            hits[col] = hits[col] & col_hits if col in hits else col_hits
+        empty = self.empty or other.empty or not all(col_hits.any() for col_hits in hits.values())
+        return CodeFilter(hits, empty)
+
+
+class ScanIndex:
+    """병렬 스캔용 데이터셋 저장소입니다. DatasetIndex와 같은 조회 메서드를 제공합니다.
+
+    차원 컬럼의 정수 코드(범주형은 .codes, 그 외는 factorize)와 지표 컬럼을 공유 메모리에 한 번씩 올리고,
+    조건은 고유값 단위로 평가해 CodeFilter로 반환합니다. 행 단위 작업(마스크·건수·고유값·합계)은
+    작업자 프로세스들이 행 구간별로 계산합니다.
+    고객사 등 색인하지 않은 컬럼과 지표 컬럼은 처음 사용할 때 올라가며, 원본 DataFrame은 참조하지 않습니다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.row_count = len(df)
+        self.codes = {}    # {컬럼: (고유값 Series, 코드 SharedArray)}
+        self.metrics = {}  # {컬럼: 값 SharedArray}
+        self.derived = {}  # {파생 컬럼: (코드 컬럼, 고유값별 파생 값 Series)}
+        self._lock = threading.Lock()
+
+        for col in DIMENSION_COLUMNS:
+            if col in df.columns:
+                self._encoded(df[col])
+        if PERIOD_COLUMN in self.codes:
+            # "year"는 Period/Year 고유값을 파싱한 연도 (DatasetIndex의 year 차원과 동일)
+            periods = self.codes[PERIOD_COLUMN][0]
+            self.derived["year"] = (PERIOD_COLUMN, parse_period_values(periods)["year"])
+
+    def _encoded(self, series: pd.Series) -> tuple:
+        """컬럼의 (고유값, 코드 SharedArray)를 반환합니다. (컬럼당 1회 생성, 결측 코드는 -1)"""
+        with self._lock:
+            entry = self.codes.get(series.name)
+            if entry is None:
+                if is_categorical(series):
+                    codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+                else:
+                    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                    codes = codes.astype(np.int32)
+                entry = (pd.Series(np.asarray(uniques, dtype=object), dtype=object), SharedArray(codes))
+                self.codes[series.name] = entry
+            return entry
+
+    def _metric(self, series: pd.Series) -> SharedArray:
+        with self._lock:
+            array = self.metrics.get(series.name)
+            if array is None:
+                array = SharedArray(series.to_numpy())
+                self.metrics[series.name] = array
+            return array
+
+    def _source(self, col: str) -> tuple:
+        """조건 컬럼의 (코드 컬럼, 고유값 Series)를 반환합니다."""
+        if col in self.derived:
+            return self.derived[col]
+        return col, self.codes[col][0]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [codes for _, codes in self.codes.values()] + list(self.metrics.values())
+        return sum(array.nbytes for array in arrays)
+
+    def all_rows(self) -> CodeFilter:
+        """모든 행이 선택된 조건을 반환합니다."""
+        return CodeFilter()
+
+    def no_rows(self) -> CodeFilter:
+        """아무 행도 선택되지 않은 조건을 반환합니다."""
+        return CodeFilter(empty=True)
+
+    def values(self, col: str) -> pd.Series:
+        """조건 컬럼의 고유값 목록을 반환합니다."""
+        return self._source(col)[1]
+
+    def matching(self, col: str, value_hits: np.ndarray) -> CodeFilter:
+        """고유값(values(col) 순서)별 매칭 여부 배열로 조건을 만듭니다."""
+        source, _ = self._source(col)
+        value_hits = np.asarray(value_hits, dtype=bool)
+        return CodeFilter({source: value_hits}, empty=not value_hits.any())
+
+    def contains(self, col: str, pattern: str, case: bool = True, as_text: bool = False,
+                 regex: bool = True) -> CodeFilter:
+        """고유값에 부분 문자열 매칭을 수행하여 조건을 만듭니다. (regex=False면 문자 그대로 매칭)"""
+        return self.matching(col, match_values(self.values(col), pattern, case, as_text, regex))
+
+    def equals(self, col: str, value, as_text: bool = False) -> CodeFilter:
+        """값이 정확히 일치하는 조건을 만듭니다."""
+        values = self.values(col)
+        values = values.astype(str) if as_text else values
+        return self.matching(col, (values == value).to_numpy(dtype=bool, na_value=False))
+
+    def series_contains(self, series: pd.Series, pattern: str, case: bool = True, as_text: bool = False,
+                        regex: bool = True) -> CodeFilter:
+        """색인하지 않은 컬럼(고객사 등)도 코드로 올린 뒤 고유값 단위로 매칭합니다."""
+        self._encoded(series)
+        return self.contains(series.name, pattern, case, as_text, regex)
+
+    def count(self, bits: CodeFilter) -> int:
+        """조건에 맞는 행 수를 반환합니다."""
+        if bits.empty:
+            return 0
+        if not bits.hits:
+            return self.row_count
+        return sum(count for count, _, _ in self._scan(bits))
+
+    def selected_values(self, series: pd.Series, bits: CodeFilter, as_text: bool = False) -> list:
+        """선택된 행에 나타나는 컬럼 고유값을 등장 순서대로 반환합니다."""
+        values, codes = self._encoded(series)
+        if bits.empty:
+            return []
+        # 구간 순서대로 이어 붙인 뒤 코드별 첫 등장만 남기면 전체 등장 순서가 됨
+        found = np.concatenate([present for _, _, present in self._scan(bits, codes_spec=codes.spec)])
+        _, first = np.unique(found, return_index=True)
+        found = found[np.sort(first)]
+        values = values.astype(str) if as_text else values
+        return values.take(found[found >= 0]).tolist()
+
+    def total(self, series: pd.Series, bits: CodeFilter):
+        """선택된 행의 컬럼 합계를 구간별 부분 합계를 구간 순서대로 더해 반환합니다."""
+        if bits.empty:
+            return series.iloc[:0].sum()
+        values = self._metric(series)
+        partials = [partial for _, partial, _ in self._scan(bits, values_spec=values.spec)]
+        total = partials[0]
+        for partial in partials[1:]:
+            total += partial
+        return total
+
+    def _scan(self, bits: CodeFilter, values_spec: tuple = None, codes_spec: tuple = None) -> list:
+        """행 구간마다 작업자에서 _scan_partition을 실행하고 구간 순서대로 결과를 반환합니다."""
+        conditions = [(self.codes[col][1].spec, hits) for col, hits in bits.hits.items()]
+        executor = _get_executor()
+        futures = [executor.submit(_scan_partition, conditions, start, stop, values_spec, codes_spec)
+                   for start, stop in _partitions(self.row_count, SCAN_MAX_WORKERS)]
+        return [future.result() for future in futures]
+
+
+def _scan_partition(conditions: list, start: int, stop: int, values_spec: tuple = None,
+                    codes_spec: tuple = None) -> tuple:
+    """작업자 프로세스에서 [start, stop) 구간의 조건 마스크를 만들고 (행 수, 부분 합계, 등장 코드)를 반환합니다.
+
+    공유 메모리 블록은 구간 계산이 끝나면 닫으므로, 부모가 블록을 해제한 뒤 작업자가 매핑을 붙잡지 않습니다.
+    """
+    blocks = []
+    try:
+        return _scan_blocks(blocks, conditions, start, stop, values_spec, codes_spec)
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:  # 예외 추적 정보가 배열을 참조하면 GC 때 닫힘
+                pass
+
+
+def _scan_blocks(blocks: list, conditions: list, start: int, stop: int, values_spec: tuple,
+                 codes_spec: tuple) -> tuple:
+    def attach(spec: tuple) -> np.ndarray:
+        name, dtype, length = spec
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        return np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)[start:stop]
+
+    mask = np.ones(stop - start, dtype=bool)
+    for spec, hits in conditions:
+        # 결측 코드(-1)는 끝에 덧붙인 False를 가리킴
+        mask &= np.append(hits, False)[attach(spec)]
+
+    total = None
+    if values_spec is not None:
+        selected = attach(values_spec)[mask]
+        total = np.nansum(selected) if selected.dtype.kind == "f" else np.sum(selected)
+
+    present = None
+    if codes_spec is not None:
+        codes, first = np.unique(attach(codes_spec)[mask], return_index=True)
+        present = codes[np.argsort(first)]
+
+    return int(np.count_nonzero(mask)), total, present
+
+
+def _partitions(row_count: int, workers: int) -> list:
+    """행을 작업자 수만큼 연속 구간으로 나눕니다."""
+    size = max(-(-row_count // workers), 1)
+    return [(start, min(start + size, row_count)) for start in range(0, row_count, size)]
+
+
+def use_parallel_scan(df: pd.DataFrame, column: str) -> bool:
+    """행 수와 지표 컬럼 타입으로 병렬 스캔을 사용할지 결정합니다."""
+    if SCAN_MAX_WORKERS <= 1 or len(df) < max(SCAN_PARALLEL_ROWS, 1) or column not in df.columns:
+        return False
+    dtype = df[column].dtype
+    return isinstance(dtype, np.dtype) and dtype.kind in "iuf"
+
+
+def get_scan_index(df: pd.DataFrame) -> ScanIndex:
+    """DataFrame의 병렬 스캔 저장소를 반환합니다. (DataFrame당 1회 생성, 행 수가 바뀌면 다시 생성)"""
+    index = get_or_build(df, "scan_index", ScanIndex)
+    if index.row_count != len(df):
+        discard(df, "scan_index")
+        index = get_or_build(df, "scan_index", ScanIndex)
+    return index
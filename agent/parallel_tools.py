@@ -0,0 +1,67 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from langchain.agents import AgentExecutor
+
+# 한 번의 모델 응답에 담긴 도구 호출들을 동시에 실행하는 작업자 스레드 수 (1이면 순서대로 실행)
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """재사용하는 도구 호출용 스레드 풀을 반환합니다.
+
+    도구 안에서 dataset_pool의 풀을 사용하므로(compare_datasets_* 등) 같은 풀을 쓰지 않고 따로 둡니다.
+    (작업자가 자기 풀의 작업 완료를 기다리며 멈추는 것을 방지)
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(TOOL_MAX_WORKERS, 1),
+                                           thread_name_prefix="tool")
+        return _executor
+
+
+def shutdown():
+    """스레드 풀을 종료합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+class ParallelToolAgentExecutor(AgentExecutor):
+    """한 번의 모델 응답에 담긴 여러 도구 호출을 동시에 실행하는 AgentExecutor입니다.
+
+    AgentExecutor는 병렬 도구 호출(tool_calls)도 하나씩 순서대로 실행합니다.
+    여기서는 호출마다 스레드 풀 작업을 제출해 두고, 결과는 호출 순서대로 돌려줍니다.
+    작업자는 호출 측 실행 컨텍스트(세션 데이터셋, 그래프 스트림 등)를 복사해 그대로 사용합니다.
+    AgentExecutor 내부 메서드(_iter_next_step, _perform_agent_action)를 재정의하므로
+    langchain 버전 범위를 pyproject.toml에 고정해 두었습니다. (tests/test_parallel_tools.py로 확인)
+    """
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        pending = []
+        for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs,
+                                            intermediate_steps, run_manager):
+            if isinstance(item, Future):
+                pending.append(item)
+            else:
+                yield item
+        for future in pending:
+            yield future.result()
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        # _iter_next_step에서 모든 호출을 제출한 뒤 결과를 모으므로 여기서는 기다리지 않음
+        perform = super()._perform_agent_action
+        if TOOL_MAX_WORKERS <= 1:
+            future = Future()
+            future.set_result(perform(name_to_tool_map, color_mapping, agent_action, run_manager))
+            return future
+        return _get_executor().submit(contextvars.copy_context().run, perform,
+                                      name_to_tool_map, color_mapping, agent_action, run_manager)
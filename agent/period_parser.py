@@ -0,0 +1,140 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build
+
+PERIOD_COLUMN = "Period/Year"
+CALENDAR_COLUMNS = ["year", "month_number", "quarter", "half_year", "yyyymm"]
+
+_MONTH_NUMBERS = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4,
+    'May': 5, 'June': 6, 'July': 7, 'August': 8,
+    'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+
+# _parse_period_year와 동일한 우선순위의 패턴들 (re.match와 같도록 ^로 고정)
+_MONTH_NAME_PATTERN = r'^(\d{4})\.\d{3}\s+(\w+)\s+\d{4}'   # "2023.001 January 2023"
+_KOREAN_MONTH_PATTERN = r'^(\d{4})년\s*(\d{1,2})월'          # "2023년 1월"
+_KOREAN_HALF_PATTERN = r'^(\d{4})년\s*(상반기|하반기)'        # "2023년 상반기"
+_YEAR_PATTERN = r'(\d{4})'                                    # 연도만
+
+
+def parse_period_values(values: pd.Series) -> pd.DataFrame:
+    """Period/Year 값들을 벡터 연산으로 파싱하여 달력 컬럼을 생성합니다.
+
+    반환 컬럼:
+    - year: 연도 (Int16)
+    - month_number: 월 (Int8, 영문 월명을 인식하지 못하면 0)
+    - quarter: 분기 1~4 (Int8)
+    - half_year: 1=상반기, 2=하반기 (Int8)
+    - yyyymm: 정규화된 연월 (Int32, 예: 202301)
+    """
+    text = values.astype("string").str.strip()
+    text = text.mask(values.isna() | (text == ""))
+
+    year = pd.Series(pd.NA, index=values.index, dtype="Int16")
+    month = pd.Series(pd.NA, index=values.index, dtype="Int8")
+    half = pd.Series(pd.NA, index=values.index, dtype="Int8")
+    unmatched = text.notna()
+
+    # 패턴 1: "2023.001 January 2023"
+    found = text.str.extract(_MONTH_NAME_PATTERN)
+    hit = unmatched & found[0].notna()
+    year[hit] = found.loc[hit, 0].astype(int)
+    month[hit] = found.loc[hit, 1].map(_MONTH_NUMBERS).fillna(0).astype(int)
+    unmatched &= ~hit
+
+    # 패턴 2: "2023년 1월"
+    found = text.str.extract(_KOREAN_MONTH_PATTERN)
+    hit = unmatched & found[0].notna()
+    year[hit] = found.loc[hit, 0].astype(int)
+    month[hit] = found.loc[hit, 1].astype(int)
+    unmatched &= ~hit
+
+    # 패턴 3: "2023년 상반기/하반기"
+    found = text.str.extract(_KOREAN_HALF_PATTERN)
+    hit = unmatched & found[0].notna()
+    year[hit] = found.loc[hit, 0].astype(int)
+    half[hit] = np.where(found.loc[hit, 1] == "상반기", 1, 2)
+    unmatched &= ~hit
+
+    # 패턴 4: 연도만 추출
+    found = text.str.extract(_YEAR_PATTERN)
+    hit = unmatched & found[0].notna()
+    year[hit] = found.loc[hit, 0].astype(int)
+
+    # 월 정보가 있으면 분기/반기를 월에서 유도 (_parse_period_year와 동일 규칙)
+    has_month = month.notna()
+    valid_month = has_month & (month >= 1) & (month <= 12)
+    quarter = ((month - 1) // 3 + 1).where(valid_month).astype("Int8")
+    half = half.mask(has_month, (month > 6).astype("Int8") + 1).astype("Int8")
+    yyyymm = (year.astype("Int32") * 100 + month.astype("Int32")).where(valid_month)
+
+    return pd.DataFrame({
+        "year": year,
+        "month_number": month,
+        "quarter": quarter,
+        "half_year": half,
+        "yyyymm": yyyymm.astype("Int32"),
+    }, index=values.index)
+
+
+def _build_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """고유값만 파싱한 뒤 행 위치로 펼쳐 전체 달력 컬럼을 만듭니다."""
+    codes, uniques = pd.factorize(df[PERIOD_COLUMN], use_na_sentinel=True)
+    parsed = parse_period_values(pd.Series(uniques, dtype=object))
+
+    # 결측 코드(-1)는 모든 값이 NA인 마지막 행을 가리키도록 처리
+    empty = pd.DataFrame({col: pd.array([pd.NA], dtype=parsed[col].dtype) for col in CALENDAR_COLUMNS})
+    parsed = pd.concat([parsed, empty], ignore_index=True)
+    codes = np.where(codes < 0, len(parsed) - 1, codes)
+
+    calendar = parsed.take(codes)
+    calendar.index = pd.RangeIndex(len(df))
+    return calendar
+
+
+def get_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame 행 순서와 정렬된 달력 컬럼을 반환합니다. (DataFrame당 1회 계산)"""
+    if PERIOD_COLUMN not in df.columns:
+        return pd.DataFrame(index=pd.RangeIndex(len(df)), columns=CALENDAR_COLUMNS, dtype="Int16")
+    return get_or_build(df, "calendar", _build_calendar)
+
+
+def _as_bool(values: pd.Series) -> np.ndarray:
+    """Nullable 비교 결과를 NA=False인 numpy 불리언 배열로 변환합니다."""
+    return values.to_numpy(dtype=bool, na_value=False)
+
+
+def year_mask(calendar: pd.DataFrame, year) -> np.ndarray:
+    """파싱된 연도가 일치하는 행의 마스크를 반환합니다."""
+    if not str(year).isdigit():
+        return np.zeros(len(calendar), dtype=bool)
+    return _as_bool(calendar["year"] == int(year))
+
+
+def period_mask(calendar: pd.DataFrame, period: str, year=None) -> np.ndarray:
+    """기간 표현(상반기/하반기/N분기/N월부터M월)과 연도를 동시에 만족하는 행의 마스크를 반환합니다."""
+    mask = np.ones(len(calendar), dtype=bool)
+
+    if year:
+        mask &= year_mask(calendar, year)
+
+    if "상반기" in period:
+        mask &= _as_bool(calendar["half_year"] == 1)
+    elif "하반기" in period:
+        mask &= _as_bool(calendar["half_year"] == 2)
+    elif re.search(r'(\d)분기', period):
+        quarter = int(re.search(r'(\d)분기', period).group(1))
+        mask &= _as_bool(calendar["quarter"] == quarter)
+    else:
+        range_match = re.search(r'(\d+)월부터\s*(\d+)월', period) or re.search(r'(\d+)월-(\d+)월', period)
+        if range_match:
+            start_month = int(range_match.group(1))
+            end_month = int(range_match.group(2))
+            months = calendar["month_number"]
+            mask &= _as_bool((months >= start_month) & (months <= end_month))
+
+    return mask
@@ -0,0 +1,143 @@
+import re
+import time
+
+import pandas as pd
+from langchain_core.agents import AgentAction
+from langchain_core.messages import AIMessage, ToolMessage
+
+from agent.entity_extractor import get_entity_extractor
+
+# 실행 계획 전략 → 직접 실행할 도구 (query_planning_node의 추천 도구명을 실제 등록 도구로 대응)
+PLAN_TOOLS = {
+    "comparative_analysis": "comparative_analysis_tool",
+    "multi_column_query": "smart_query_processor",
+    "single_column_query": "smart_query_processor",
+}
+
+# 비교 조건으로 사용할 차원 (comparative_analysis_tool 인자 접미사)
+_COMPARISON_COLUMNS = {"Division": "division", "Country": "country"}
+
+# 항목별 분해·순위를 묻는 표현 (사업실별, 국가별로, 상위 5개, 순위, top 3 등)
+_BREAKDOWN_PATTERN = re.compile(r'\S별(?:로)?(?![가-힣])|순위|상위|하위|가장|최고|최저|top\s*\d*|\d+\s*(?:개|위)',
+                                re.IGNORECASE)
+
+# 실행 계획의 필요 컬럼 → 조건 값을 담는 엔티티 키
+_COLUMN_ENTITIES = {
+    "Division": ("division",),
+    "Country": ("country",),
+    "Period/Year": ("year", "period"),
+    "Supplier": ("supplier",),
+    "FundsCenter": ("funds_center",),
+    "Customer": ("customer",),
+}
+
+
+def is_scalar_question(query_plan: dict, question: str, entities: dict) -> bool:
+    """계획된 조건만으로 답이 합계 하나로 정해지는 질문인지 확인합니다.
+
+    항목별 분해나 순위를 묻거나(…별, 순위, 상위 N개 등), 계획된 필요 컬럼 중
+    조건 값이 추출되지 않은 컬럼이 있으면(예: "국가별"의 Country) False를 반환합니다.
+    """
+    if _BREAKDOWN_PATTERN.search(question):
+        return False
+    for column in (query_plan or {}).get("required_columns", []):
+        keys = _COLUMN_ENTITIES.get(column)
+        if keys and not any(entities.get(key) for key in keys):
+            return False
+    return True
+
+
+def _comparison_arguments(question: str, df: pd.DataFrame, metric: str):
+    """질문에서 비교 양쪽 조건을 만듭니다. 두 조건을 구분할 수 없으면 None을 반환합니다.
+
+    같은 차원의 데이터 값이 두 개 이상 언급되면 앞의 두 값을 조건1/조건2로,
+    하나만 언급되면 양쪽 공통 조건으로 사용합니다. (연도도 같은 규칙)
+    """
+    extractor = get_entity_extractor(df)
+    hits = extractor.find(question) if extractor else []
+
+    mentioned = {column: [] for column in _COMPARISON_COLUMNS}
+    for hit in hits:
+        values = mentioned.get(hit["column"])
+        if values is not None and hit["value"] not in values:
+            values.append(hit["value"])
+    mentioned["year"] = list(dict.fromkeys(re.findall(r'20\d{2}', question)))
+
+    arguments = {"metric": metric}
+    compared = False
+    for column, values in mentioned.items():
+        suffix = _COMPARISON_COLUMNS.get(column, column)
+        if len(values) >= 2:
+            arguments[f"condition1_{suffix}"], arguments[f"condition2_{suffix}"] = values[:2]
+            compared = True
+        elif len(values) == 1:
+            arguments[f"condition1_{suffix}"] = arguments[f"condition2_{suffix}"] = values[0]
+    return arguments if compared else None
+
+
+def execute_plan(query_plan: dict, question: str, df: pd.DataFrame):
+    """실행 계획의 추천 도구를 계획된 파라미터로 직접 실행합니다.
+
+    Returns:
+        {'strategy', 'tool', 'tool_input', 'observation', 'elapsed_seconds'}
+        실행할 수 없는 전략이거나 파라미터를 만들 수 없으면 None
+    """
+    execution_plan = (query_plan or {}).get("execution_plan", {})
+    strategy = execution_plan.get("strategy")
+    tool_name = PLAN_TOOLS.get(strategy)
+    if tool_name is None or df is None:
+        return None
+
+    import agent.tools as tools_module
+
+    if strategy == "comparative_analysis":
+        metric = execution_plan.get("parameters", {}).get("primary_metric", "매출수량(M/T)")
+        tool_input = _comparison_arguments(question, df, metric)
+        if tool_input is None:
+            return None
+    else:
+        # 조회 도구는 조건에 맞는 합계 하나를 반환하므로, 그 값이 답이 되는 질문만 미리 실행
+        entities = tools_module._extract_complex_entities(question, df)
+        entities.update({key: value for key, value in query_plan.get("detected_entities", {}).items() if value})
+        if not is_scalar_question(query_plan, question, entities):
+            return None
+        tool_input = {"question": question}
+
+    start = time.perf_counter()
+    try:
+        with tools_module.dataset_context(df=df):
+            observation = getattr(tools_module, tool_name).invoke(tool_input)
+    except Exception as e:
+        print(f"실행 계획 도구 실행 실패 ({tool_name}): {e}")
+        return None
+
+    return {
+        "strategy": strategy,
+        "tool": tool_name,
+        "tool_input": tool_input,
+        "observation": observation,
+        "elapsed_seconds": time.perf_counter() - start,
+    }
+
+
+def plan_messages(plan_execution: dict) -> list:
+    """사전 실행 결과를 에이전트 대화에 넣을 도구 호출/결과 메시지로 변환합니다."""
+    if not plan_execution:
+        return []
+    call_id = f"plan_{plan_execution['tool']}"
+    return [
+        AIMessage(content="", tool_calls=[
+            {"name": plan_execution["tool"], "args": plan_execution["tool_input"], "id": call_id}
+        ]),
+        ToolMessage(content=str(plan_execution["observation"]), tool_call_id=call_id),
+    ]
+
+
+def plan_step(plan_execution: dict) -> tuple:
+    """사전 실행 결과를 intermediate_steps 형식 (AgentAction, observation)으로 변환합니다."""
+    action = AgentAction(
+        tool=plan_execution["tool"],
+        tool_input=plan_execution["tool_input"],
+        log=f"실행 계획({plan_execution['strategy']}) 사전 실행",
+    )
+    return action, plan_execution["observation"]
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from agent.dataset_cache import get_or_build
+
+# 캐시 크기 및 유효 시간 설정
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_TTL_SECONDS = 30 * 60
+
+
+class ResultCache:
+    """크기와 TTL로 제한되는 스레드 안전 LRU 결과 캐시입니다."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl_seconds: float = RESULT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """캐시된 값을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """값을 저장하고, 최대 크기를 넘으면 가장 오래 사용되지 않은 항목을 제거합니다."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """모든 항목을 제거합니다. (적중/실패 카운터는 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """적중/실패 횟수와 현재 항목 수를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# 분석 도구 공용 결과 캐시
+result_cache = ResultCache()
+
+
+def _compute_fingerprint(df: pd.DataFrame) -> str:
+    """DataFrame 내용(값, 컬럼명, dtype)으로 해시 지문을 계산합니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes])).encode("utf-8"))
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """DataFrame 내용 지문을 반환합니다. (DataFrame당 1회 계산)"""
+    return get_or_build(df, "fingerprint", _compute_fingerprint)
+
+
+def normalize_params(params: dict) -> tuple:
+    """캐시 키로 사용할 수 있도록 파라미터를 정규화합니다. (빈 값 제외, 앞뒤 공백 무시)"""
+    normalized = []
+    for key, value in params.items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (list, tuple)):
+            value = tuple(value)
+        normalized.append((key, value))
+    return tuple(sorted(normalized, key=lambda item: item[0]))
+
+
+def cached_call(df: pd.DataFrame, namespace: str, params: dict, compute):
+    """(데이터 지문, 도구 이름, 정규화된 파라미터)를 키로 결과를 캐시합니다."""
+    key = (dataframe_fingerprint(df), namespace, normalize_params(params))
+    value = result_cache.get(key)
+    if value is None:
+        value = compute()
+        result_cache.put(key, value)
+    return value
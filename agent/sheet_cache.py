@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow가 없으면 디스크 캐시 비활성화
+    pa = None
+    feather = None
+
+# 정규화된 시트를 Feather(Arrow IPC) 파일로 저장하는 로컬 캐시 설정
+SHEET_CACHE_DIR = os.getenv(
+    "SHEET_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "steel_analysis", "sheets")
+)
+SHEET_CACHE_MAX_BYTES = int(os.getenv("SHEET_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+_MANIFEST = "manifest.json"
+
+# DataFrame.attrs(로드 시 압축 보고서 등)를 보존하는 Arrow 스키마 메타데이터 키
+_ATTRS_METADATA_KEY = b"steel_analysis.attrs"
+
+
+def content_key(data: bytes) -> str:
+    """업로드된 파일 바이트의 내용 해시를 반환합니다."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def frame_to_table(df: pd.DataFrame):
+    """DataFrame을 Arrow 테이블로 변환합니다. (df.attrs는 스키마 메타데이터로 보존)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if df.attrs:
+        metadata = dict(table.schema.metadata or {})
+        metadata[_ATTRS_METADATA_KEY] = json.dumps(df.attrs, ensure_ascii=False).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+    return table
+
+
+def table_to_frame(table, **kwargs) -> pd.DataFrame:
+    """frame_to_table로 만든 Arrow 테이블을 DataFrame으로 복원합니다."""
+    attrs = (table.schema.metadata or {}).get(_ATTRS_METADATA_KEY)
+    df = table.to_pandas(**kwargs)
+    if attrs:
+        df.attrs.update(json.loads(attrs))
+    return df
+
+
+def _directory_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class SheetCache:
+    """내용 해시별로 워크북의 정규화된 시트들을 저장하는 크기 제한 LRU 디스크 캐시입니다.
+
+    시트는 비압축 Feather로 저장하여 메모리 매핑으로 읽고, 항목의 사용 시각은
+    manifest 파일의 수정 시각으로 관리합니다.
+    """
+
+    def __init__(self, directory: str = SHEET_CACHE_DIR, max_bytes: int = SHEET_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return feather is not None and self.max_bytes > 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def __contains__(self, key: str) -> bool:
+        """캐시 항목이 있는지 확인합니다. (시트는 읽지 않음)"""
+        return self.enabled and os.path.exists(os.path.join(self._entry_path(key), _MANIFEST))
+
+    def load(self, key: str):
+        """캐시된 시트들을 {시트명: DataFrame}으로 반환합니다. 없으면 None을 반환합니다."""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        manifest_path = os.path.join(path, _MANIFEST)
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            sheets = {}
+            for sheet in manifest["sheets"]:
+                table = feather.read_table(os.path.join(path, sheet["file"]), memory_map=True)
+                sheets[sheet["name"]] = table_to_frame(table)
+            os.utime(manifest_path)  # LRU 사용 시각 갱신
+        except (OSError, ValueError, KeyError, pa.ArrowException) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"시트 캐시 읽기 실패 ({key}): {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return sheets
+
+    def store(self, key: str, sheets: dict, source_name: str = "") -> bool:
+        """시트들을 저장합니다. Arrow로 변환할 수 없는 시트가 있으면 저장하지 않고 False를 반환합니다."""
+        if not self.enabled or not sheets:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}.", dir=self.directory)
+        try:
+            manifest = {"source_name": source_name, "created": time.time(), "sheets": []}
+            for i, (name, df) in enumerate(sheets.items()):
+                if not all(isinstance(col, str) for col in df.columns):
+                    raise ValueError(f"시트 '{name}'에 문자열이 아닌 컬럼명이 있습니다")
+                table = frame_to_table(df)
+                file_name = f"sheet_{i}.feather"
+                feather.write_feather(table, os.path.join(staging, file_name), compression="uncompressed")
+                manifest["sheets"].append({"name": name, "file": file_name, "rows": len(df)})
+            with open(os.path.join(staging, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            target = self._entry_path(key)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            print(f"시트 캐시 저장 생략 ({source_name}): {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        self.evict(keep=key)
+        return True
+
+    def _entries(self) -> list:
+        """(마지막 사용 시각, 크기, 키) 목록을 반환합니다."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for entry in os.scandir(self.directory):
+            manifest_path = os.path.join(entry.path, _MANIFEST)
+            if entry.is_dir() and not entry.name.startswith(".") and os.path.exists(manifest_path):
+                entries.append((os.path.getmtime(manifest_path), _directory_size(entry.path), entry.name))
+        return entries
+
+    def evict(self, keep: str = None):
+        """전체 크기가 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                shutil.rmtree(self._entry_path(key), ignore_errors=True)
+                total -= size
+                print(f"시트 캐시 제거 (LRU): {key}")
+
+    def stats(self) -> dict:
+        """적중/실패 횟수와 현재 항목 수/크기를 반환합니다."""
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 업로드 파일 공용 시트 캐시
+sheet_cache = SheetCache()
@@ -1,5 +1,11 @@
+import json
+import os
+from functools import lru_cache
+
 from langchain_core.tools import BaseTool
+from langchain_core.tools import StructuredTool
 from langchain_core.tools import Tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from agent.tools import (
     # Core tools that can't be replaced by smart_query_processor
     get_total_sales_volume_by_fund,
@@ -65,15 +71,16 @@ registered_tools = [
         name="get_unique_values",
         description="지정된 컬럼의 모든 고유값들을 나열합니다. '모든 그룹명', '가능한 국가 목록' 등의 질문에 사용하세요. FundsCenter 컬럼명을 사용하여 모든 그룹을 조회할 수 있습니다."
     ),
-    Tool.from_function(
-        func=get_column_info,
+    # exact 인자가 있는 도구는 인자 스키마를 그대로 노출 (단일 문자열 Tool로 감싸지 않음)
+    StructuredTool.from_function(
+        func=get_column_info.func,
         name="get_column_info",
-        description="특정 컬럼의 상세 정보와 통계를 제공합니다. 데이터 분포, 최빈값, 통계 정보가 필요할 때 사용하세요."
+        description="특정 컬럼의 상세 정보와 통계를 제공합니다. 데이터 분포, 최빈값, 통계 정보가 필요할 때 사용하세요. 대용량 데이터는 근사 통계를 사용하며, 정확한 값이 필요하면 exact=true로 호출하세요."
     ),
-    Tool.from_function(
-        func=explore_dataset,
+    StructuredTool.from_function(
+        func=explore_dataset.func,
         name="explore_dataset",
-        description="전체 데이터셋의 구조와 모든 컬럼 정보를 제공합니다. 데이터셋 개요나 사용 가능한 컬럼을 알고 싶을 때 사용하세요."
+        description="전체 데이터셋의 구조와 모든 컬럼 정보를 제공합니다. 데이터셋 개요나 사용 가능한 컬럼을 알고 싶을 때 사용하세요. 대용량 데이터는 근사 통계를 사용하며, 정확한 값이 필요하면 exact=true로 호출하세요."
     ),
     # === Phase 2: Multi-Dataset Tools ===
     Tool.from_function(
@@ -97,3 +104,104 @@ registered_tools = [
         description="다중 데이터셋을 통합하여 종합적인 분석을 수행합니다. 전체 데이터셋의 통합 지표가 필요할 때 사용하세요."
     ),
 ]
+
+# === 기능별 도구 그룹 (요청마다 필요한 그룹의 도구만 모델에 전달) ===
+TOOL_GROUPS = {
+    # 항상 포함: 대부분의 지표/필터 질문을 처리하는 기본 도구
+    "core": ["smart_query_processor", "get_overall_summary"],
+    "volume": ["get_total_sales_volume_by_fund", "get_total_sales_volume_by_year"],
+    "comparison": ["comparative_analysis_tool"],
+    "exploration": ["get_unique_values", "get_column_info", "explore_dataset"],
+    # 데이터셋이 2개 이상일 때만 포함
+    "multi_dataset": [
+        "compare_datasets_summary",
+        "compare_datasets_metrics",
+        "compare_datasets_by_division",
+        "integrated_dataset_analysis",
+    ],
+}
+
+# 의도 분류 노드의 예측 도구명(intent_info["predicted_tools"]) → 도구 그룹들
+# (등록 도구명은 TOOL_GROUPS로 바로 대응되며, 여기 없는 이름은 단일 데이터셋 그룹 전체를 사용)
+# 집계/순위/추세 질문은 항목별·기간별 비교로 답하는 경우가 많아 비교 도구를 함께 노출
+PREDICTED_TOOL_GROUPS = {
+    "calculate_sum": ("volume", "comparison"),
+    "calculate_total": ("volume", "comparison"),
+    "group_statistics": ("exploration", "comparison"),
+    "compare_groups": ("comparison",),
+    "calculate_percentage": ("comparison",),
+    "filter_data": ("exploration",),
+    "search_data": ("exploration",),
+    "sort_by_column": ("exploration", "comparison"),
+    "get_top_n": ("exploration", "comparison"),
+    "calculate_rank": ("exploration", "comparison"),
+    "time_series_analysis": ("volume", "comparison"),
+    "calculate_growth": ("volume", "comparison"),
+    "calculate_statistics": ("exploration",),
+    "describe_data": ("exploration",),
+    "cross_dataset_comparison": ("multi_dataset",),
+}
+
+# 의도 분류 신뢰도가 이 값보다 낮으면 예측 도구와 관계없이 단일 데이터셋 도구를 모두 노출
+TOOL_SELECTION_MIN_CONFIDENCE = float(os.getenv("TOOL_SELECTION_MIN_CONFIDENCE", "0.15"))
+
+# 도구 스키마 토큰 수 계산에 사용하는 tiktoken 인코딩 (gpt-4o 계열)
+TOOL_TOKEN_ENCODING = os.getenv("TOOL_TOKEN_ENCODING", "o200k_base")
+
+_TOOL_GROUP_BY_NAME = {name: group for group, names in TOOL_GROUPS.items() for name in names}
+_SINGLE_DATASET_GROUPS = [group for group in TOOL_GROUPS if group != "multi_dataset"]
+
+
+def select_tools(predicted_tools: list = None, dataset_count: int = 1, required: list = None,
+                 confidence: float = None) -> list:
+    """예측 도구와 데이터셋 수로 이번 요청에 노출할 최소 도구 목록을 고릅니다.
+
+    Args:
+        predicted_tools: intent_info["predicted_tools"]. 없거나 그룹을 알 수 없는 이름이 있으면
+            단일 데이터셋 그룹 전체를 사용합니다.
+        dataset_count: 업로드된 데이터셋 수. 2개 이상일 때만 다중 데이터셋 도구를 포함합니다.
+        required: 반드시 포함할 도구명 (예: 실행 계획에서 미리 실행한 도구)
+        confidence: intent_info["confidence"]. TOOL_SELECTION_MIN_CONFIDENCE보다 낮으면 예측이
+            빗나갔을 수 있으므로 단일 데이터셋 그룹 전체를 사용합니다. (None이면 예측을 그대로 사용)
+
+    Returns:
+        registered_tools 등록 순서의 도구 목록
+    """
+    groups = {"core"}
+    if confidence is not None and confidence < TOOL_SELECTION_MIN_CONFIDENCE:
+        groups.update(_SINGLE_DATASET_GROUPS)
+    for name in predicted_tools or [None]:
+        if name in _TOOL_GROUP_BY_NAME:
+            groups.add(_TOOL_GROUP_BY_NAME[name])
+        else:
+            groups.update(PREDICTED_TOOL_GROUPS.get(name, _SINGLE_DATASET_GROUPS))
+    if dataset_count > 1:
+        groups.add("multi_dataset")
+    else:
+        groups.discard("multi_dataset")
+
+    names = {name for group in groups for name in TOOL_GROUPS[group]} | set(required or [])
+    return [tool for tool in registered_tools if tool.name in names]
+
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """tiktoken 인코더를 반환합니다. 설치되지 않았거나 인코딩 파일을 받을 수 없으면 None."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOOL_TOKEN_ENCODING)
+    except Exception:  # ImportError, 오프라인 환경의 다운로드 실패 등
+        return None
+
+
+def tool_schema_tokens(tools: list) -> tuple:
+    """도구들을 모델에 전달할 때의 함수 스키마(JSON) 토큰 수를 계산합니다.
+
+    Returns:
+        (토큰 수, 정확 여부) - tiktoken을 쓸 수 없으면 UTF-8 바이트 수 기반 추정치(4바이트당 1토큰)
+    """
+    schema = json.dumps([convert_to_openai_tool(tool) for tool in tools], ensure_ascii=False)
+    encoder = _token_encoder()
+    if encoder is None:
+        return -(-len(schema.encode("utf-8")) // 4), False
+    return len(encoder.encode(schema)), True
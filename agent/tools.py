@@ -1,21 +1,37 @@
 import os
+import contextvars
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
 from langchain_core.tools import tool
 
-# 전역 DataFrame 변수
-_global_df = None
+from agent.period_parser import parse_period_values, period_mask
+from agent.dimension_encoding import contains_mask, unique_values
+from agent.bitmap_index import get_dataset_index
+from agent.aggregate_cube import resolve_frame, is_cube_frame, count_records, cube_stats
+from agent.result_cache import cached_call, result_cache
+from agent.fuzzy_index import FuzzyIndex
+from agent.entity_extractor import get_entity_extractor, is_covered
+from agent.dataset_cache import get_or_build
+from agent.dtype_compaction import compaction_report, format_compaction_report
+from agent.dataset_profile import get_profile, PROFILE_APPROX_ROWS
+from agent.dataset_pool import map_datasets, format_timings
+from agent.parallel_scan import get_scan_index, use_parallel_scan
+
+# 현재 실행 컨텍스트(세션 요청)의 DataFrame
+# 스레드·비동기 작업마다 값이 따로 유지되므로 한 프로세스의 동시 세션끼리 섞이지 않음
+_current_df = contextvars.ContextVar("current_df", default=None)
 
 def set_dataframe(df: pd.DataFrame):
-    """전역 DataFrame을 설정합니다."""
-    global _global_df
-    _global_df = df
+    """현재 실행 컨텍스트의 DataFrame을 설정합니다. (범위를 한정하려면 dataset_context 사용)"""
+    _current_df.set(df)
 
 def get_dataframe() -> pd.DataFrame:
-    """전역 DataFrame을 반환합니다."""
-    global _global_df
-    if _global_df is None:
+    """현재 실행 컨텍스트의 DataFrame을 반환합니다."""
+    df = _current_df.get()
+    if df is None:
         raise ValueError("DataFrame이 설정되지 않았습니다. set_dataframe()을 먼저 호출하세요.")
-    return _global_df
+    return df
 
 # DEPRECATED: get_sales_volume_by_division - replaced by smart_query_processor
 # Use smart_query_processor for questions like "2023년 스테인리스의 매출수량"
@@ -27,17 +43,17 @@ def get_dataframe() -> pd.DataFrame:
 @tool
 def get_total_sales_volume_by_fund(fund_center: str) -> str:
     """특정 펀드센터(Funds Center)에 대한 전체 매출수량(M/T)을 계산합니다."""
-    df = get_dataframe()
-    filtered = df[df["FundsCenter"].str.contains(fund_center, na=False)]
-    total = filtered["매출수량(M/T)"].sum()
+    df = resolve_frame(get_dataframe(), ["매출수량(M/T)"], ["FundsCenter"])
+    mask = contains_mask(df["FundsCenter"], fund_center, regex=False)
+    total = df["매출수량(M/T)"][mask].sum()
     return f"{fund_center}의 총 매출수량은 {total:,.0f} 톤입니다."
 
 @tool
 def get_total_sales_volume_by_year(year: int) -> str:
     """특정 연도(Period/Year)의 전체 매출수량(M/T)을 계산합니다."""
-    df = get_dataframe()
-    filtered = df[df["Period/Year"].astype(str).str.contains(str(year))]
-    total = filtered["매출수량(M/T)"].sum()
+    df = resolve_frame(get_dataframe(), ["매출수량(M/T)"], ["Period/Year"])
+    mask = contains_mask(df["Period/Year"], str(year), as_text=True)
+    total = df["매출수량(M/T)"][mask].sum()
     return f"{year}년 전체 매출수량은 {total:,.0f} 톤입니다."
 
 # DEPRECATED: get_operating_profit_by_division - replaced by smart_query_processor
@@ -66,7 +82,7 @@ def get_total_sales_volume_by_year(year: int) -> str:
 @tool
 def get_overall_summary() -> str:
     """전체 데이터셋의 총 매출수량, 매출액, 영업이익을 요약하여 반환합니다."""
-    df = get_dataframe()
+    df = resolve_frame(get_dataframe(), ["매출수량(M/T)", "1.매출액", "5.영업이익"])
     volume = df["매출수량(M/T)"].sum()
     sales = df["1.매출액"].sum()
     profit = df["5.영업이익"].sum()
@@ -78,18 +94,11 @@ def get_overall_summary() -> str:
 def smart_query_processor(question: str) -> str:
     """복합 질문을 자동으로 파싱하고 advanced_multi_column_query를 실행합니다."""
     # 1. 엔티티 추출
-    entities = _extract_complex_entities(question)
-    
-    # 2. 추출된 정보로 advanced_multi_column_query 호출
-    result = _advanced_multi_column_query(
-        division=entities.get('division'),
-        country=entities.get('country'),
-        year=entities.get('year'),
-        period=entities.get('period'),
-        supplier=entities.get('supplier'),
-        funds_center=entities.get('funds_center'),
-        metric=entities.get('metric', '매출수량(M/T)')
-    )
+    entities = _extract_complex_entities(question, get_dataframe())
+    
+    # 2. 추출된 정보로 advanced_multi_column_query 호출 (같은 데이터·같은 조건이면 캐시 사용)
+    result = cached_call(get_dataframe(), "smart_query_processor", entities,
+                         lambda: _advanced_multi_column_query(**_query_arguments(entities)))
     
     # 3. 추출 정보 포함하여 결과 반환
     extraction_info = f"📋 추출된 정보:\n"
@@ -99,16 +108,36 @@ def smart_query_processor(question: str) -> str:
     
     return f"{extraction_info}\n{result}"
 
-def _advanced_multi_column_query(
+def _query_arguments(entities: dict, metric: str = None) -> dict:
+    """추출된 엔티티를 _advanced_multi_column_query/_select_rows 인자로 변환합니다."""
+    return {
+        'division': entities.get('division'),
+        'country': entities.get('country'),
+        'year': entities.get('year'),
+        'period': entities.get('period'),
+        'supplier': entities.get('supplier'),
+        'funds_center': entities.get('funds_center'),
+        'customer': entities.get('customer'),
+        'metric': metric or entities.get('metric') or '매출수량(M/T)',
+    }
+
+def _count_selected(frame: pd.DataFrame, index, bits: np.ndarray) -> int:
+    """비트맵에 선택된 원본 레코드 수를 반환합니다. (큐브 셀은 집계된 행 수 합계)"""
+    if is_cube_frame(frame):
+        return count_records(frame, index.to_mask(bits))
+    return index.count(bits)
+
+def _select_rows(
     division: str = None,
     country: str = None, 
     year: str = None,
     period: str = None,
     supplier: str = None,
     funds_center: str = None,
+    customer: str = None,
     metric: str = "매출수량(M/T)"
-) -> str:
-    """복합 조건으로 데이터를 필터링하고 지정된 지표를 계산합니다.
+) -> dict:
+    """복합 조건에 해당하는 행을 선택합니다.
     
     Args:
         division: 사업부/사업실 (예: "스테인리스", "전기강판")
@@ -117,105 +146,87 @@ def _advanced_multi_column_query(
         period: 기간 (예: "2022년", "상반기", "하반기", "1분기")
         supplier: 공급사 (예: "POSCO")
         funds_center: 그룹 (예: "열연수출1그룹", "냉연내수2그룹")
+        customer: 고객사 (Customer 컬럼 값)
         metric: 측정할 지표 (예: "매출수량(M/T)", "1.매출액", "5.영업이익")
+    
+    Returns:
+        {'frame', 'index', 'bits', 'filters_applied', 'filtered_count', 'original_count'}
     """
-    df = get_dataframe()
-    original_count = len(df)
+    source_df = get_dataframe()
+    original_count = len(source_df)
     filters_applied = []
+    # 큐브로 표현 가능한 조건이면 원본 행 대신 사전 집계된 큐브 셀에서 계산합니다.
+    filter_columns = [col for col, value in [
+        ("Division", division), ("Country", country), ("Period/Year", year or period),
+        ("Supplier", supplier), ("FundsCenter", funds_center), ("Customer", customer)
+    ] if value]
+    df = resolve_frame(source_df, [metric], filter_columns)
+    # 필터마다 DataFrame을 복사하지 않고 역색인 비트맵을 AND로 누적합니다.
+    # 대용량 원본은 차원 코드를 공유 메모리에 올려 두고, 조건을 고유값 단위로 누적한 뒤
+    # 행 단위 필터링·건수·합계는 작업자 프로세스들이 행 구간별로 계산합니다. (비트맵 대신 CodeFilter)
+    if not is_cube_frame(df) and use_parallel_scan(df, metric):
+        index = get_scan_index(df)
+    else:
+        index = get_dataset_index(df)
+    bits = index.all_rows()
     
-    # 조건별 필터링
+    # 조건별 필터링 (조건 값은 괄호 등이 들어간 실제 값일 수 있으므로 정규식이 아닌 문자 그대로 매칭)
     if division:
-        df = df[df["Division"].str.contains(division, na=False, case=False)]
+        bits &= index.contains("Division", division, case=False, regex=False)
         filters_applied.append(f"사업부: {division}")
     
     if country:
-        df = df[df["Country"].str.contains(country, na=False, case=False)]
+        bits &= index.contains("Country", country, case=False, regex=False)
         filters_applied.append(f"국가: {country}")
     
     if year:
-        # 강화된 연도 매칭 - 파싱 기능 사용
-        year_matched_rows = []
-        for idx, row in df.iterrows():
-            parsed_info = _parse_period_year(row['Period/Year'])
-            if 'year' in parsed_info and str(parsed_info['year']) == str(year):
-                year_matched_rows.append(idx)
+        # 강화된 연도 매칭 - 파싱된 연도 역색인 사용
+        year_bits = index.equals("year", int(year)) if str(year).isdigit() else index.no_rows()
+        year_matched = bits & year_bits
+        year_matched_count = _count_selected(df, index, year_matched)
         
-        if year_matched_rows:
-            df = df.loc[year_matched_rows]
-            filters_applied.append(f"연도: {year} (스마트매칭, {len(year_matched_rows)}개 레코드)")
+        if year_matched_count:
+            bits = year_matched
+            filters_applied.append(f"연도: {year} (스마트매칭, {year_matched_count}개 레코드)")
         else:
             # Fallback: 기존 패턴 매칭
-            df = df[df["Period/Year"].astype(str).str.contains(str(year), na=False)]
+            bits &= index.contains("Period/Year", str(year), as_text=True)
             filters_applied.append(f"연도: {year} (패턴매칭)")
     
     if period:
-        # 강화된 Period 매칭 - 새로운 파싱 기능 사용
+        # 강화된 Period 매칭 - 사전 계산된 달력 컬럼 사용
         if 'Period/Year' in df.columns:
             # 연도 컨텍스트 추론
             period_with_year = _infer_year_context(period)
-            unique_periods = df['Period/Year'].dropna().astype(str).unique().tolist()
+            unique_periods = index.selected_values(df['Period/Year'], bits, as_text=True)
             
             # 먼저 직접 매칭 시도
-            best_match, confidence = _find_best_match(period_with_year, unique_periods)
+            best_match, confidence = _find_best_match(period_with_year, unique_periods,
+                                                      index=_get_fuzzy_index(df, 'Period/Year'))
             
             if best_match and confidence >= 0.8:
-                df = df[df["Period/Year"].astype(str) == best_match]
+                bits &= index.equals("Period/Year", best_match, as_text=True)
                 match_info = f"연도추론" if period != period_with_year else "직접매칭"
                 filters_applied.append(f"기간: {period} → {best_match} (신뢰도: {confidence:.2f}, {match_info})")
             else:
-                # 새로운 스마트 매칭: 파싱된 정보로 필터링
-                matched_rows = []
-                for idx, row in df.iterrows():
-                    parsed_info = _parse_period_year(row['Period/Year'])
-                    
-                    # AND 조건: 연도와 기간 둘 다 만족해야 함
-                    year_match = True
-                    period_match = True
-                    
-                    # 연도 조건 검사
-                    if year:
-                        if 'year' not in parsed_info or str(year) != str(parsed_info['year']):
-                            year_match = False
-                    
-                    # 기간 조건 검사
-                    if "상반기" in period:
-                        if parsed_info.get('half_year') != '상반기':
-                            period_match = False
-                    elif "하반기" in period:
-                        if parsed_info.get('half_year') != '하반기':
-                            period_match = False
-                    elif re.search(r'(\d)분기', period):
-                        quarter_match = re.search(r'(\d)분기', period)
-                        if quarter_match and parsed_info.get('quarter') != f"{quarter_match.group(1)}분기":
-                            period_match = False
-                    # 월 범위 조건 처리
-                    elif re.search(r'(\d+)월부터\s*(\d+)월|(\d+)월-(\d+)월', period):
-                        # 월 범위 추출
-                        range_match = re.search(r'(\d+)월부터\s*(\d+)월', period) or re.search(r'(\d+)월-(\d+)월', period)
-                        if range_match:
-                            start_month = int(range_match.group(1))
-                            end_month = int(range_match.group(2))
-                            # 데이터의 월이 범위 안에 있는지 확인
-                            data_month = parsed_info.get('month_number')
-                            if data_month is None or not (start_month <= data_month <= end_month):
-                                period_match = False
-                    
-                    # 둘 다 만족하는 경우만 추가
-                    if year_match and period_match:
-                        matched_rows.append(idx)
+                # 스마트 매칭: 연도와 기간 둘 다 만족해야 함 (AND 조건)
+                # 기간 조건은 Period/Year 고유값만 파싱해 평가
+                periods = parse_period_values(index.values("Period/Year"))
+                period_matched = bits & index.matching("Period/Year", period_mask(periods, period, year))
+                period_matched_count = _count_selected(df, index, period_matched)
                 
-                if matched_rows:
-                    df = df.loc[matched_rows]
-                    filters_applied.append(f"기간: {period} (스마트매칭, {len(matched_rows)}개 레코드)")
+                if period_matched_count:
+                    bits = period_matched
+                    filters_applied.append(f"기간: {period} (스마트매칭, {period_matched_count}개 레코드)")
                 else:
                     # Fallback: 기존 패턴 매칭
                     print(f"스마트매칭 실패, Fallback 사용. 기간: {period}")
                     if "상반기" in period:
-                        df = df[df["Period/Year"].astype(str).str.contains("상반기|1분기|2분기|January|February|March|April|May|June", na=False)]
-                        filters_applied.append(f"기간: {period} (Fallback-상반기, {len(df)}개 레코드)")
+                        bits &= index.contains("Period/Year", "상반기|1분기|2분기|January|February|March|April|May|June", as_text=True)
+                        filters_applied.append(f"기간: {period} (Fallback-상반기, {_count_selected(df, index, bits)}개 레코드)")
                     elif "하반기" in period:
-                        df = df[df["Period/Year"].astype(str).str.contains("하반기|3분기|4분기|July|August|September|October|November|December", na=False)]
-                        filters_applied.append(f"기간: {period} (Fallback-하반기, {len(df)}개 레코드)")
+                        bits &= index.contains("Period/Year", "하반기|3분기|4분기|July|August|September|October|November|December", as_text=True)
+                        filters_applied.append(f"기간: {period} (Fallback-하반기, {_count_selected(df, index, bits)}개 레코드)")
                     elif re.search(r'(\d+)월부터\s*(\d+)월|(\d+)월-(\d+)월', period):
                         # 월 범위 Fallback
                         range_match = re.search(r'(\d+)월부터\s*(\d+)월', period) or re.search(r'(\d+)월-(\d+)월', period)
@@ -228,66 +239,127 @@ def _advanced_multi_column_query(
                             target_months = month_names[start_month-1:end_month]
                             korean_months = [f"{i}월" for i in range(start_month, end_month+1)]
                             pattern = '|'.join(target_months + korean_months)
-                            df = df[df["Period/Year"].astype(str).str.contains(pattern, na=False)]
-                            filters_applied.append(f"기간: {period} (Fallback-월범위, {len(df)}개 레코드)")
+                            bits &= index.contains("Period/Year", pattern, as_text=True)
+                            filters_applied.append(f"기간: {period} (Fallback-월범위, {_count_selected(df, index, bits)}개 레코드)")
                     else:
-                        df = df[df["Period/Year"].astype(str).str.contains(period, na=False)]
+                        bits &= index.contains("Period/Year", period, as_text=True, regex=False)
                         available_periods = ", ".join(unique_periods[:3])
                         filters_applied.append(f"기간: {period} (패턴매칭, 사용가능: {available_periods}...)")
         else:
             filters_applied.append(f"기간: {period} (Period/Year 컬럼 없음)")
     
     if supplier:
-        df = df[df["Supplier"].str.contains(supplier, na=False, case=False)]
+        bits &= index.contains("Supplier", supplier, case=False, regex=False)
         filters_applied.append(f"공급사: {supplier}")
     
     if funds_center:
         # 강화된 FundsCenter 매칭
         if 'FundsCenter' in df.columns:
-            unique_funds = df['FundsCenter'].dropna().unique().tolist()
-            best_match, confidence = _find_best_match(funds_center, unique_funds)
+            unique_funds = index.selected_values(df['FundsCenter'], bits)
+            best_match, confidence = _find_best_match(funds_center, unique_funds,
+                                                      index=_get_fuzzy_index(df, 'FundsCenter'))
             
             if best_match and confidence >= 0.7:
-                df = df[df["FundsCenter"] == best_match]
+                bits &= index.equals("FundsCenter", best_match)
                 match_type = "정확매칭" if confidence == 1.0 else "유사매칭"
                 filters_applied.append(f"펀드센터: {funds_center} → {best_match} (신뢰도: {confidence:.2f}, {match_type})")
             else:
                 # 매칭 실패시 사용 가능한 옵션 제안
-                df = df[df["FundsCenter"].str.contains(funds_center, na=False, case=False)]
+                bits &= index.contains("FundsCenter", funds_center, case=False, regex=False)
                 available_options = ", ".join(unique_funds[:5])
                 filters_applied.append(f"펀드센터: {funds_center} (매칭실패, 사용가능: {available_options}...)")
         else:
             filters_applied.append(f"펀드센터: {funds_center} (FundsCenter 컬럼 없음)")
     
+    if customer:
+        # 고객사는 고유값이 많아 역색인 대신 컬럼 마스크로 필터링 (병렬 스캔은 고객사 코드로 필터링)
+        bits &= index.series_contains(df["Customer"], customer, case=False, regex=False)
+        filters_applied.append(f"고객사: {customer}")
+    
+    return {
+        "frame": df,
+        "index": index,
+        "bits": bits,
+        "filters_applied": filters_applied,
+        "filtered_count": _count_selected(df, index, bits),
+        "original_count": original_count,
+    }
+
+def _selection_total(selection: dict, metric: str) -> float:
+    """선택된 행의 지표 합계를 계산합니다. (지표 컬럼은 최종 선택으로 한 번만 접근)
+
+    대용량 데이터(ScanIndex)는 작업자 프로세스들이 행 구간별 부분 합계를 계산합니다.
+    """
+    return selection["index"].total(selection["frame"][metric], selection["bits"])
+
+def _format_metric_value(metric: str, total: float) -> str:
+    """지표 단위에 맞게 합계를 표시용 문자열로 변환합니다."""
+    if metric == "매출수량(M/T)":
+        unit = "톤"
+        return f"{total:,.0f}{unit}"
+    elif "매출액" in metric or "이익" in metric:
+        # 원 단위 데이터를 억원 단위로 변환
+        billion_value = total / 100000000  # 1억 = 100,000,000
+        if billion_value >= 1:
+            return f"{billion_value:,.0f}억원"
+        return f"{total:,.0f}원"
+    return f"{total:,.0f}"
+
+def _advanced_multi_column_query(
+    division: str = None,
+    country: str = None, 
+    year: str = None,
+    period: str = None,
+    supplier: str = None,
+    funds_center: str = None,
+    customer: str = None,
+    metric: str = "매출수량(M/T)"
+) -> str:
+    """복합 조건으로 데이터를 필터링하고 지정된 지표를 계산합니다. (인자는 _select_rows와 동일)"""
+    selection = _select_rows(division, country, year, period, supplier, funds_center, customer, metric)
+    filters_applied = selection["filters_applied"]
+    filtered_count = selection["filtered_count"]
+    
     # 결과 계산
-    if len(df) == 0:
+    if filtered_count == 0:
         return f"조건에 맞는 데이터가 없습니다. 적용된 필터: {', '.join(filters_applied)}"
     
-    if metric in df.columns:
-        total = df[metric].sum()
-        filtered_count = len(df)
-        
-        # 단위 처리 및 값 변환
-        if metric == "매출수량(M/T)":
-            unit = "톤"
-            display_value = f"{total:,.0f}{unit}"
-        elif "매출액" in metric or "이익" in metric:
-            # 원 단위 데이터를 억원 단위로 변환
-            billion_value = total / 100000000  # 1억 = 100,000,000
-            if billion_value >= 1:
-                display_value = f"{billion_value:,.0f}억원"
-            else:
-                display_value = f"{total:,.0f}원"
-        else:
-            display_value = f"{total:,.0f}"
+    if metric in selection["frame"].columns:
+        display_value = _format_metric_value(metric, _selection_total(selection, metric))
         
         result = f"{', '.join(filters_applied)} 조건의 {metric}: {display_value}"
-        result += f"\n(총 {filtered_count:,}개 레코드 중에서 집계, 전체 데이터의 {filtered_count/original_count:.1%})"
+        result += f"\n(총 {filtered_count:,}개 레코드 중에서 집계, 전체 데이터의 {filtered_count/selection['original_count']:.1%})"
         
         return result
     else:
         return f"지표 '{metric}'를 찾을 수 없습니다. 사용 가능한 지표를 확인해주세요."
 
+def aggregate_by_entities(entities: dict, metric: str = None):
+    """추출된 엔티티 조건으로 지표 합계를 직접 계산합니다. (LLM 없이 사용하는 빠른 집계 경로)
+    
+    Returns:
+        {'metric', 'total', 'display_value', 'filters_applied', 'filtered_count', 'original_count'}
+        조건에 맞는 데이터가 없거나 지표 컬럼이 없으면 None
+    """
+    arguments = _query_arguments(entities, metric)
+    
+    def compute():
+        selection = _select_rows(**arguments)
+        metric_name = arguments["metric"]
+        if selection["filtered_count"] == 0 or metric_name not in selection["frame"].columns:
+            return None
+        total = _selection_total(selection, metric_name)
+        return {
+            "metric": metric_name,
+            "total": float(total),
+            "display_value": _format_metric_value(metric_name, total),
+            "filters_applied": selection["filters_applied"],
+            "filtered_count": selection["filtered_count"],
+            "original_count": selection["original_count"],
+        }
+    
+    return cached_call(get_dataframe(), "aggregate_by_entities", arguments, compute)
+
 # DEPRECATED: advanced_multi_column_query 제거됨
 # smart_query_processor 사용 권장
 
@@ -306,38 +378,43 @@ def comparative_analysis_tool(
     예시: 2023년 한국 vs 2023년 중국 매출 비교
     스테인리스 vs 전기강판 영업이익 비교
     """
-    df = get_dataframe()
-    
-    # 조건1 데이터 필터링
-    df1 = df.copy()
+    filter_columns = [col for col, values in [
+        ("Division", (condition1_division, condition2_division)),
+        ("Country", (condition1_country, condition2_country)),
+        ("Period/Year", (condition1_year, condition2_year)),
+    ] if any(values)]
+    df = resolve_frame(get_dataframe(), [metric], filter_columns)
+    
+    # 조건1 데이터 필터링 (복사 없이 행 마스크로 처리)
+    mask1 = np.ones(len(df), dtype=bool)
     condition1_desc = []
     if condition1_division:
-        df1 = df1[df1["Division"].str.contains(condition1_division, na=False, case=False)]
+        mask1 &= contains_mask(df["Division"], condition1_division, case=False, regex=False)
         condition1_desc.append(f"{condition1_division}")
     if condition1_country:
-        df1 = df1[df1["Country"].str.contains(condition1_country, na=False, case=False)]
+        mask1 &= contains_mask(df["Country"], condition1_country, case=False, regex=False)
         condition1_desc.append(f"{condition1_country}")
     if condition1_year:
-        df1 = df1[df1["Period/Year"].astype(str).str.contains(str(condition1_year), na=False)]
+        mask1 &= contains_mask(df["Period/Year"], str(condition1_year), as_text=True)
         condition1_desc.append(f"{condition1_year}년")
     
     # 조건2 데이터 필터링
-    df2 = df.copy()
+    mask2 = np.ones(len(df), dtype=bool)
     condition2_desc = []
     if condition2_division:
-        df2 = df2[df2["Division"].str.contains(condition2_division, na=False, case=False)]
+        mask2 &= contains_mask(df["Division"], condition2_division, case=False, regex=False)
         condition2_desc.append(f"{condition2_division}")
     if condition2_country:
-        df2 = df2[df2["Country"].str.contains(condition2_country, na=False, case=False)]
+        mask2 &= contains_mask(df["Country"], condition2_country, case=False, regex=False)
         condition2_desc.append(f"{condition2_country}")
     if condition2_year:
-        df2 = df2[df2["Period/Year"].astype(str).str.contains(str(condition2_year), na=False)]
+        mask2 &= contains_mask(df["Period/Year"], str(condition2_year), as_text=True)
         condition2_desc.append(f"{condition2_year}년")
     
     # 결과 계산
     if metric in df.columns:
-        result1 = df1[metric].sum()
-        result2 = df2[metric].sum()
+        result1 = df[metric][mask1].sum()
+        result2 = df[metric][mask2].sum()
         
         # 차이 계산
         diff = result1 - result2
@@ -370,7 +447,6 @@ def comparative_analysis_tool(
 
 import re
 from datetime import datetime
-from difflib import SequenceMatcher
 
 def _normalize_korean_text(text: str) -> str:
     """한국어 텍스트를 정규화합니다."""
@@ -388,49 +464,23 @@ def _normalize_korean_text(text: str) -> str:
     
     return text
 
-def _find_best_match(target: str, candidates: list, min_similarity: float = 0.7) -> tuple:
-    """최적 매칭을 찾습니다. (매칭값, 신뢰도) 반환"""
+def _find_best_match(target: str, candidates: list, min_similarity: float = 0.7, index: FuzzyIndex = None) -> tuple:
+    """최적 매칭을 찾습니다. (매칭값, 신뢰도) 반환
+    
+    index가 주어지면 컬럼별로 미리 만든 색인에서 candidates에 포함된 값만 매칭합니다.
+    """
     if not target or not candidates:
         return None, 0.0
     
-    target_normalized = _normalize_korean_text(target)
-    best_match = None
-    best_score = 0.0
-    
-    for candidate in candidates:
-        candidate_str = str(candidate)
-        candidate_normalized = _normalize_korean_text(candidate_str)
-        
-        # 1. 정확 매칭 (정규화 후)
-        if target_normalized == candidate_normalized:
-            return candidate_str, 1.0
-        
-        # 2. 부분 매칭 (양방향)
-        if target_normalized in candidate_normalized or candidate_normalized in target_normalized:
-            score = 0.9
-            if score > best_score:
-                best_match = candidate_str
-                best_score = score
-        
-        # 3. 유사도 매칭
-        similarity = SequenceMatcher(None, target_normalized, candidate_normalized).ratio()
-        if similarity > best_score and similarity >= min_similarity:
-            best_match = candidate_str
-            best_score = similarity
-        
-        # 4. 키워드 매칭 (그룹명 특화)
-        if '그룹' in target_normalized and '그룹' in candidate_normalized:
-            # 핵심 키워드 추출 ("열연수출" 등)
-            target_base = re.sub(r'\d*그룹.*', '', target_normalized)
-            candidate_base = re.sub(r'\d*그룹.*', '', candidate_normalized)
-            
-            if target_base and candidate_base and target_base in candidate_base:
-                score = 0.8
-                if score > best_score:
-                    best_match = candidate_str
-                    best_score = score
-    
-    return best_match, best_score
+    if index is None:
+        index = FuzzyIndex(candidates, _normalize_korean_text)
+    best_match, confidence, _ = index.match(target, candidates, min_similarity)
+    return best_match, confidence
+
+def _get_fuzzy_index(df: pd.DataFrame, column: str) -> FuzzyIndex:
+    """컬럼 고유값에 대한 퍼지 매칭 색인을 반환합니다. (DataFrame·컬럼당 1회 생성)"""
+    return get_or_build(df, f"fuzzy_index:{column}",
+                        lambda frame: FuzzyIndex(unique_values(frame[column], as_text=True), _normalize_korean_text))
 
 def _infer_year_context(period: str) -> str:
     """기간에서 연도 컨텍스트를 추론합니다."""
@@ -540,8 +590,12 @@ def _month_to_quarter(month: int) -> str:
         return '4분기'
     return ''
 
-def _extract_complex_entities(question: str) -> dict:
-    """복합 질문에서 엔티티를 정교하게 추출합니다."""
+def _extract_complex_entities(question: str, df: pd.DataFrame = None) -> dict:
+    """복합 질문에서 엔티티를 정교하게 추출합니다.
+    
+    데이터셋의 차원 고유값으로 만든 추출기로 질문을 한 번 훑어 사업부/그룹/국가/공급사/고객사를
+    찾고, 데이터에서 찾지 못한 항목만 기존 키워드·패턴 규칙으로 보완합니다.
+    """
     entities = {
         'funds_center': None,
         'division': None,
@@ -549,9 +603,16 @@ def _extract_complex_entities(question: str) -> dict:
         'period': None,
         'year': None,
         'supplier': None,
+        'customer': None,
         'metric': None
     }
     
+    extractor = get_entity_extractor(df)
+    hits = extractor.find(question) if extractor else []
+    for hit in hits:
+        if entities.get(hit['entity']) is None:
+            entities[hit['entity']] = hit['value']
+    
     # 그룹명 패턴 (숫자 포함)
     group_patterns = [
         r'([가-힣]+(?:수출|내수)?\d*그룹)',  # 열연수출1그룹, 냉연내수2그룹
@@ -559,18 +620,20 @@ def _extract_complex_entities(question: str) -> dict:
         r'(\w+그룹\d*)',                    # 영문그룹
     ]
     
-    for pattern in group_patterns:
-        match = re.search(pattern, question)
-        if match:
-            entities['funds_center'] = match.group(1)
-            break
+    if entities['funds_center'] is None:
+        for pattern in group_patterns:
+            match = re.search(pattern, question)
+            if match:
+                entities['funds_center'] = match.group(1)
+                break
     
-    # 사업부/Division 패턴
+    # 사업부/Division 패턴 (데이터 값에 포함된 구간은 제외)
     division_patterns = ['스테인리스', '모빌리티', '열연조강', '냉연', '후판선재', '스테인레스', '에너지인프라강재', '자동차소재']
-    for div in division_patterns:
-        if div in question:
-            entities['division'] = div
-            break
+    if entities['division'] is None:
+        for div in division_patterns:
+            if div in question and not is_covered(hits, question, div):
+                entities['division'] = div
+                break
     
     # 기간 패턴 - 월 범위 조건 추가
     if '상반기' in question:
@@ -602,10 +665,11 @@ def _extract_complex_entities(question: str) -> dict:
     
     # 국가 패턴
     countries = ['한국', '중국', '일본', '미국', '독일', '인도', '베트남', '태국' ]
-    for country in countries:
-        if country in question:
-            entities['country'] = country
-            break
+    if entities['country'] is None:
+        for country in countries:
+            if country in question and not is_covered(hits, question, country):
+                entities['country'] = country
+                break
     
     # 메트릭 패턴
     if '영업이익' in question:
@@ -632,6 +696,11 @@ def _extract_complex_entities(question: str) -> dict:
 def get_unique_values(column_name: str, limit: int = 50) -> str:
     """지정된 컬럼의 고유값들을 반환합니다."""
     df = get_dataframe()
+    return cached_call(df, "get_unique_values", {"column_name": column_name, "limit": limit},
+                       lambda: _unique_values_report(df, column_name, limit))
+
+def _unique_values_report(df: pd.DataFrame, column_name: str, limit: int) -> str:
+    """get_unique_values 결과 문자열을 생성합니다."""
     
     if column_name not in df.columns:
         available_columns = ", ".join(df.columns[:10])
@@ -661,67 +730,112 @@ def get_unique_values(column_name: str, limit: int = 50) -> str:
     return result
 
 @tool
-def get_column_info(column_name: str) -> str:
-    """지정된 컬럼의 상세 정보를 반환합니다."""
+def get_column_info(column_name: str, exact: bool = False) -> str:
+    """지정된 컬럼의 상세 정보를 반환합니다. 대용량 데이터는 근사 통계를 사용하며, exact=True면 정확히 계산합니다."""
     df = get_dataframe()
+    return cached_call(df, "get_column_info", {"column_name": column_name, "exact": exact},
+                       lambda: _column_info_report(df, column_name, exact))
+
+def _approximation_note(column, key: str) -> str:
+    """근사 통계의 추정 방법과 오차 범위를 표시합니다."""
+    bound = column.error_bounds.get(key)
+    if bound is None:
+        return ""
+    if key == "distinct":
+        return f" (HyperLogLog 추정, 상대 표준오차 ±{bound:.1%})"
+    return f" (KLL 추정, 순위 오차 ±{bound:.1%})"
+
+def _column_info_report(df: pd.DataFrame, column_name: str, exact: bool = False) -> str:
+    """get_column_info 결과 문자열을 생성합니다."""
     
     if column_name not in df.columns:
         available_columns = ", ".join(df.columns[:10])
         return f"❌ '{column_name}' 컬럼을 찾을 수 없습니다.\n사용 가능한 컬럼: {available_columns}..."
     
-    column_data = df[column_name]
+    profile = get_profile(df, exact=exact)
+    column = profile.columns[column_name]
+    row_count = profile.rows
+    approx = "약 " if column.approximate else ""
     
     result = f"📊 {column_name} 컬럼 정보:\n"
-    result += f"• 데이터 타입: {column_data.dtype}\n"
-    result += f"• 총 행 수: {len(column_data):,}\n"
-    result += f"• 결측값: {column_data.isnull().sum():,}개\n"
-    result += f"• 고유값 수: {column_data.nunique():,}개\n"
+    result += f"• 데이터 타입: {column.dtype}\n"
+    result += f"• 총 행 수: {row_count:,}\n"
+    result += f"• 결측값: {column.null_count:,}개\n"
+    result += f"• 고유값 수: {approx}{column.distinct_count:,}개{_approximation_note(column, 'distinct')}\n"
     
     # 데이터 타입별 상세 정보
-    if column_data.dtype in ['object', 'string']:
+    if column.kind == "text":
         result += f"\n📝 텍스트 컬럼 상세:\n"
         
         # 가장 많이 나타나는 상위 10개 값
-        top_values = column_data.value_counts().head(10)
         result += f"• 최빈값 TOP 10:\n"
-        for idx, (value, count) in enumerate(top_values.items(), 1):
-            percentage = (count / len(column_data)) * 100
+        for idx, (value, count) in enumerate(column.top_values, 1):
+            percentage = (count / row_count) * 100
             result += f"  {idx:2d}. {value} ({count:,}개, {percentage:.1f}%)\n"
             
-    elif column_data.dtype in ['int64', 'float64']:
+    elif column.kind == "numeric":
         result += f"\n📈 숫자 컬럼 상세:\n"
-        result += f"• 최솟값: {column_data.min():,.0f}\n"
-        result += f"• 최댓값: {column_data.max():,.0f}\n"
-        result += f"• 평균값: {column_data.mean():,.0f}\n"
-        result += f"• 중앙값: {column_data.median():,.0f}\n"
+        result += f"• 최솟값: {column.min:,.0f}\n"
+        result += f"• 최댓값: {column.max:,.0f}\n"
+        result += f"• 평균값: {column.mean:,.0f}\n"
+        result += f"• 중앙값: {approx}{column.median:,.0f}{_approximation_note(column, 'quantiles')}\n"
+    
+    if column.approximate:
+        result += f"\nℹ️ {PROFILE_APPROX_ROWS:,}행 이상 데이터라 근사 통계입니다. 정확한 값은 exact=True로 요청하세요.\n"
     
     return result
 
+def _describe_cube(df: pd.DataFrame) -> str:
+    """집계 큐브 크기, 생성 시간, 적중률을 한 줄로 요약합니다."""
+    stats = cube_stats(df)
+    hit_info = f"적중률 {stats['hit_rate']:.0%} ({stats['hits']:,}/{stats['hits'] + stats['misses']:,}회)"
+    if "cells" not in stats:
+        return f"집계 큐브: 미생성 (원본 행 스캔), {hit_info}"
+    return (f"집계 큐브: {stats['cells']:,}개 셀 / 원본 {stats['source_rows']:,}행, "
+            f"{stats['nbytes'] / 1024 / 1024:.1f} MB, 생성 {stats['build_seconds']:.2f}초, {hit_info}")
+
+def _describe_result_cache() -> str:
+    """결과 캐시 항목 수와 적중률을 한 줄로 요약합니다."""
+    stats = result_cache.stats()
+    return (f"결과 캐시: {stats['entries']:,}개 항목, 적중률 {stats['hit_rate']:.0%} "
+            f"({stats['hits']:,}/{stats['hits'] + stats['misses']:,}회)")
+
 @tool
-def explore_dataset() -> str:
-    """데이터셋의 전체 구조와 기본 정보를 제공합니다."""
+def explore_dataset(exact: bool = False) -> str:
+    """데이터셋의 전체 구조와 기본 정보를 제공합니다. 대용량 데이터는 근사 통계를 사용하며, exact=True면 정확히 계산합니다."""
     df = get_dataframe()
     
     result = f"📊 데이터셋 전체 개요:\n"
     result += f"• 총 행 수: {len(df):,}\n"
     result += f"• 총 컬럼 수: {len(df.columns)}\n"
-    result += f"• 메모리 사용량: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB\n\n"
-    
-    result += f"📋 컬럼 목록 및 기본 정보:\n"
-    for i, col in enumerate(df.columns, 1):
-        dtype = str(df[col].dtype)
-        null_count = df[col].isnull().sum()
-        unique_count = df[col].nunique()
-        
+    result += f"• 메모리 사용량: {get_profile(df).memory_bytes / 1024 / 1024:.1f} MB\n"
+    report = compaction_report(df)
+    if report:
+        result += f"• 로드 시 타입 압축: {format_compaction_report(report)}\n"
+    index = get_dataset_index(df)
+    result += f"• 비트맵 인덱스: {index.nbytes / 1024 / 1024:.1f} MB ({len(index.dimensions)}개 차원, {index.value_count:,}개 값)\n"
+    result += f"• {_describe_cube(df)}\n"
+    result += f"• {_describe_result_cache()}\n"
+    if get_profile(df, exact=exact).approximate:
+        result += f"• 프로파일: 근사 모드 ({PROFILE_APPROX_ROWS:,}행 이상, 수치 컬럼 고유값·중앙값은 스케치 추정 · exact=True로 정확 계산)\n"
+    result += "\n"
+    
+    # 컬럼별 통계는 데이터가 바뀌지 않는 한 동일하므로 캐시된 결과를 사용
+    result += cached_call(df, "explore_dataset", {"exact": exact}, lambda: _dataset_columns_report(df, exact))
+    return result
+
+def _dataset_columns_report(df: pd.DataFrame, exact: bool = False) -> str:
+    """explore_dataset의 컬럼 목록 및 기본 정보 부분을 생성합니다."""
+    result = f"📋 컬럼 목록 및 기본 정보:\n"
+    for i, (col, column) in enumerate(get_profile(df, exact=exact).columns.items(), 1):
         result += f"{i:2d}. {col}\n"
-        result += f"    - 타입: {dtype}\n"
-        result += f"    - 고유값: {unique_count:,}개\n"
-        result += f"    - 결측값: {null_count:,}개\n"
+        result += f"    - 타입: {column.dtype}\n"
+        result += f"    - 고유값: {'약 ' if column.approximate else ''}{column.distinct_count:,}개\n"
+        result += f"    - 결측값: {column.null_count:,}개\n"
         
         # 샘플 값 표시 (텍스트 컬럼의 경우)
-        if dtype == 'object' and unique_count <= 20:
-            sample_values = df[col].dropna().unique()[:5]
-            sample_str = ", ".join([str(v) for v in sample_values])
+        if column.kind == "text" and column.distinct_count <= 20:
+            sample_str = ", ".join([str(v) for v in column.sample_values])
             if len(sample_str) > 50:
                 sample_str = sample_str[:47] + "..."
             result += f"    - 샘플: {sample_str}\n"
@@ -758,18 +872,48 @@ def test_period_recognition(sample_limit: int = 10) -> str:
 import pandas as pd
 from langchain_core.tools import tool
 
-# 전역 변수로 여러 데이터셋 관리
-_global_datasets = {}
+# 현재 실행 컨텍스트(세션 요청)의 여러 데이터셋 {이름: DataFrame}
+_current_datasets = contextvars.ContextVar("current_datasets", default=None)
 
 def set_datasets(datasets_dict: dict):
-    """여러 데이터셋을 설정합니다."""
-    global _global_datasets
-    _global_datasets = datasets_dict
+    """현재 실행 컨텍스트의 여러 데이터셋을 설정합니다. (범위를 한정하려면 dataset_context 사용)"""
+    _current_datasets.set(datasets_dict)
 
 def get_datasets() -> dict:
-    """모든 데이터셋을 반환합니다."""
-    global _global_datasets
-    return _global_datasets
+    """현재 실행 컨텍스트의 모든 데이터셋을 반환합니다."""
+    datasets = _current_datasets.get()
+    return datasets if datasets is not None else {}
+
+@contextmanager
+def dataset_context(df: pd.DataFrame = None, datasets: dict = None):
+    """with 블록 안에서 실행되는 도구들이 사용할 DataFrame/데이터셋을 설정합니다.
+
+    값은 현재 스레드(또는 비동기 작업)의 컨텍스트에만 적용되고 블록을 벗어나면 이전 값으로
+    돌아가므로, 한 프로세스에서 여러 세션의 질의를 동시에 처리해도 서로의 데이터를 보지 않습니다.
+    None인 인자는 현재 값을 그대로 둡니다.
+    """
+    tokens = []
+    if df is not None:
+        tokens.append((_current_df, _current_df.set(df)))
+    if datasets is not None:
+        tokens.append((_current_datasets, _current_datasets.set(datasets)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def _summary_partial(df: pd.DataFrame) -> dict:
+    """데이터셋 기본 정보 비교용 부분 결과 (프로파일 기반)"""
+    profile = get_profile(df)
+    return {
+        "rows": profile.rows,
+        "column_count": profile.column_count,
+        "memory_bytes": profile.memory_bytes,
+        "compaction": compaction_report(df),
+        "null_count": profile.null_count,
+        "numeric_columns": len(profile.numeric_columns),
+    }
 
 @tool
 def compare_datasets_summary() -> str:
@@ -781,21 +925,36 @@ def compare_datasets_summary() -> str:
     
     result = "📊 데이터셋 기본 정보 비교:\n\n"
     
-    for name, df in datasets.items():
+    # 데이터셋별 부분 계산은 동시에, 출력은 등록 순서대로
+    partials = map_datasets(datasets, _summary_partial)
+    for name, summary, _ in partials:
         result += f"🗂️ **{name}**\n"
-        result += f"  • 행 수: {len(df):,}개\n"
-        result += f"  • 열 수: {len(df.columns)}개\n"
-        result += f"  • 메모리: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB\n"
-        result += f"  • 결측값: {df.isnull().sum().sum():,}개\n"
+        result += f"  • 행 수: {summary['rows']:,}개\n"
+        result += f"  • 열 수: {summary['column_count']}개\n"
+        result += f"  • 메모리: {summary['memory_bytes'] / 1024 / 1024:.1f}MB\n"
+        if summary["compaction"]:
+            result += f"  • 타입 압축: {format_compaction_report(summary['compaction'])}\n"
+        result += f"  • 결측값: {summary['null_count']:,}개\n"
         
         # 주요 수치형 컬럼 요약
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            result += f"  • 수치형 컬럼: {len(numeric_cols)}개\n"
+        if summary["numeric_columns"] > 0:
+            result += f"  • 수치형 컬럼: {summary['numeric_columns']}개\n"
         result += "\n"
     
+    result = result.rstrip("\n") + "\n\n" + format_timings(partials) + "\n"
     return result
 
+def _metric_partial(df: pd.DataFrame, metric: str):
+    """지표 비교용 부분 결과 (합계, 평균, 결측 제외 건수). 지표 컬럼이 없으면 None"""
+    if metric not in df.columns:
+        return None
+    values = df[metric]
+    return {
+        'total': values.sum(),
+        'mean': values.mean(),
+        'count': int(values.count())
+    }
+
 @tool  
 def compare_datasets_metrics(metric: str = "매출수량(M/T)") -> str:
     """여러 데이터셋 간의 특정 지표를 비교합니다."""
@@ -807,30 +966,23 @@ def compare_datasets_metrics(metric: str = "매출수량(M/T)") -> str:
     result = f"📈 {metric} 비교 분석:\n\n"
     metric_results = {}
     
-    for name, df in datasets.items():
-        if metric in df.columns:
-            total = df[metric].sum()
-            mean = df[metric].mean()
-            count = len(df[df[metric].notna()])
-            
-            metric_results[name] = {
-                'total': total,
-                'mean': mean, 
-                'count': count
-            }
-            
-            # 단위 처리
-            if metric == "매출수량(M/T)":
-                unit = "톤"
-            elif "매출액" in metric or "이익" in metric:
-                unit = "억원"
-            else:
-                unit = ""
+    # 단위 처리
+    if metric == "매출수량(M/T)":
+        unit = "톤"
+    elif "매출액" in metric or "이익" in metric:
+        unit = "억원"
+    else:
+        unit = ""
+    
+    partials = map_datasets(datasets, _metric_partial, metric)
+    for name, data, _ in partials:
+        if data is not None:
+            metric_results[name] = data
             
             result += f"🗂️ **{name}**\n"
-            result += f"  • 총합: {total:,.0f}{unit}\n"
-            result += f"  • 평균: {mean:,.0f}{unit}\n"
-            result += f"  • 레코드 수: {count:,}개\n\n"
+            result += f"  • 총합: {data['total']:,.0f}{unit}\n"
+            result += f"  • 평균: {data['mean']:,.0f}{unit}\n"
+            result += f"  • 레코드 수: {data['count']:,}개\n\n"
         else:
             result += f"🗂️ **{name}**: ❌ '{metric}' 컬럼 없음\n\n"
     
@@ -840,7 +992,6 @@ def compare_datasets_metrics(metric: str = "매출수량(M/T)") -> str:
         
         result += "🏆 **순위 및 차이 분석:**\n"
         for i, (name, data) in enumerate(sorted_results, 1):
-            unit = "톤" if metric == "매출수량(M/T)" else "억원" if "매출액" in metric or "이익" in metric else ""
             result += f"  {i}. {name}: {data['total']:,.0f}{unit}\n"
         
         if len(sorted_results) >= 2:
@@ -851,8 +1002,36 @@ def compare_datasets_metrics(metric: str = "매출수량(M/T)") -> str:
             
             result += f"\n📊 **{top_name}**이 **{second_name}**보다 {diff:,.0f}{unit} 많음 (+{diff_pct:.1f}%)\n"
     
+    result = result.rstrip("\n") + "\n\n" + format_timings(partials) + "\n"
     return result
 
+# 사업부별 비교에서 집계하는 지표 (컬럼명, 표시명, 단위)
+_DIVISION_METRICS = [
+    ("매출수량(M/T)", "매출수량", "톤"),
+    ("1.매출액", "매출액", "억원"),
+    ("5.영업이익", "영업이익", "억원"),
+]
+
+def _division_partial(df: pd.DataFrame, division: str = None):
+    """사업부별 비교용 부분 결과. Division 컬럼이 없으면 None
+
+    필터링된 DataFrame을 만들지 않고 필요한 지표 컬럼에만 마스크를 적용합니다.
+    """
+    if 'Division' not in df.columns:
+        return None
+    mask = contains_mask(df["Division"], division, case=False, regex=False) if division else None
+    partial = {"totals": {}, "records": int(mask.sum()) if mask is not None else len(df), "top": None}
+    for column, _, _ in _DIVISION_METRICS:
+        if column in df.columns:
+            values = df[column] if mask is None else df[column][mask]
+            partial["totals"][column] = values.sum()
+    
+    # 사업부별 상세 (전체 조회시)
+    if not division and "매출수량(M/T)" in df.columns:
+        division_summary = df.groupby('Division', observed=True)['매출수량(M/T)'].sum().reset_index()
+        partial["top"] = division_summary.sort_values('매출수량(M/T)', ascending=False).head(3)
+    return partial
+
 @tool
 def compare_datasets_by_division(division: str = None) -> str:
     """여러 데이터셋에서 특정 사업부별 데이터를 비교합니다."""
@@ -866,53 +1045,61 @@ def compare_datasets_by_division(division: str = None) -> str:
         result += f" - {division}"
     result += ":\n\n"
     
-    for name, df in datasets.items():
-        filtered_df = df
-        
-        if division and 'Division' in df.columns:
-            filtered_df = df[df["Division"].str.contains(division, na=False, case=False)]
-        
+    partials = map_datasets(datasets, _division_partial, division)
+    for name, partial, _ in partials:
         result += f"🗂️ **{name}**\n"
         
-        if 'Division' in df.columns:
+        if partial is not None:
             if division:
                 result += f"  📋 {division} 관련 데이터:\n"
             else:
                 result += f"  📋 전체 사업부 현황:\n"
             
-            # 매출수량 집계
-            if "매출수량(M/T)" in filtered_df.columns:
-                volume = filtered_df["매출수량(M/T)"].sum()
-                result += f"    • 매출수량: {volume:,.0f} 톤\n"
+            for column, label, unit in _DIVISION_METRICS:
+                if column in partial["totals"]:
+                    result += f"    • {label}: {partial['totals'][column]:,.0f} {unit}\n"
             
-            # 매출액 집계  
-            if "1.매출액" in filtered_df.columns:
-                sales = filtered_df["1.매출액"].sum()
-                result += f"    • 매출액: {sales:,.0f} 억원\n"
+            result += f"    • 레코드 수: {partial['records']:,}개\n"
             
-            # 영업이익 집계
-            if "5.영업이익" in filtered_df.columns:
-                profit = filtered_df["5.영업이익"].sum()
-                result += f"    • 영업이익: {profit:,.0f} 억원\n"
-            
-            result += f"    • 레코드 수: {len(filtered_df):,}개\n"
-            
-            # 사업부별 상세 (전체 조회시)
-            if not division and "매출수량(M/T)" in filtered_df.columns:
-                division_summary = filtered_df.groupby('Division')['매출수량(M/T)'].sum().reset_index()
-                division_summary = division_summary.sort_values('매출수량(M/T)', ascending=False)
-                
-                if len(division_summary) > 0:
-                    result += f"    📊 상위 3개 사업부:\n"
-                    for idx, row in division_summary.head(3).iterrows():
-                        result += f"      {idx+1}. {row['Division']}: {row['매출수량(M/T)']:,.0f} 톤\n"
+            if partial["top"] is not None and len(partial["top"]) > 0:
+                result += f"    📊 상위 3개 사업부:\n"
+                for idx, row in partial["top"].iterrows():
+                    result += f"      {idx+1}. {row['Division']}: {row['매출수량(M/T)']:,.0f} 톤\n"
         else:
             result += f"  ❌ Division 컬럼 없음\n"
         
         result += "\n"
     
+    result = result.rstrip("\n") + "\n\n" + format_timings(partials) + "\n"
     return result
 
+def _integrated_partial(df: pd.DataFrame, metric: str, group_by: str) -> dict:
+    """한 데이터셋의 그룹별 부분 집계(합계, 건수)와 지표 합계를 계산합니다. (복사/결합 없음)"""
+    partial = {"rows": len(df), "memory_bytes": get_profile(df).memory_bytes, "groups": None, "total": 0,
+               "has_metric": metric in df.columns, "has_group": group_by in df.columns}
+    if metric in df.columns:
+        values = df[metric]
+        partial["total"] = values.sum()
+    else:
+        # 지표가 없는 데이터셋의 그룹도 합계 0, 건수 0으로 순위에 포함 (통합 후 집계와 동일)
+        values = pd.Series(np.nan, index=df.index)
+    if group_by in df.columns:
+        groups = values.groupby(df[group_by], observed=True).agg(['sum', 'count'])
+        # 데이터셋마다 범주가 달라도 값 기준으로 병합되도록 일반 인덱스로 변환
+        groups.index = pd.Index(np.asarray(groups.index, dtype=object), name=group_by)
+        partial["groups"] = groups
+    return partial
+
+def _merge_integrated_partials(partials: list, group_by: str) -> pd.DataFrame:
+    """데이터셋별 부분 집계를 합쳐 그룹별 sum/mean/count를 만듭니다. (그룹 키 정렬 순서)"""
+    frames = [partial["groups"] for partial in partials if partial["groups"] is not None]
+    if not frames:
+        return pd.DataFrame(columns=[group_by, 'sum', 'mean', 'count'])
+    merged = pd.concat(frames).groupby(level=0).sum()
+    merged['mean'] = merged['sum'] / merged['count']
+    merged.index.name = group_by
+    return merged[['sum', 'mean', 'count']].reset_index()
+
 @tool
 def integrated_dataset_analysis(metric: str = "매출수량(M/T)", group_by: str = "Division") -> str:
     """모든 데이터셋을 통합하여 분석합니다."""
@@ -921,24 +1108,24 @@ def integrated_dataset_analysis(metric: str = "매출수량(M/T)", group_by: str
     if len(datasets) < 2:
         return "❌ 통합 분석하려면 최소 2개의 데이터셋이 필요합니다."
     
-    # 모든 데이터셋 통합
-    combined_data = []
-    for name, df in datasets.items():
-        df_copy = df.copy()
-        df_copy['데이터셋'] = name
-        combined_data.append(df_copy)
-    
-    integrated_df = pd.concat(combined_data, ignore_index=True)
+    # 데이터셋별 부분 집계 (map) → 병합 (reduce): 전체 데이터를 복사/결합하지 않음
+    partials = {}
+    has_metric = has_group = False
+    for name, partial, _ in map_datasets(datasets, _integrated_partial, metric, group_by):
+        partials[name] = partial
+        has_metric = has_metric or partial["has_metric"]
+        has_group = has_group or partial["has_group"]
     
     result = f"📊 통합 데이터셋 분석 ({metric} 기준):\n\n"
     result += f"🔗 **통합 정보:**\n"
-    result += f"  • 총 행 수: {len(integrated_df):,}개\n"
+    result += f"  • 총 행 수: {sum(partial['rows'] for partial in partials.values()):,}개\n"
     result += f"  • 데이터셋 수: {len(datasets)}개\n"
-    result += f"  • 통합 후 메모리: {integrated_df.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB\n\n"
+    integrated_bytes = sum(partial["memory_bytes"] for partial in partials.values())
+    result += f"  • 통합 후 메모리: {integrated_bytes / 1024 / 1024:.1f}MB\n\n"
     
-    if metric in integrated_df.columns and group_by in integrated_df.columns:
+    if has_metric and has_group:
         # 그룹별 통합 분석
-        grouped = integrated_df.groupby(group_by)[metric].agg(['sum', 'mean', 'count']).reset_index()
+        grouped = _merge_integrated_partials(list(partials.values()), group_by)
         grouped = grouped.sort_values('sum', ascending=False)
         
         result += f"📈 **{group_by}별 {metric} 통합 순위:**\n"
@@ -956,7 +1143,10 @@ def integrated_dataset_analysis(metric: str = "매출수량(M/T)", group_by: str
         
         # 데이터셋별 기여도 분석
         result += f"\n🎯 **데이터셋별 기여도 분석:**\n"
-        dataset_contribution = integrated_df.groupby('데이터셋')[metric].sum().reset_index()
+        dataset_contribution = pd.DataFrame({
+            '데이터셋': list(partials),
+            metric: [partial["total"] for partial in partials.values()]
+        }).sort_values('데이터셋', ignore_index=True)
         dataset_contribution = dataset_contribution.sort_values(metric, ascending=False)
         
         total_sum = dataset_contribution[metric].sum()
@@ -968,4 +1158,4 @@ def integrated_dataset_analysis(metric: str = "매출수량(M/T)", group_by: str
     else:
         result += f"❌ '{metric}' 또는 '{group_by}' 컬럼을 찾을 수 없습니다.\n"
     
-    return result
\ No newline at end of file
+    return result
@@ -3,6 +3,17 @@ import streamlit as st
 import pandas as pd
 from agent.graph_flow import graph_executor
 from agent.tools import *
+from agent.bitmap_index import get_dataset_index
+from agent.aggregate_cube import get_cube, cube_stats
+from agent.result_cache import result_cache
+from agent.entity_extractor import get_entity_extractor
+from agent.sheet_cache import sheet_cache
+from agent.excel_ingest import SCHEMA_COLUMNS
+from agent.lazy_workbook import LazyWorkbook, LazyDatasets, parsed_sheets, prefetch
+from agent.parallel_ingest import run_tasks, parse_csv_task
+from agent.dtype_compaction import compaction_report, format_compaction_report
+from agent.dataset_profile import get_profile
+from agent.dataset_registry import dataset_registry
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
@@ -27,6 +38,10 @@ uploaded_files = st.file_uploader(
     type=["xlsx", "csv"], 
     accept_multiple_files=True
 )
+schema_only = st.checkbox(
+    "분석 컬럼만 불러오기 (Division, FundsCenter, Period/Year, Country, Supplier, 지표 컬럼 · 대용량 파일 메모리 절약)",
+    value=False
+)
 
 # 세션 상태 초기화
 if "uploaded_datasets" not in st.session_state:
@@ -36,23 +51,124 @@ if "chat_history" not in st.session_state:
 if "active_dataset" not in st.session_state:
     st.session_state.active_dataset = None
 
+def prepare_dataset(df):
+    """불러온 시트의 차원 색인, 집계 큐브, 엔티티 추출기를 미리 생성합니다."""
+    get_dataset_index(df)  # 차원별 비트맵 역색인 사전 생성
+    get_cube(df)  # 주요 지표 사전 집계 큐브 생성
+    get_entity_extractor(df)  # 질문 엔티티 추출 오토마톤 생성
+
+
+def load_sheet(dataset, sheet_name):
+    """시트를 불러옵니다. 아직 파싱되지 않은 엑셀 시트는 진행률을 표시하며 파싱합니다."""
+    sheets = dataset['sheets']
+    if not isinstance(sheets, LazyWorkbook) or sheets.is_loaded(sheet_name):
+        return sheets[sheet_name]
+    
+    progress_bar = st.progress(0.0, text=f"'{dataset['name']} - {sheet_name}' 불러오는 중...")
+    
+    def report_progress(done, total):
+        fraction = min(done / total, 1.0) if total else 0.0
+        progress_bar.progress(fraction, text=f"'{dataset['name']}' - {sheet_name}: {done:,}행 처리")
+    
+    df = sheets.load(sheet_name, progress=report_progress)
+    progress_bar.empty()
+    return df
+
+
+# 그래프 노드별 진행 표시 이름
+NODE_LABELS = {
+    "router_node": "🧭 데이터셋 라우팅",
+    "context_aware_node": "🧠 대화 맥락 분석",
+    "multi_context_aware_node": "🧠 다중 데이터셋 맥락 분석",
+    "intent_classification_node": "🎯 의도 분류",
+    "multi_intent_classification_node": "🎯 다중 데이터셋 의도 분류",
+    "query_planning_node": "🗺️ 실행 계획 수립",
+    "multi_query_planning_node": "🗺️ 다중 데이터셋 실행 계획",
+    "quick_answer_node": "⚡ 빠른 답변",
+    "plan_execution_node": "🛠️ 실행 계획 도구 실행",
+    "single_dataset_agent": "🤖 에이전트 답변 생성",
+    "dataset_branch_agent": "🔀 데이터셋별 분석",
+    "multi_dataset_agent": "🤖 데이터셋 간 비교 종합",
+}
+
+# 답변 토큰을 스트리밍하는 LLM 에이전트 노드
+ANSWER_NODES = {"single_dataset_agent", "multi_dataset_agent"}
+
+
+def describe_node_update(node, update):
+    """노드 완료 이벤트를 진행 표시 한 줄로 만듭니다."""
+    update = update or {}
+    details = ""
+    if update.get("intent_info"):
+        intent_info = update["intent_info"]
+        details = f"{intent_info.get('intent')} (신뢰도: {intent_info.get('confidence', 0.0):.2f})"
+    elif update.get("query_plan"):
+        details = update["query_plan"].get("strategy", "")
+    elif update.get("plan_execution"):
+        plan_execution = update["plan_execution"]
+        details = f"{plan_execution['tool']} · {plan_execution['elapsed_seconds']:.2f}초"
+    elif update.get("dataset_results"):
+        details = " · ".join(f"{item['dataset']} {item['elapsed_seconds']:.2f}초" for item in update["dataset_results"])
+    elif update.get("tool_scope"):
+        scope = update["tool_scope"]
+        details = (f"도구 {scope['tool_count']}/{scope['all_tool_count']}개 · "
+                   f"스키마 토큰 {scope['schema_tokens']:,}/{scope['all_schema_tokens']:,}")
+    elif update.get("context_used"):
+        details = "이전 대화 맥락 반영"
+    label = f"✅ {NODE_LABELS.get(node, node)}"
+    return f"{label} — {details}" if details else label
+
+
+def stream_graph(inputs, status, answer_placeholder):
+    """그래프를 스트리밍 실행합니다.
+
+    노드 완료와 도구 호출은 status에, 답변 토큰은 생성되는 대로 answer_placeholder에 표시합니다.
+    최종 상태(graph_executor.invoke 결과와 동일)를 반환합니다.
+    """
+    final_state, answer = {}, ""
+    for mode, chunk in graph_executor.stream(inputs, stream_mode=["updates", "messages", "custom", "values"]):
+        if mode == "values":
+            final_state = chunk
+        elif mode == "updates":
+            for node, update in chunk.items():
+                status.write(describe_node_update(node, update))
+                # 빠른 답변 등 LLM 없이 만든 답변은 노드 완료 시 바로 표시
+                if update and update.get("output") and node not in ANSWER_NODES:
+                    answer_placeholder.markdown(update["output"])
+        elif mode == "custom":
+            # 데이터셋별 분기에서 보낸 이벤트는 데이터셋 이름을 앞에 표시
+            origin = f"[{chunk['dataset']}] " if chunk.get("dataset") else ""
+            if chunk.get("type") == "tool_start":
+                status.write(f"🔧 {origin}도구 호출: `{chunk['tool']}` {chunk['tool_input']}")
+            elif chunk.get("type") == "tool_end":
+                status.write(f"📎 {origin}`{chunk['tool']}` 결과 수신")
+        elif mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") in ANSWER_NODES and isinstance(message.content, str) and message.content:
+                answer += message.content
+                answer_placeholder.markdown(answer + "▌")
+    return final_state
+
+
 if uploaded_files:
-    # 업로드된 파일들 처리
+    # 업로드된 파일들 처리 (파싱은 파일/시트별 작업으로 모아 프로세스 풀에서 동시 실행)
+    parse_tasks = {}
+    pending_files = {}
     for uploaded_file in uploaded_files:
         file_key = f"{uploaded_file.name}_{uploaded_file.size}"
         
         # 이미 처리된 파일인지 확인
-        if file_key not in st.session_state.uploaded_datasets:
+        if file_key not in st.session_state.uploaded_datasets and file_key not in pending_files:
             try:
                 # 엑셀 파일 처리
                 if uploaded_file.name.endswith('.xlsx'):
-                    xls = pd.ExcelFile(uploaded_file)
-                    sheets_data = {}
-                    
-                    for sheet_name in xls.sheet_names:
-                        df = xls.parse(sheet_name)
-                        df.columns = df.columns.str.strip().str.replace(" ", "").str.replace("\t", "")
-                        sheets_data[sheet_name] = df
+                    # 시트 메타데이터(이름, 예상 행 수, 헤더)만 등록하고 시트는 선택/참조될 때 파싱
+                    sheets_data = LazyWorkbook(
+                        uploaded_file.getvalue(),
+                        uploaded_file.name,
+                        columns=SCHEMA_COLUMNS if schema_only else None,
+                        prepare=prepare_dataset
+                    )
                     
                     st.session_state.uploaded_datasets[file_key] = {
                         'name': uploaded_file.name,
@@ -60,19 +176,43 @@ if uploaded_files:
                         'file_type': 'excel'
                     }
                     
+                    # 첫 시트는 다른 파일들과 함께 미리 파싱
+                    first_sheet = next(iter(sheets_data), None)
+                    if first_sheet is not None and sheets_data.load_cached(first_sheet) is None:
+                        parse_tasks[file_key] = sheets_data.parse_task(first_sheet)
+                        pending_files[file_key] = (uploaded_file.name, first_sheet)
+                    
                 # CSV 파일 처리  
                 elif uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                    df.columns = df.columns.str.strip().str.replace(" ", "").str.replace("\t", "")
+                    columns = SCHEMA_COLUMNS if schema_only else None
+                    parse_tasks[file_key] = (parse_csv_task, (uploaded_file.getvalue(), columns))
+                    pending_files[file_key] = (uploaded_file.name, None)
                     
+            except Exception as e:
+                st.error(f"파일 '{uploaded_file.name}' 처리 중 오류: {str(e)}")
+    
+    if parse_tasks:
+        with st.spinner(f"{len(parse_tasks)}개 파일을 병렬로 읽는 중..."):
+            parse_results = run_tasks(parse_tasks)
+        
+        for file_key, (df, error) in parse_results.items():
+            file_name, sheet_name = pending_files[file_key]
+            if error is not None:
+                st.error(f"파일 '{file_name}' 처리 중 오류: {str(error)}")
+                continue
+            
+            try:
+                if sheet_name is not None:
+                    st.session_state.uploaded_datasets[file_key]['sheets'].register(sheet_name, df)
+                else:
+                    prepare_dataset(df)
                     st.session_state.uploaded_datasets[file_key] = {
-                        'name': uploaded_file.name,
+                        'name': file_name,
                         'sheets': {'Sheet1': df},
                         'file_type': 'csv'
                     }
-                    
             except Exception as e:
-                st.error(f"파일 '{uploaded_file.name}' 처리 중 오류: {str(e)}")
+                st.error(f"파일 '{file_name}' 처리 중 오류: {str(e)}")
     
     # 업로드된 파일 목록 표시
     if st.session_state.uploaded_datasets:
@@ -87,16 +227,47 @@ if uploaded_files:
                 file_options.append(display_name)
                 file_keys.append((key, sheet_name))
         
+        def format_option(idx):
+            key, sheet_name = file_keys[idx]
+            sheets = st.session_state.uploaded_datasets[key]['sheets']
+            if isinstance(sheets, LazyWorkbook) and not sheets.is_loaded(sheet_name):
+                estimated_rows = sheets.info(sheet_name)['estimated_rows']
+                if estimated_rows is not None:
+                    return f"{file_options[idx]} (약 {estimated_rows:,}행, 미로드)"
+            return file_options[idx]
+        
         selected_idx = st.selectbox(
             "🎯 분석할 데이터셋 선택:", 
             range(len(file_options)),
-            format_func=lambda x: file_options[x]
+            format_func=format_option
         )
         
+        # 엑셀 시트 메타데이터 (파싱 전에도 구조 확인 가능)
+        excel_datasets = [dataset for dataset in st.session_state.uploaded_datasets.values()
+                          if isinstance(dataset['sheets'], LazyWorkbook)]
+        if excel_datasets:
+            with st.expander("📑 시트 메타데이터", expanded=False):
+                sheet_rows = []
+                for dataset in excel_datasets:
+                    for info in dataset['sheets'].sheet_info:
+                        sheet_rows.append({
+                            '파일': dataset['name'],
+                            '시트': info['name'],
+                            '예상 행 수': info['estimated_rows'],
+                            '컬럼 수': info['columns'],
+                            '헤더 미리보기': ", ".join(info['header_preview']),
+                            '로드됨': dataset['sheets'].is_loaded(info['name'])
+                        })
+                st.dataframe(pd.DataFrame(sheet_rows), use_container_width=True)
+        
         if selected_idx is not None:
             selected_key, selected_sheet = file_keys[selected_idx]
             selected_dataset = st.session_state.uploaded_datasets[selected_key]
-            df = selected_dataset['sheets'][selected_sheet]
+            # 선택된 시트만 파싱 (이미 파싱된 시트는 캐시에서 바로 사용)
+            df = load_sheet(selected_dataset, selected_sheet)
+            
+            # 분석 결과 캐시는 데이터 내용 지문별로 구분되므로 시트를 바꿔도 비우지 않음
+            # (결과 캐시는 프로세스 공용이라 다른 세션의 결과까지 지워지지 않도록)
             
             # 활성 데이터셋 저장
             st.session_state.active_dataset = {
@@ -113,10 +284,41 @@ if uploaded_files:
                     st.metric("행 수", f"{len(df):,}")
                 with col2:
                     st.metric("열 수", f"{len(df.columns)}")
+                profile = get_profile(df)
                 with col3:
-                    st.metric("메모리", f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB")
+                    st.metric("메모리", f"{profile.memory_bytes / 1024 / 1024:.1f}MB")
                 with col4:
-                    st.metric("결측값", f"{df.isnull().sum().sum():,}")
+                    st.metric("결측값", f"{profile.null_count:,}")
+                
+                report = compaction_report(df)
+                if report:
+                    st.caption(f"🗜️ 로드 시 타입 압축: {format_compaction_report(report)}")
+                    if report['converted'] or report['dropped_columns']:
+                        with st.popover("타입 변환 상세"):
+                            st.dataframe(pd.DataFrame(
+                                [(col, before, after) for col, (before, after) in report['converted'].items()]
+                                + [(col, "(빈 컬럼)", "제거") for col in report['dropped_columns']],
+                                columns=["컬럼", "변환 전", "변환 후"]
+                            ), use_container_width=True)
+                
+                stats = cube_stats(df)
+                if "cells" in stats:
+                    st.caption(f"⚡ 집계 큐브: {stats['cells']:,}개 셀, 생성 {stats['build_seconds']:.2f}초, "
+                               f"적중률 {stats['hit_rate']:.0%} ({stats['hits']:,}/{stats['hits'] + stats['misses']:,}회)")
+                cache_stats = result_cache.stats()
+                st.caption(f"🗄️ 결과 캐시: {cache_stats['entries']:,}개 항목, 적중 {cache_stats['hits']:,}회 / "
+                           f"실패 {cache_stats['misses']:,}회")
+                if selected_dataset.get('file_type') == 'excel':
+                    disk_stats = sheet_cache.stats()
+                    memory_stats = parsed_sheets.stats()
+                    source = {
+                        'memory': "메모리에서 재사용",
+                        'disk': "디스크 캐시에서 로드",
+                        'excel': "엑셀 파싱 후 캐시 저장"
+                    }.get(selected_dataset['sheets'].sources.get(selected_sheet), "")
+                    st.caption(f"💾 시트 캐시: {source} · 메모리 {memory_stats['entries']}/{memory_stats['max_entries']}개 시트 · "
+                               f"디스크 {disk_stats['entries']:,}개 항목, "
+                               f"{disk_stats['bytes'] / 1024 / 1024:,.1f}MB / {disk_stats['max_bytes'] / 1024 / 1024:,.0f}MB")
                 
                 st.dataframe(df.head(100), use_container_width=True)
         
@@ -147,24 +349,30 @@ if uploaded_files:
                     key1, sheet1 = file_keys[compare_idx1]
                     key2, sheet2 = file_keys[compare_idx2]
                     
-                    df1 = st.session_state.uploaded_datasets[key1]['sheets'][sheet1]
-                    df2 = st.session_state.uploaded_datasets[key2]['sheets'][sheet2]
+                    # 두 시트가 모두 파싱 전이면 동시에 파싱
+                    prefetch([(st.session_state.uploaded_datasets[key]['sheets'], sheet)
+                              for key, sheet in ((key1, sheet1), (key2, sheet2))
+                              if isinstance(st.session_state.uploaded_datasets[key]['sheets'], LazyWorkbook)])
+                    
+                    df1 = load_sheet(st.session_state.uploaded_datasets[key1], sheet1)
+                    df2 = load_sheet(st.session_state.uploaded_datasets[key2], sheet2)
                     
                     # 기본 비교 정보
                     st.markdown("#### 📋 기본 정보 비교")
                     
+                    profile1, profile2 = get_profile(df1), get_profile(df2)
                     comparison_data = pd.DataFrame({
                         file_options[compare_idx1]: [
-                            len(df1),
-                            len(df1.columns),
-                            f"{df1.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB",
-                            df1.isnull().sum().sum()
+                            profile1.rows,
+                            profile1.column_count,
+                            f"{profile1.memory_bytes / 1024 / 1024:.1f}MB",
+                            profile1.null_count
                         ],
                         file_options[compare_idx2]: [
-                            len(df2),
-                            len(df2.columns), 
-                            f"{df2.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB",
-                            df2.isnull().sum().sum()
+                            profile2.rows,
+                            profile2.column_count, 
+                            f"{profile2.memory_bytes / 1024 / 1024:.1f}MB",
+                            profile2.null_count
                         ]
                     }, index=['행 수', '열 수', '메모리 사용량', '결측값 수'])
                     
@@ -318,15 +526,14 @@ if uploaded_files:
                         # 컬럼 정보
                         st.markdown("**📋 활용한 주요 컬럼:**")
                         columns_info = []
-                        for col in df.columns[:10]:  # 처음 10개 컬럼만 표시
-                            col_type = str(df[col].dtype)
-                            if df[col].dtype in ['object']:
-                                unique_count = df[col].nunique()
-                                columns_info.append(f"• **{col}** (텍스트, {unique_count}개 고유값)")
-                            elif df[col].dtype in ['int64', 'float64']:
+                        # 재실행마다 다시 계산하지 않도록 캐시된 프로파일 사용
+                        for col, column in list(get_profile(df).columns.items())[:10]:  # 처음 10개 컬럼만 표시
+                            if column.kind == "text":
+                                columns_info.append(f"• **{col}** (텍스트, {column.distinct_count}개 고유값)")
+                            elif column.kind == "numeric":
                                 columns_info.append(f"• **{col}** (숫자)")
                             else:
-                                columns_info.append(f"• **{col}** ({col_type})")
+                                columns_info.append(f"• **{col}** ({column.dtype})")
                         
                         st.markdown("\n".join(columns_info))
                         
@@ -372,7 +579,10 @@ if uploaded_files:
 
     # 질문 처리
     if (send_button and question) or (question and st.session_state.get('selected_question')):
-        with st.spinner("LangGraph 에이전트가 분석 중입니다..."):
+        # 노드 진행 상황과 답변 토큰을 실행 중에 바로 표시
+        status = st.status("LangGraph 에이전트가 분석 중입니다...", expanded=True)
+        answer_placeholder = st.empty()
+        with status:
             try:
                 # 이전 대화 컨텍스트 준비 (Context Aware Node에서 사용)
                 chat_context = []
@@ -382,7 +592,7 @@ if uploaded_files:
                 
                 # LangGraph 실행 - 다중 데이터셋 정보 전달
                 current_df = None
-                datasets_info = {}
+                datasets_info = LazyDatasets()
                 dataset_count = 0
                 active_dataset_name = "업로드된 파일"
                 
@@ -399,36 +609,40 @@ if uploaded_files:
                 
                 # 다중 데이터셋 정보 수집
                 if hasattr(st.session_state, 'uploaded_datasets') and st.session_state.uploaded_datasets:
-                    # 모든 데이터셋을 datasets_info에 포함
+                    # 모든 데이터셋을 datasets_info에 등록 (시트는 다중 데이터셋 도구가 참조할 때 파싱)
                     for file_key, dataset_info in st.session_state.uploaded_datasets.items():
-                        for sheet_name, df in dataset_info['sheets'].items():
+                        for sheet_name in dataset_info['sheets']:
                             dataset_name = f"{dataset_info['name']} - {sheet_name}"
-                            datasets_info[dataset_name] = df
+                            datasets_info.add(dataset_name, dataset_info['sheets'], sheet_name)
                     
                     # 실제 시트 개수로 카운트 (더 정확)
                     dataset_count = len(datasets_info)
                 else:
                     dataset_count = 1
-                    datasets_info[active_dataset_name] = current_df
+                    datasets_info.add(active_dataset_name, {active_dataset_name: current_df}, active_dataset_name)
                 
                 # 다중 파일 여부 결정
                 is_multi_dataset = dataset_count > 1
                 
+                # 시트는 여기서 파싱하지 않음: 다중 데이터셋 도구/분기가 순회하기 직전에 필요한 시트만 병렬 파싱
+                
                 print(f"데이터셋 수: {dataset_count}, 다중 파일: {is_multi_dataset}")
                 print(f"활성 데이터셋: {active_dataset_name}")
                 print(f"전체 데이터셋: {list(datasets_info.keys())}")
                 
-                # LangGraph 상태에 다중 데이터셋 정보 전달
-                result = graph_executor.invoke({
+                # LangGraph 상태에는 데이터셋 레지스트리 핸들과 이름 목록만 전달 (DataFrame 직렬화 방지)
+                result = stream_graph({
                     "input": question, 
-                    "df": current_df,
+                    "dataset_handle": dataset_registry.register_dataframe(current_df),
                     "chat_history": chat_context,
                     # 다중 데이터셋 관련 정보
-                    "datasets_info": datasets_info,
+                    "datasets_handle": dataset_registry.register_datasets(datasets_info),
+                    "dataset_names": list(datasets_info.keys()),
                     "dataset_count": dataset_count,
                     "is_multi_dataset": is_multi_dataset,
                     "active_dataset_name": active_dataset_name
-                })
+                }, status, answer_placeholder)
+                status.update(label="✅ 분석 완료", state="complete", expanded=False)
                 
                 # 채팅 기록에 추가 (Phase 1 노드 정보 포함)
                 chat_entry = {
@@ -452,5 +666,6 @@ if uploaded_files:
                 st.rerun()
                 
             except Exception as e:
+                status.update(label="❌ 분석 실패", state="error")
                 st.error(f"오류가 발생했습니다: {str(e)}")
                 st.error("다시 시도해 주세요.")
\ No newline at end of file
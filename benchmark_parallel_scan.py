@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared-memory parallel scan engine (agent/parallel_scan.py).
+
+Builds a synthetic dataset and runs the same selection _select_rows does for a
+division + country + customer question: filter the rows, count them, and sum
+the metric. The in-process path uses the bitmap index and a customer column
+mask. The parallel scan evaluates the same conditions per distinct value and
+lets the workers build each partition's row mask from dimension codes in
+shared memory. Both are timed at increasing worker counts.
+
+Usage:
+    python benchmark_parallel_scan.py [rows] [repeats]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+sys.path.append('.')
+
+import agent.parallel_scan as parallel_scan
+from agent.bitmap_index import get_dataset_index
+
+
+def create_dataset(rows: int) -> pd.DataFrame:
+    """Create a dataset with categorical dimensions, a high-cardinality customer column and one float metric."""
+    rng = np.random.default_rng(0)
+    divisions = ['스테인리스사업실', '냉연사업실', '열연조강사업실', '후판선재사업실']
+    countries = ['한국', '중국', '일본', '미국']
+    customers = np.array([f"C{i:05d}" for i in range(50_000)], dtype=object)
+    return pd.DataFrame({
+        'Division': pd.Categorical.from_codes(rng.integers(0, len(divisions), rows), divisions),
+        'Country': pd.Categorical.from_codes(rng.integers(0, len(countries), rows), countries),
+        'Customer': customers[rng.integers(0, len(customers), rows)],
+        '2.매출원가': rng.random(rows) * 1e8,
+    })
+
+
+def query(df: pd.DataFrame, index, metric: str) -> tuple:
+    """Select rows the way _select_rows does and return (row count, metric total)."""
+    bits = index.all_rows()
+    bits &= index.contains("Division", "스테인리스", case=False, regex=False)
+    bits &= index.contains("Country", "한국", case=False, regex=False)
+    bits &= index.series_contains(df["Customer"], "C0", case=False, regex=False)
+    return index.count(bits), index.total(df[metric], bits)
+
+
+def best_of(repeats: int, func):
+    """Return (best seconds, result) over the given number of runs."""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def worker_counts() -> list:
+    """1, 2, 4, ... up to the number of CPU cores (always including the core count)."""
+    cores = os.cpu_count() or 1
+    counts = [1 << i for i in range(cores.bit_length()) if 1 << i <= cores]
+    return counts if counts[-1] == cores else counts + [cores]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    metric = '2.매출원가'
+
+    print(f"Building {rows:,} rows...")
+    df = create_dataset(rows)
+    bitmap_index = get_dataset_index(df)
+    scan_index = parallel_scan.get_scan_index(df)
+    query(df, scan_index, metric)  # move customer codes and the metric into shared memory
+
+    serial, (count, expected) = best_of(repeats, lambda: query(df, bitmap_index, metric))
+    print(f"Selected rows: {count:,} ({count / rows:.1%})\n")
+    print(f"{'engine':<22}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    print(f"{'in-process bitmap':<22}{1:>8}{serial:>10.3f}{1.0:>8.2f}x")
+
+    for workers in worker_counts():
+        parallel_scan.shutdown()
+        parallel_scan.SCAN_MAX_WORKERS = workers
+        query(df, scan_index, metric)  # warm up: start workers
+        seconds, (scanned, total) = best_of(repeats, lambda: query(df, scan_index, metric))
+        assert scanned == count and np.isclose(total, expected), (scanned, count, total, expected)
+        print(f"{'shared-memory scan':<22}{workers:>8}{seconds:>10.3f}{serial / seconds:>8.2f}x")
+
+    parallel_scan.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Report of the function-schema tokens sent to the model per request.
+
+For every intent the graph's intent classification nodes can produce, compares
+the schema tokens of all registered tools (before) with the subset chosen by
+select_tools (after), the same way the agent nodes pick their executor.
+Token counts use tiktoken when its encoding is available, otherwise a
+UTF-8 byte based estimate.
+
+Usage:
+    python benchmark_tool_tokens.py
+"""
+
+import sys
+sys.path.append('.')
+
+from agent.tool_registry import registered_tools, select_tools, tool_schema_tokens
+
+# (path, intent, predicted_tools, dataset_count) as produced by
+# intent_classification_node / multi_intent_classification_node
+SCENARIOS = [
+    ("single", "aggregation", ["calculate_sum", "calculate_total", "group_statistics"], 1),
+    ("single", "comparison", ["compare_groups", "calculate_percentage", "filter_data"], 1),
+    ("single", "ranking", ["sort_by_column", "get_top_n", "calculate_rank"], 1),
+    ("single", "trend", ["time_series_analysis", "calculate_growth"], 1),
+    ("single", "filtering", ["filter_data", "search_data"], 1),
+    ("single", "statistical", ["calculate_statistics", "describe_data"], 1),
+    ("single", "general", ["general_analysis"], 1),
+    ("branch", "per-dataset", None, 1),
+    ("multi", "comparison", ["compare_datasets_summary", "compare_datasets_metrics", "compare_datasets_by_division"], 3),
+    ("multi", "aggregation", ["integrated_dataset_analysis"], 3),
+    ("multi", "cross_analysis", ["cross_dataset_comparison", "compare_datasets_by_division"], 3),
+    ("multi", "summary", ["compare_datasets_summary"], 3),
+]
+
+
+def main():
+    before, exact = tool_schema_tokens(registered_tools)
+    unit = "tokens" if exact else "tokens (estimated, tiktoken encoding unavailable)"
+    print(f"All registered tools: {len(registered_tools)} tools, {before:,} {unit}\n")
+
+    print(f"{'path':<8}{'intent':<16}{'tools':>7}{'before':>9}{'after':>8}{'saved':>8}")
+    for path, intent, predicted_tools, dataset_count in SCENARIOS:
+        tools = select_tools(predicted_tools, dataset_count)
+        after, _ = tool_schema_tokens(tools)
+        print(f"{path:<8}{intent:<16}{len(tools):>7}{before:>9,}{after:>8,}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
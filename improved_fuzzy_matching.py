@@ -12,16 +12,32 @@ issues identified in the analysis. Key improvements include:
 """
 
 import re
-from difflib import SequenceMatcher
 from typing import List, Tuple, Optional, Dict, Any
 import pandas as pd
 
+from agent.fuzzy_index import FuzzyIndex
+
+# Number of per-column candidate indexes kept by a matcher
+MAX_CACHED_INDEXES = 8
+
 
 class ImprovedFuzzyMatcher:
     """Enhanced fuzzy matching for Korean business data."""
     
     def __init__(self, threshold: float = 0.7):
         self.threshold = threshold
+        self._indexes: Dict[tuple, FuzzyIndex] = {}
+    
+    def build_index(self, actual_values: List[str]) -> FuzzyIndex:
+        """Build (or reuse) the candidate index for a column's values."""
+        key = tuple(str(value) for value in actual_values)
+        index = self._indexes.get(key)
+        if index is None:
+            index = FuzzyIndex(actual_values, self.normalize_korean_text)
+            if len(self._indexes) >= MAX_CACHED_INDEXES:
+                self._indexes.pop(next(iter(self._indexes)))
+            self._indexes[key] = index
+        return index
         
     def normalize_korean_text(self, text: str) -> str:
         """Normalize Korean text for better matching."""
@@ -47,31 +63,48 @@ class ImprovedFuzzyMatcher:
         keywords = re.findall(r'[가-힣]+|\d+', normalized)
         return keywords
     
-    def fuzzy_match_funds_center(self, user_input: str, actual_values: List[str]) -> Tuple[Optional[str], float, str]:
+    def fuzzy_match_funds_center(self, user_input: str, actual_values: List[str],
+                                 index: FuzzyIndex = None) -> Tuple[Optional[str], float, str]:
         """
         Enhanced fuzzy matching for FundsCenter values.
         
+        Candidates are shortlisted through a prebuilt FuzzyIndex (substring, keyword,
+        group-number and similarity-bound lookups) so only values that can reach the
+        threshold are scored.
+        
         Returns:
             (best_match, confidence_score, match_type)
         """
         if not user_input or not actual_values:
             return None, 0.0, 'no_input'
-            
+        
+        if index is None:
+            index = self.build_index(actual_values)
+        order = index.candidate_order(actual_values)
+        
         normalized_input = self.normalize_korean_text(user_input)
-        best_matches = []
+        input_keywords = self.extract_keywords(user_input)
         
-        for value in actual_values:
-            normalized_value = self.normalize_korean_text(value)
+        substring_ids = index.partial_ids(normalized_input)
+        keyword_ids = index.keyword_ids(input_keywords)
+        similarities = index.similar(normalized_input, self.threshold)
+        user_numbers = re.findall(r'\d+', user_input)
+        pattern_ids = set(index.first_number_ids(user_numbers[0])) if user_numbers else set()
+        
+        shortlist = substring_ids | keyword_ids | pattern_ids | set(similarities)
+        shortlist = sorted((i for i in shortlist if order[i] >= 0), key=lambda i: order[i])
+        
+        best_matches = []
+        for i in shortlist:
+            value = actual_values[order[i]]
             
             # Strategy 1: Exact substring match (highest priority)
-            if normalized_input in normalized_value or normalized_value in normalized_input:
+            if i in substring_ids:
                 best_matches.append((value, 1.0, 'exact_substring'))
                 continue
             
             # Strategy 2: Keyword intersection matching
-            input_keywords = self.extract_keywords(user_input)
-            value_keywords = self.extract_keywords(value)
-            
+            value_keywords = index.keywords[i]
             if input_keywords and value_keywords:
                 common_keywords = set(input_keywords) & set(value_keywords)
                 if common_keywords:
@@ -80,14 +113,13 @@ class ImprovedFuzzyMatcher:
                         best_matches.append((value, keyword_score, 'keyword_match'))
             
             # Strategy 3: Pattern-based matching for group names
-            if self._is_group_pattern_match(user_input, value):
+            if i in pattern_ids and self._is_group_pattern_match(user_input, value):
                 pattern_score = 0.85  # High confidence for pattern matches
                 best_matches.append((value, pattern_score, 'pattern_match'))
             
             # Strategy 4: Sequence similarity (lowest priority)
-            similarity = SequenceMatcher(None, normalized_input, normalized_value).ratio()
-            if similarity >= self.threshold:
-                best_matches.append((value, similarity, 'sequence_match'))
+            if i in similarities:
+                best_matches.append((value, similarities[i], 'sequence_match'))
         
         # Return best match
         if best_matches:
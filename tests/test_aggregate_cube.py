@@ -0,0 +1,58 @@
+"""The aggregate cube answers expressible queries with the same totals as a raw scan."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agent.aggregate_cube import ROW_COUNT_COLUMN, count_records, get_cube, resolve_frame
+
+ROWS = 3000
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(9)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실"], ROWS),
+        "Country": rng.choice(["한국", "중국", None], ROWS),
+        "Period/Year": rng.choice(["2023년 1월", "2023년 2월"], ROWS),
+        "Customer": [f"고객{i % 500}" for i in range(ROWS)],
+        "1.매출액": rng.integers(0, 10**6, ROWS),
+        "5.영업이익": rng.normal(0, 1000, ROWS),
+    })
+
+
+def test_cube_preserves_totals_and_row_counts(frame):
+    cube = get_cube(frame)
+
+    assert len(cube.frame) < ROWS
+    assert cube.metrics == ["1.매출액", "5.영업이익"]
+    assert cube.frame["1.매출액"].sum() == frame["1.매출액"].sum()
+    assert cube.frame["5.영업이익"].sum() == pytest.approx(frame["5.영업이익"].sum())
+    assert cube.frame[ROW_COUNT_COLUMN].sum() == ROWS
+    # 결측 차원 값도 별도 셀로 유지
+    assert cube.frame["Country"].isna().any()
+
+
+def test_filtered_total_matches_raw_scan(frame):
+    cells = resolve_frame(frame, ["1.매출액"], ["Division", "Country"])
+    mask = ((cells["Division"] == "냉연사업실") & (cells["Country"] == "중국")).to_numpy()
+    raw = (frame["Division"] == "냉연사업실") & (frame["Country"] == "중국")
+
+    assert cells is get_cube(frame).frame
+    assert cells["1.매출액"].to_numpy()[mask].sum() == frame.loc[raw, "1.매출액"].sum()
+    assert count_records(cells, mask) == raw.sum()
+
+
+def test_inexpressible_queries_use_source_rows(frame):
+    # 큐브에 없는 필터 컬럼(Customer)이나 지표는 원본을 사용
+    assert resolve_frame(frame, ["1.매출액"], ["Customer"]) is frame
+    assert resolve_frame(frame, ["8.세전이익"]) is frame
+    assert count_records(frame, np.ones(ROWS, dtype=bool)) == ROWS
+
+
+def test_no_cube_when_it_would_not_shrink_the_data():
+    unique = pd.DataFrame({"Supplier": [f"공급사{i}" for i in range(100)], "1.매출액": range(100)})
+
+    assert get_cube(unique) is None
+    assert resolve_frame(unique, ["1.매출액"], ["Supplier"]) is unique
@@ -0,0 +1,53 @@
+"""Bitmap index filters must select exactly the rows the equivalent pandas masks select."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agent.bitmap_index import SPARSE_DENSITY, get_dataset_index
+
+ROWS = 1003  # 8의 배수가 아닌 행 수 (packbits 끝부분 처리 확인)
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실", "열연조강사업실"], ROWS),
+        # 드문 값(희소 행 번호)과 흔한 값(비트맵)이 섞인 컬럼
+        "Country": rng.choice(["한국", "중국", "베트남"], ROWS, p=[0.7, 0.29, 0.01]),
+        "Period/Year": rng.choice(["2023년 1월", "2024년 7월", None], ROWS),
+        "1.매출액": rng.integers(0, 100, ROWS),
+    })
+
+
+def test_sparse_and_dense_values_are_both_indexed(frame):
+    country = get_dataset_index(frame).dimensions["Country"]
+    storage = {value: bitmap.bits is None for value, bitmap in zip(country.values, country.bitmaps)}
+
+    assert (frame["Country"] == "베트남").mean() < SPARSE_DENSITY
+    assert storage["베트남"] and not storage["한국"]
+
+
+def test_combined_filters_match_pandas(frame):
+    index = get_dataset_index(frame)
+
+    bits = index.all_rows()
+    bits &= index.contains("Division", "냉연|열연")
+    bits &= index.contains("Country", "베트남") | index.equals("Country", "중국")
+    bits &= index.equals("year", 2024)
+
+    expected = (frame["Division"].str.contains("냉연|열연") & frame["Country"].isin(["베트남", "중국"])
+                & frame["Period/Year"].fillna("").str.startswith("2024")).to_numpy()
+    assert (index.to_mask(bits) == expected).all()
+    assert index.count(bits) == expected.sum()
+    assert (index.row_ids(bits) == np.flatnonzero(expected)).all()
+
+
+def test_empty_and_full_selections(frame):
+    index = get_dataset_index(frame)
+
+    assert index.count(index.all_rows()) == ROWS
+    assert index.count(index.no_rows()) == 0
+    assert index.count(index.equals("Division", "없는사업실")) == 0
+    assert get_dataset_index(frame) is index
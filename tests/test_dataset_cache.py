@@ -0,0 +1,39 @@
+"""Per-DataFrame artifacts are built once and released with their DataFrame."""
+
+import gc
+
+import pandas as pd
+
+from agent.dataset_cache import _artifacts, discard, get_or_build
+
+
+def test_artifact_is_built_once_per_dataframe():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    calls = []
+
+    def build(frame):
+        calls.append(frame)
+        return len(frame)
+
+    assert get_or_build(df, "length", build) == 3
+    assert get_or_build(df, "length", build) == 3
+    assert len(calls) == 1
+
+    discard(df, "length")
+    assert get_or_build(df, "length", build) == 3
+    assert len(calls) == 2
+
+
+def test_nested_dataframe_artifacts_are_released_without_deadlock():
+    # 파생 데이터가 다른 DataFrame(집계 큐브처럼 자체 파생 데이터를 가진)을 담고 있는 경우
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    inner = pd.DataFrame({"b": [1]})
+    get_or_build(inner, "inner", lambda frame: "value")
+    get_or_build(df, "cube", lambda frame: inner)
+    inner_id, df_id = id(inner), id(df)
+    del inner
+
+    del df
+    gc.collect()
+    assert df_id not in _artifacts
+    assert inner_id not in _artifacts
@@ -0,0 +1,130 @@
+"""Concurrent sessions must only ever see their own dataset through the tools."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.tools as tools
+
+SESSIONS = 8
+ROUNDS = 25
+
+
+def make_frame(session: int, rows: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(session)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실"], rows),
+        "Country": rng.choice(["한국", "중국"], rows),
+        "매출수량(M/T)": rng.integers(1, 100, rows) * (session + 1),
+        "1.매출액": rng.integers(1, 10**6, rows) * (session + 1),
+        "5.영업이익": rng.integers(1, 10**5, rows) * (session + 1),
+    })
+
+
+def run_concurrently(worker):
+    """Run worker(session) on SESSIONS threads that start together; re-raise the first failure."""
+    barrier = threading.Barrier(SESSIONS)
+    errors = []
+
+    def target(session):
+        try:
+            barrier.wait()
+            worker(session)
+        except BaseException as e:  # noqa: BLE001 - collected and re-raised in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(session,)) for session in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_concurrent_sessions_see_only_their_dataframe():
+    frames = [make_frame(session) for session in range(SESSIONS)]
+    expected = []
+    for frame in frames:
+        with tools.dataset_context(df=frame):
+            expected.append(tools.get_overall_summary.invoke({}))
+    assert len(set(expected)) == SESSIONS
+
+    def worker(session):
+        with tools.dataset_context(df=frames[session]):
+            for _ in range(ROUNDS):
+                assert tools.get_dataframe() is frames[session]
+                assert tools.get_overall_summary.invoke({}) == expected[session]
+
+    run_concurrently(worker)
+
+
+def test_concurrent_sessions_see_only_their_datasets():
+    datasets = [{f"session{session}-{part}": make_frame(session * 10 + part) for part in range(3)}
+                for session in range(SESSIONS)]
+
+    def strip_timings(text):
+        return text.split("⏱️")[0]
+
+    expected = []
+    for session_datasets in datasets:
+        with tools.dataset_context(datasets=session_datasets):
+            expected.append(strip_timings(tools.compare_datasets_metrics.invoke({})))
+
+    def worker(session):
+        with tools.dataset_context(datasets=datasets[session]):
+            for _ in range(ROUNDS):
+                assert tools.get_datasets() is datasets[session]
+                output = tools.compare_datasets_metrics.invoke({})
+                assert strip_timings(output) == expected[session]
+
+    run_concurrently(worker)
+
+
+def test_async_tasks_do_not_share_dataframe():
+    frames = [make_frame(session) for session in range(SESSIONS)]
+
+    async def session_task(session):
+        with tools.dataset_context(df=frames[session]):
+            for _ in range(ROUNDS):
+                await asyncio.sleep(0)
+                assert tools.get_dataframe() is frames[session]
+
+    async def main():
+        await asyncio.gather(*(session_task(session) for session in range(SESSIONS)))
+
+    asyncio.run(main())
+
+
+def test_context_is_restored_after_block():
+    outer, inner = make_frame(0), make_frame(1)
+
+    def worker():
+        with pytest.raises(ValueError):
+            tools.get_dataframe()
+        with tools.dataset_context(df=outer):
+            with tools.dataset_context(df=inner, datasets={"a": inner}):
+                assert tools.get_dataframe() is inner
+                assert list(tools.get_datasets()) == ["a"]
+            assert tools.get_dataframe() is outer
+            assert tools.get_datasets() == {}
+        with pytest.raises(ValueError):
+            tools.get_dataframe()
+
+    # A new thread starts with an empty context, independent of other tests.
+    thread_errors = []
+    thread = threading.Thread(target=lambda: _capture(worker, thread_errors))
+    thread.start()
+    thread.join()
+    if thread_errors:
+        raise thread_errors[0]
+
+
+def _capture(func, errors):
+    try:
+        func()
+    except BaseException as e:  # noqa: BLE001
+        errors.append(e)
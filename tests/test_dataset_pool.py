@@ -0,0 +1,59 @@
+"""Per-dataset partials run concurrently yet return in registration order."""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import agent.dataset_pool as dataset_pool
+import agent.tools as tools
+from agent.dataset_pool import format_timings, map_datasets
+
+
+@pytest.fixture
+def pool_workers(monkeypatch):
+    monkeypatch.setattr(dataset_pool, "DATASET_MAX_WORKERS", 3)
+    dataset_pool.shutdown()
+    yield
+    dataset_pool.shutdown()
+
+
+def frames(count):
+    return {f"데이터{i}": pd.DataFrame({"x": range(i + 1)}) for i in range(count)}
+
+
+def test_partials_run_concurrently_in_registration_order(pool_workers):
+    # 세 작업이 모두 동시에 시작해야 통과하는 장벽
+    barrier = threading.Barrier(3, timeout=5)
+    datasets = frames(3)
+
+    def partial(df, offset):
+        barrier.wait()
+        time.sleep(0.05 * (3 - len(df)))  # 앞 데이터셋일수록 늦게 끝남
+        return len(df) + offset, threading.current_thread().name, len(tools.get_dataframe())
+
+    with tools.dataset_context(df=pd.DataFrame({"y": range(7)})):
+        results = map_datasets(datasets, partial, 100)
+
+    assert [name for name, _, _ in results] == list(datasets)
+    assert [value[0] for _, value, _ in results] == [101, 102, 103]
+    # 작업자도 호출 측 컨텍스트의 데이터셋을 사용
+    assert all(value[1].startswith("dataset") and value[2] == 7 for _, value, _ in results)
+    assert "작업자 3개" in format_timings(results)
+
+
+def test_worker_errors_reach_the_caller(pool_workers):
+    def partial(df):
+        if len(df) == 2:
+            raise ValueError("bad sheet")
+        return len(df)
+
+    with pytest.raises(ValueError, match="bad sheet"):
+        map_datasets(frames(3), partial)
+
+
+def test_single_dataset_runs_inline():
+    results = map_datasets(frames(1), lambda df: threading.current_thread().name)
+
+    assert results[0][1] == threading.current_thread().name
@@ -0,0 +1,60 @@
+"""Dataset profiles match pandas statistics and are rebuilt only when the data changes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.dataset_profile as dataset_profile
+from agent.dataset_profile import DatasetProfile, get_profile, invalidate_profile
+
+ROWS = 2000
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(6)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실", "열연조강사업실", None], ROWS, p=[0.5, 0.3, 0.15, 0.05]),
+        "Country": pd.Series(rng.choice(["한국", "중국"], ROWS), dtype="category"),
+        "1.매출액": rng.integers(0, 10**6, ROWS).astype(float),
+    })
+
+
+def test_exact_profile_matches_pandas(frame):
+    profile = DatasetProfile(frame, approximate=False)
+    division, sales, country = (profile.columns[col] for col in ("Division", "1.매출액", "Country"))
+
+    assert profile.rows == ROWS and profile.null_count == frame.isnull().sum().sum()
+    assert division.distinct_count == frame["Division"].nunique()
+    assert division.top_values == [(value, count) for value, count in frame["Division"].value_counts().items()]
+    assert division.sample_values == list(frame["Division"].dropna().unique()[:5])
+    assert country.top_values == [(value, count) for value, count in frame["Country"].value_counts().items()]
+    assert sales.median == frame["1.매출액"].median()
+    assert sales.quantiles[0.75] == frame["1.매출액"].quantile(0.75)
+    assert profile.numeric_columns == ["1.매출액"]
+
+
+def test_large_frames_use_sketches_for_numeric_columns(frame, monkeypatch):
+    monkeypatch.setattr(dataset_profile, "PROFILE_APPROX_ROWS", 1000)
+    approximate = get_profile(frame)
+    exact = get_profile(frame, exact=True)
+    sales = approximate.columns["1.매출액"]
+
+    assert approximate.approximate and not exact.approximate
+    assert sales.approximate and not approximate.columns["Division"].approximate
+    assert set(sales.error_bounds) == {"distinct", "quantiles"}
+    assert sales.min == frame["1.매출액"].min() and sales.max == frame["1.매출액"].max()
+    rank = (frame["1.매출액"] < sales.median).mean()
+    assert abs(rank - 0.5) < 3 * sales.error_bounds["quantiles"]
+
+
+def test_profile_is_cached_until_the_frame_changes(frame):
+    profile = get_profile(frame)
+    assert get_profile(frame) is profile
+
+    frame["신규"] = 1
+    changed = get_profile(frame)
+    assert changed is not profile and "신규" in changed.columns
+
+    invalidate_profile(frame)
+    assert get_profile(frame) is not changed
@@ -0,0 +1,66 @@
+"""The dataset registry must never keep a session's data alive on its own."""
+
+import gc
+import weakref
+
+import pandas as pd
+
+from agent.dataset_registry import DatasetRegistry
+from agent.lazy_workbook import LazyDatasets
+
+
+def frame(value):
+    return pd.DataFrame({"Division": ["냉연", "열연"], "1.매출액": [value, value + 1]})
+
+
+def test_same_content_gets_same_handle():
+    registry = DatasetRegistry()
+    df = frame(1)
+
+    assert registry.register_dataframe(df) == registry.register_dataframe(df.copy())
+    assert registry.resolve(registry.register_dataframe(df)) is df
+
+
+def test_released_dataframe_is_freed():
+    registry = DatasetRegistry()
+    df = frame(1)
+    handle = registry.register_dataframe(df)
+    alive = weakref.ref(df)
+
+    del df
+    gc.collect()
+
+    assert alive() is None
+    assert registry.resolve(handle) is None
+    assert registry.stats()["entries"] == 0
+
+
+def test_released_datasets_are_freed():
+    registry = DatasetRegistry()
+    first, second = frame(1), frame(10)
+    lazy = LazyDatasets()
+    lazy.add("a", {"a": first}, "a")
+    plain = {"a": first, "b": second}
+    lazy_handle, plain_handle = registry.register_datasets(lazy), registry.register_datasets(plain)
+    alive = weakref.ref(second)
+
+    assert registry.resolve(lazy_handle) is lazy
+    assert registry.resolve(plain_handle) == plain
+
+    # 세션이 데이터셋 묶음과 DataFrame을 놓으면 레지스트리만으로는 유지되지 않음
+    del lazy, plain, second
+    gc.collect()
+
+    assert alive() is None
+    assert registry.resolve(lazy_handle) is None
+    assert registry.resolve(plain_handle) is None
+
+
+def test_handle_count_is_capped():
+    registry = DatasetRegistry(max_entries=2)
+    frames = [frame(i) for i in range(3)]
+    handles = [registry.register_dataframe(df) for df in frames]
+
+    assert registry.resolve(handles[0]) is None
+    assert registry.resolve(handles[2]) is frames[2]
+    assert registry.stats()["entries"] == 2
@@ -0,0 +1,50 @@
+"""Dictionary-encoded dimensions filter exactly like the plain object columns they replace."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agent.dimension_encoding import (contains_mask, encode_dimensions, equals_mask, is_categorical,
+                                      unique_values)
+
+ROWS = 400
+
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(2)
+    plain = pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실", None], ROWS),
+        "Period/Year": rng.choice([2023, 2024], ROWS).astype(object),
+        "Customer": [f"고객{i}" for i in range(ROWS)],
+        "1.매출액": rng.integers(0, 100, ROWS),
+    })
+    return plain, encode_dimensions(plain.copy(), ["Division", "Period/Year", "Customer"])
+
+
+def test_only_low_cardinality_text_columns_are_encoded(frames):
+    _, encoded = frames
+
+    assert is_categorical(encoded["Division"])
+    # 고유값 비율이 높은 컬럼과 수치 컬럼은 그대로
+    assert not is_categorical(encoded["Customer"])
+    assert not is_categorical(encoded["1.매출액"])
+
+
+@pytest.mark.parametrize("pattern, case", [("스테인리스", True), ("냉연|스테인", True), ("사업실", False)])
+def test_contains_matches_plain_column(frames, pattern, case):
+    plain, encoded = frames
+    expected = plain["Division"].str.contains(pattern, case=case, na=False).to_numpy()
+
+    assert (contains_mask(encoded["Division"], pattern, case=case) == expected).all()
+
+
+def test_equals_and_unique_values_as_text(frames):
+    plain, encoded = frames
+    mask = (plain["Division"] == "냉연사업실").to_numpy()
+
+    assert (equals_mask(encoded["Division"], "냉연사업실") == mask).all()
+    assert (equals_mask(encoded["Period/Year"], "2023", as_text=True) == (plain["Period/Year"] == 2023)).all()
+    assert unique_values(encoded["Period/Year"], mask, as_text=True) == \
+        plain.loc[mask, "Period/Year"].astype(str).unique().tolist()
+    assert None not in unique_values(encoded["Division"])
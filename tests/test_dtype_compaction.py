@@ -0,0 +1,56 @@
+"""Load-time dtype compaction shrinks frames without changing any value."""
+
+import numpy as np
+import pandas as pd
+
+from agent.dtype_compaction import compact_dataframe, compaction_report, format_compaction_report
+
+ROWS = 1000
+
+
+def raw_sheet():
+    rng = np.random.default_rng(8)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실"], ROWS).astype(object),
+        "1.매출액": [f"{value:,}" for value in rng.integers(0, 10**9, ROWS)],  # 콤마가 섞인 텍스트 지표
+        "매출수량(M/T)": rng.integers(0, 100, ROWS).astype(np.int64),
+        "5.영업이익": rng.normal(0, 1e6, ROWS),
+        "Rate": rng.integers(0, 100, ROWS).astype(np.float64),
+        "Customer": [f"고객{i}" for i in range(ROWS)],
+        "빈컬럼": [np.nan] * ROWS,
+        "8.세전이익": [np.nan] * ROWS,
+    })
+
+
+def test_values_survive_compaction():
+    raw = raw_sheet()
+    compact = compact_dataframe(raw.copy())
+
+    assert compact["1.매출액"].tolist() == [int(value.replace(",", "")) for value in raw["1.매출액"]]
+    assert (compact["5.영업이익"] == raw["5.영업이익"]).all()
+    assert (compact["Rate"] == raw["Rate"]).all()
+    assert compact["Division"].astype(object).equals(raw["Division"])
+    assert compact["Customer"].equals(raw["Customer"])
+
+
+def test_dtypes_are_narrowed_but_metrics_stay_safe_to_sum():
+    compact = compact_dataframe(raw_sheet())
+
+    assert isinstance(compact["Division"].dtype, pd.CategoricalDtype)
+    assert compact["Customer"].dtype == object  # 고유값이 많은 텍스트는 그대로
+    # 지표는 int32 미만으로 줄이지 않고, 실수 지표는 float64 유지
+    assert compact["매출수량(M/T)"].dtype == np.int32
+    assert compact["5.영업이익"].dtype == np.float64
+    assert compact["Rate"].dtype == np.int8
+
+
+def test_empty_columns_dropped_except_schema_columns_and_report_recorded():
+    compact = compact_dataframe(raw_sheet())
+    report = compaction_report(compact)
+
+    assert "빈컬럼" not in compact.columns and "8.세전이익" in compact.columns
+    assert report["dropped_columns"] == ["빈컬럼"]
+    assert report["after_bytes"] < report["before_bytes"]
+    assert report["converted"]["1.매출액"] == ("object", "int32")
+    assert "빈 컬럼 1개 제거" in format_compaction_report(report)
+    assert compaction_report(pd.DataFrame()) is None
@@ -0,0 +1,72 @@
+"""Values found by the entity extractor must filter rows literally, not as regex patterns."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.tools as tools
+from agent.dimension_encoding import contains_mask
+from agent.entity_extractor import get_entity_extractor
+
+ROWS = 600
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(11)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "(폐지) 냉연사업실"], ROWS),
+        "Country": rng.choice(["한국", "중국"], ROWS),
+        "Period/Year": rng.choice(["2023년 1월", "2024년 1월"], ROWS),
+        "Supplier": rng.choice(["삼성전자(주)", "POSCO"], ROWS),
+        "Customer": rng.choice(["(주)한빛", "대한상사"], ROWS),
+        "1.매출액": rng.integers(1, 1000, ROWS),
+    })
+
+
+def test_parenthesized_supplier_is_extracted_and_filtered(frame):
+    question = "삼성전자(주) 매출액 합계"
+    assert tools._extract_complex_entities(question, frame)["supplier"] == "삼성전자(주)"
+
+    with tools.dataset_context(df=frame):
+        answer = tools.smart_query_processor.run(question)
+
+    selected = frame["Supplier"] == "삼성전자(주)"
+    # 괄호를 정규식 그룹으로 해석하면 어떤 행도 선택되지 않음
+    assert f"{frame.loc[selected, '1.매출액'].sum():,}원" in answer
+    assert f"총 {selected.sum():,}개 레코드" in answer
+
+
+@pytest.mark.parametrize("filters, column_values", [
+    ({"division": "(폐지) 냉연사업실"}, {"Division": "(폐지) 냉연사업실"}),
+    ({"customer": "(주)한빛"}, {"Customer": "(주)한빛"}),
+    ({"division": "(폐지) 냉연사업실", "supplier": "삼성전자(주)"},
+     {"Division": "(폐지) 냉연사업실", "Supplier": "삼성전자(주)"}),
+])
+def test_select_rows_matches_parenthesized_values(frame, filters, column_values):
+    with tools.dataset_context(df=frame):
+        selection = tools._select_rows(metric="1.매출액", **filters)
+
+    expected = np.logical_and.reduce([frame[col] == value for col, value in column_values.items()])
+    assert selection["filtered_count"] == expected.sum() > 0
+
+
+def test_contains_mask_literal_and_regex_modes():
+    series = pd.Series(["삼성전자(주)", "삼성전자주", "POSCO"]).astype("category")
+
+    assert contains_mask(series, "삼성전자(주)", regex=False).tolist() == [True, False, False]
+    assert contains_mask(series, "전자(", regex=False).tolist() == [True, False, False]
+    # 기본값은 기존과 같이 정규식 (기간 Fallback의 '상반기|1분기' 등)
+    assert contains_mask(series, "posco|삼성", case=False).tolist() == [True, True, True]
+
+
+def test_extractor_prefers_longest_value_and_ascii_word_boundaries():
+    df = pd.DataFrame({
+        "Supplier": ["POSCO", "POSCO International", "KR"],
+        "Country": ["한국", "중국", "일본"],
+    })
+    extractor = get_entity_extractor(df)
+
+    hits = extractor.find("POSCO International 중국 매출, KRW 기준")
+    assert [(hit["entity"], hit["value"]) for hit in hits] == [
+        ("supplier", "POSCO International"), ("country", "중국")]
@@ -0,0 +1,49 @@
+"""Streaming sheet ingestion produces the same data as pandas.read_excel."""
+
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from agent.excel_ingest import SCHEMA_COLUMNS, normalize_column_name, read_workbook
+
+
+@pytest.fixture(scope="module")
+def workbook_data():
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = "실적"
+    worksheet.append(["Division", "Period/Year", "1. 매출액", "비고", "비고"])
+    for i in range(95):
+        if i == 40:
+            worksheet.append([])  # 중간의 빈 행은 유지
+            continue
+        worksheet.append(["냉연사업실" if i % 3 else "스테인리스사업실", f"2023년 {i % 12 + 1}월",
+                          i * 1.5 if i % 2 else i, None if i % 5 else "확인", i])
+    worksheet.append([])  # 끝부분 빈 행은 제외
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_matches_read_excel(workbook_data):
+    progress = []
+    sheets = read_workbook(io.BytesIO(workbook_data), chunk_rows=16,
+                           progress=lambda name, done, total: progress.append((name, done, total)))
+    expected = pd.read_excel(io.BytesIO(workbook_data), sheet_name=None)
+
+    assert list(sheets) == list(expected) == ["실적"]
+    df = sheets["실적"]
+    assert list(df.columns) == list(expected["실적"].columns)
+    # 차원 컬럼은 범주형으로 만들어지며 값은 동일
+    assert isinstance(df["Division"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df.astype(object), expected["실적"].astype(object))
+    assert progress[-1] == ("실적", len(df), len(df))
+    assert [done for _, done, _ in progress[:-1]] == list(range(16, len(df), 16))
+
+
+def test_schema_columns_only(workbook_data):
+    df = read_workbook(io.BytesIO(workbook_data), columns=SCHEMA_COLUMNS)["실적"]
+
+    assert [normalize_column_name(col) for col in df.columns] == ["Division", "Period/Year", "1.매출액"]
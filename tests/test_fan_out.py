@@ -0,0 +1,64 @@
+"""The multi-dataset path runs one concurrent branch per dataset and merges them in upload order."""
+
+import re
+import threading
+import time
+
+import pandas as pd
+from langchain_core.agents import AgentFinish
+from langchain_core.runnables import RunnableLambda
+
+import agent.tools as tools
+from agent.dataset_registry import dataset_registry
+from agent.graph_flow import AgentExecutorCache, create_graph_workflow
+from agent.parallel_tools import ParallelToolAgentExecutor
+
+DATASETS = {
+    "2023.xlsx - 실적": pd.DataFrame({"Division": ["냉연사업실"] * 3, "1.매출액": [1, 2, 3]}),
+    "2024.xlsx - 실적": pd.DataFrame({"Division": ["열연조강사업실"] * 5, "1.매출액": [1, 2, 3, 4, 5]}),
+}
+
+
+def build_executors():
+    # 두 분기가 모두 실행 중이어야 통과하는 장벽: 분기를 순서대로 실행하면 시간 초과
+    barrier = threading.Barrier(len(DATASETS), timeout=5)
+    synthesis_inputs = []
+
+    def answer(inputs):
+        text = inputs["input"]
+        branch = re.search(r"'(.+)' 데이터셋만 분석합니다", text)
+        if branch:
+            barrier.wait()
+            if branch.group(1).startswith("2023"):
+                time.sleep(0.2)  # 첫 데이터셋 분기가 나중에 끝나도 종합 순서는 업로드 순서
+            return AgentFinish({"output": f"{len(tools.get_dataframe())}행"}, "")
+        synthesis_inputs.append(text)
+        return AgentFinish({"output": "종합 완료"}, "")
+
+    def build(tools_list):
+        return ParallelToolAgentExecutor(agent=RunnableLambda(answer), tools=tools_list)
+
+    return AgentExecutorCache(build), synthesis_inputs
+
+
+def test_branches_run_concurrently_and_fan_in_in_upload_order():
+    executors, synthesis_inputs = build_executors()
+    graph = create_graph_workflow(executors)
+    active = DATASETS["2023.xlsx - 실적"]
+
+    result = graph.invoke({
+        "input": "두 파일의 매출액 비교",
+        "chat_history": [],
+        "dataset_handle": dataset_registry.register_dataframe(active),
+        "datasets_handle": dataset_registry.register_datasets(DATASETS),
+        "dataset_names": list(DATASETS),
+        "dataset_count": len(DATASETS),
+        "is_multi_dataset": True,
+        "active_dataset_name": "2023.xlsx - 실적",
+    })
+
+    assert result["output"] == "종합 완료"
+    assert sorted(item["output"] for item in result["dataset_results"]) == ["3행", "5행"]
+    findings = synthesis_inputs[0].split("[데이터셋별 분석 결과]")[1]
+    assert findings.index("### 2023.xlsx - 실적\n3행") < findings.index("### 2024.xlsx - 실적\n5행")
+    assert "2023.xlsx - 실적: 3행 × 2개 컬럼" in result["source_info"]
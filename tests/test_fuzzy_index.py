@@ -0,0 +1,52 @@
+"""The fuzzy index returns the same matches as scoring every candidate."""
+
+from difflib import SequenceMatcher
+
+import pytest
+
+from agent.fuzzy_index import FuzzyIndex
+from agent.tools import _normalize_korean_text
+
+VALUES = ["열연수출1그룹", "열연수출2그룹", "냉연내수2그룹", "스테인리스사업실", "전기강판사업실",
+          "열연조강사업실", "포스코인터내셔널", "2023년 상반기"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyIndex(VALUES, _normalize_korean_text)
+
+
+@pytest.mark.parametrize("target, expected", [
+    ("냉연 내수 2그룹", ("냉연내수2그룹", 1.0, "exact")),
+    ("포스코인터", ("포스코인터내셔널", 0.9, "partial")),
+    ("스테인레스사업실", ("스테인리스사업실", 0.875, "similarity")),
+    ("없는값", (None, 0.0, "no_match")),
+])
+def test_match_rules(index, target, expected):
+    assert index.match(target) == expected
+
+
+def test_jamo_typo_is_only_a_fallback(index):
+    best, score, match_type = index.match("열연 조강 사업싱", min_similarity=0.95)
+
+    assert (best, match_type) == ("열연조강사업실", "jamo_match") and score >= 0.85
+    # 기존 규칙으로 후보가 있으면 자모 매칭을 사용하지 않음
+    assert index.match("열연 조강 사업싱")[2] == "similarity"
+
+
+def test_candidates_restrict_and_order_ties(index):
+    assert index.match("열연수출", ["열연수출2그룹", "열연수출1그룹"])[0] == "열연수출2그룹"
+    assert index.match("열연수출", ["냉연내수2그룹"]) == (None, 0.0, "no_match")
+
+
+@pytest.mark.parametrize("target", ["열연수출3그룹", "전기강팜사업실", "스테인리스", "냉연", "2023 상반기"])
+@pytest.mark.parametrize("min_ratio", [0.5, 0.7])
+def test_similarity_pruning_matches_full_scan(index, target, min_ratio):
+    normalized = _normalize_korean_text(target)
+    full_scan = {}
+    for i, value in enumerate(index.normalized):
+        ratio = SequenceMatcher(None, normalized, value).ratio()
+        if ratio >= min_ratio:
+            full_scan[i] = ratio
+
+    assert index.similar(normalized, min_ratio) == full_scan
@@ -0,0 +1,46 @@
+"""Integrated analysis merged from per-dataset partials equals analysing the concatenated data."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.tools as tools
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    rng = np.random.default_rng(12)
+
+    def sheet(divisions, rows, with_metric=True):
+        df = pd.DataFrame({"Division": pd.Series(rng.choice(divisions, rows), dtype="category")})
+        if with_metric:
+            df["매출수량(M/T)"] = rng.integers(0, 1000, rows)
+        return df
+
+    # 데이터셋마다 범주 구성이 다르고, 지표가 없는 데이터셋도 포함
+    return {
+        "2023.xlsx - 실적": sheet(["스테인리스사업실", "냉연사업실"], 300),
+        "2024.xlsx - 실적": sheet(["냉연사업실", "열연조강사업실"], 500),
+        "계획.xlsx - 목표": sheet(["전기강판사업실"], 50, with_metric=False),
+    }
+
+
+def test_merged_partials_equal_concatenated_groupby(datasets):
+    partials = [tools._integrated_partial(df, "매출수량(M/T)", "Division") for df in datasets.values()]
+    merged = tools._merge_integrated_partials(partials, "Division").set_index("Division")
+
+    combined = pd.concat([df.astype({"Division": object}) for df in datasets.values()], ignore_index=True)
+    expected = combined.groupby("Division")["매출수량(M/T)"].agg(["sum", "mean", "count"])
+
+    pd.testing.assert_frame_equal(merged.astype(float), expected.astype(float), check_names=False)
+
+
+def test_integrated_dataset_analysis_ranks_groups_and_contributions(datasets):
+    with tools.dataset_context(datasets=datasets):
+        report = tools.integrated_dataset_analysis.run({"metric": "매출수량(M/T)", "group_by": "Division"})
+
+    combined = pd.concat([df.astype({"Division": object}) for df in datasets.values()], ignore_index=True)
+    top = combined.groupby("Division")["매출수량(M/T)"].sum().sort_values(ascending=False)
+    assert f"1. {top.index[0]}: {top.iloc[0]:,.0f}톤" in report
+    assert f"총 행 수: {len(combined):,}개" in report
+    assert "계획.xlsx - 목표: 0톤 (0.0%)" in report
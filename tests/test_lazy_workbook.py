@@ -0,0 +1,121 @@
+"""Lazy workbooks parse a sheet only when a caller actually needs it."""
+
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import agent.lazy_workbook as lazy_workbook
+from agent.dataset_pool import map_datasets
+from agent.lazy_workbook import LazyDatasets, LazyWorkbook, ParsedSheetCache
+from agent.sheet_cache import SheetCache
+
+SHEETS = ["1월", "2월", "3월"]
+
+
+def workbook_bytes():
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for month, sheet_name in enumerate(SHEETS, 1):
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(["Division", "1.매출액"])
+        for i in range(50):
+            worksheet.append(["스테인리스사업실" if i % 2 else "냉연사업실", month * 1000 + i])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def caches(monkeypatch, tmp_path):
+    # 테스트마다 빈 파싱 시트 캐시와 임시 디렉터리의 디스크 캐시 사용
+    parsed = ParsedSheetCache()
+    disk = SheetCache(directory=str(tmp_path))
+    monkeypatch.setattr(lazy_workbook, "parsed_sheets", parsed)
+    monkeypatch.setattr(lazy_workbook, "sheet_cache", disk)
+    return parsed, disk
+
+
+def lazy_datasets(workbook):
+    datasets = LazyDatasets()
+    for sheet_name in workbook:
+        datasets.add(f"{workbook.name} - {sheet_name}", workbook, sheet_name)
+    return datasets
+
+
+def test_metadata_without_parsing(caches):
+    workbook = LazyWorkbook(workbook_bytes(), "sales.xlsx")
+
+    assert list(workbook) == SHEETS
+    assert workbook.info("2월")["header_preview"] == ["Division", "1.매출액"]
+    assert not any(workbook.is_loaded(name) for name in SHEETS)
+
+
+def test_load_parses_only_requested_sheet(caches):
+    workbook = LazyWorkbook(workbook_bytes(), "sales.xlsx")
+
+    df = workbook["2월"]
+
+    assert len(df) == 50 and df["1.매출액"].min() == 2000
+    assert workbook.sources == {"2월": "excel"}
+    assert [workbook.is_loaded(name) for name in SHEETS] == [False, True, False]
+
+
+def test_map_datasets_prefetches_every_sheet_it_visits(caches):
+    workbook = LazyWorkbook(workbook_bytes(), "sales.xlsx")
+    datasets = lazy_datasets(workbook)
+
+    totals = map_datasets(datasets, lambda df: int(df["1.매출액"].sum()))
+
+    assert [total for _, total, _ in totals] == [sum(m * 1000 + i for i in range(50)) for m in (1, 2, 3)]
+    assert all(workbook.is_loaded(name) for name in SHEETS)
+
+
+def test_prefetch_skips_loaded_and_disk_cached_sheets(caches, monkeypatch):
+    parsed, _ = caches
+    data = workbook_bytes()
+    LazyWorkbook(data, "sales.xlsx")["1월"]  # 디스크 캐시에 저장
+
+    # 새 세션: 메모리 캐시는 비어 있고 디스크 캐시만 남아 있음
+    fresh = ParsedSheetCache()
+    monkeypatch.setattr(lazy_workbook, "parsed_sheets", fresh)
+    workbook = LazyWorkbook(data, "sales.xlsx")
+    workbook["2월"]
+    parsed_tasks = []
+    original_parse_task = workbook.parse_task
+    monkeypatch.setattr(workbook, "parse_task",
+                        lambda name: parsed_tasks.append(name) or original_parse_task(name))
+
+    assert lazy_datasets(workbook).prefetch() == {}
+
+    # 메모리에 있는 시트(2월)와 디스크 캐시 시트(1월)는 파싱하지도, 메모리로 불러오지도 않음
+    assert parsed_tasks == ["3월"]
+    assert not workbook.is_loaded("1월")
+    assert workbook["1월"].equals(parsed.get((workbook.key, "1월")))
+    assert workbook.sources["1월"] == "disk"
+
+
+def test_parsed_sheet_cache_evicts_least_recently_used():
+    cache = ParsedSheetCache(max_entries=2)
+    frames = {key: pd.DataFrame({"x": [i]}) for i, key in enumerate("abc")}
+    cache.put("a", frames["a"])
+    cache.put("b", frames["b"])
+    cache.get("a")
+    cache.put("c", frames["c"])
+
+    assert "b" not in cache
+    assert cache.get("a") is frames["a"] and cache.get("c") is frames["c"]
+
+
+def test_same_upload_reuses_parsed_sheet(caches):
+    data = workbook_bytes()
+    prepared = []
+    first = LazyWorkbook(data, "sales.xlsx", prepare=prepared.append)
+    df = first["1월"]
+
+    # 같은 파일을 다시 올려도 (새 LazyWorkbook) 파싱 결과를 그대로 사용하고 prepare도 다시 호출하지 않음
+    second = LazyWorkbook(data, "sales (1).xlsx", prepare=prepared.append)
+    assert second["1월"] is df
+    assert second.sources == {"1월": "memory"}
+    assert prepared == [df]
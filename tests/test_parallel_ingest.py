@@ -0,0 +1,50 @@
+"""Sheets parsed in worker processes match in-process parsing, and failures stay per task."""
+
+import io
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import agent.parallel_ingest as parallel_ingest
+from agent.parallel_ingest import parse_csv_task, parse_sheet_task, run_tasks
+
+
+def workbook_bytes():
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, scale in (("국내", 1), ("수출", 10)):
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(["Division", "Country", "1.매출액"])
+        for i in range(200):
+            worksheet.append(["냉연사업실" if i % 2 else "스테인리스사업실", "한국", i * scale])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(params=[1, 2], ids=["in-process", "process-pool"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(parallel_ingest, "INGEST_MAX_WORKERS", request.param)
+    yield request.param
+    parallel_ingest.shutdown()
+
+
+def test_run_tasks_parses_every_sheet_and_isolates_errors(workers):
+    data = workbook_bytes()
+    csv = "Division,1.매출액\n냉연사업실,5\n스테인리스사업실,7\n".encode("utf-8")
+
+    results = run_tasks({
+        "국내": (parse_sheet_task, (data, "국내")),
+        "수출": (parse_sheet_task, (data, "수출")),
+        "없음": (parse_sheet_task, (data, "없는시트")),
+        "csv": (parse_csv_task, (csv,)),
+    })
+
+    domestic, error = results["국내"]
+    assert error is None and int(results["수출"][0]["1.매출액"].sum()) == 10 * int(domestic["1.매출액"].sum())
+    # 작업자에서 만든 범주형 컬럼도 그대로 전달됨
+    assert isinstance(domestic["Division"].dtype, pd.CategoricalDtype)
+    assert results["csv"][0]["1.매출액"].tolist() == [5, 7]
+    frame, error = results["없음"]
+    assert frame is None and isinstance(error, KeyError)
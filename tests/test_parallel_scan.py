@@ -0,0 +1,109 @@
+"""The shared-memory partitioned scan selects, counts and sums exactly what the bitmap index gives."""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.parallel_scan as parallel_scan
+from agent.bitmap_index import get_dataset_index
+from agent.parallel_scan import SharedArray, _partitions, _scan_partition, get_scan_index, use_parallel_scan
+
+ROWS = 10_005  # 작업자 수로 나누어떨어지지 않는 행 수
+
+
+@pytest.fixture
+def scan_workers(monkeypatch):
+    monkeypatch.setattr(parallel_scan, "SCAN_PARALLEL_ROWS", 1000)
+    monkeypatch.setattr(parallel_scan, "SCAN_MAX_WORKERS", 3)
+    parallel_scan.shutdown()
+    yield
+    parallel_scan.shutdown()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(13)
+    sales = rng.normal(1000, 500, ROWS)
+    sales[::97] = np.nan
+    customers = np.array([f"고객{i:03d}(주)" for i in range(300)], dtype=object)[rng.integers(0, 300, ROWS)]
+    customers[::101] = None
+    return pd.DataFrame({
+        "1.매출액": sales,
+        "매출수량(M/T)": rng.integers(0, 10**6, ROWS, dtype=np.int64),
+        "Division": pd.Categorical(rng.choice(["냉연사업실", "열연사업실", "스테인리스사업실"], ROWS)),
+        "Country": rng.choice(["한국", "중국", "일본"], ROWS),
+        "Period/Year": rng.choice(["2023.001 January 2023", "2024.007 July 2024", "2024년 상반기", None], ROWS),
+        "Customer": customers,
+    })
+
+
+@pytest.mark.parametrize("workers", [1, 3, 8])
+def test_partitions_cover_rows(workers):
+    partitions = _partitions(ROWS, workers)
+
+    assert len(partitions) == workers
+    assert partitions[0][0] == 0 and partitions[-1][1] == ROWS
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(partitions, partitions[1:]))
+
+
+def test_scan_matches_bitmap_index(scan_workers, frame):
+    bitmap, scan = get_dataset_index(frame), get_scan_index(frame)
+
+    def select(index):
+        bits = index.all_rows()
+        bits &= index.contains("Division", "연", case=False, regex=False)
+        bits &= index.equals("year", 2024)
+        # 정규식 특수문자가 들어간 고객사 값도 문자 그대로 코드 단위로 매칭
+        bits &= index.series_contains(frame["Customer"], "(주)", regex=False)
+        return bits
+
+    expected, bits = select(bitmap), select(scan)
+
+    assert scan.count(bits) == bitmap.count(expected)
+    assert scan.total(frame["매출수량(M/T)"], bits) == bitmap.total(frame["매출수량(M/T)"], expected)
+    assert scan.total(frame["1.매출액"], bits) == pytest.approx(bitmap.total(frame["1.매출액"], expected))
+    assert (scan.selected_values(frame["Country"], bits)
+            == bitmap.selected_values(frame["Country"], expected))
+    assert (scan.selected_values(frame["Period/Year"], bits, as_text=True)
+            == bitmap.selected_values(frame["Period/Year"], expected, as_text=True))
+    # 행 마스크는 부모에서 만들지 않고 차원 코드만 공유 메모리에 올림
+    assert set(scan.codes) == {"Division", "Country", "Period/Year", "Customer"}
+
+
+def test_empty_conditions_skip_the_workers(scan_workers, frame):
+    scan = get_scan_index(frame)
+    bits = scan.contains("Country", "베트남") & scan.all_rows()
+
+    assert bits.empty
+    assert scan.count(bits) == 0 and scan.selected_values(frame["Country"], bits) == []
+    assert scan.count(scan.all_rows()) == ROWS
+
+
+def test_partition_scan_closes_its_mappings(monkeypatch):
+    codes = SharedArray(np.array([0, 1, -1, 1], dtype=np.int8))
+    values = SharedArray(np.array([1.0, 2.0, 4.0, np.nan]))
+    opened = []
+    original = shared_memory.SharedMemory
+
+    class Tracking(original):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", Tracking)
+    count, total, present = _scan_partition([(codes.spec, np.array([False, True]))], 0, 4,
+                                            values.spec, codes.spec)
+    codes.release()
+    values.release()
+
+    assert (count, total, present.tolist()) == (2, 2.0, [1])
+    # 작업자는 구간 계산이 끝나면 블록 매핑을 닫음
+    assert opened and all(block._buf is None for block in opened)
+
+
+def test_small_or_text_columns_are_left_to_the_caller(scan_workers, frame):
+    assert not use_parallel_scan(frame, "Division")
+    assert not use_parallel_scan(frame.head(100), "1.매출액")
+    assert use_parallel_scan(frame, "1.매출액")
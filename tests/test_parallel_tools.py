@@ -0,0 +1,81 @@
+"""Tool calls from one model turn run concurrently and come back in call order."""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+from langchain.agents import create_openai_tools_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+
+import agent.parallel_tools as parallel_tools
+import agent.tools as tools
+from agent.parallel_tools import ParallelToolAgentExecutor
+
+
+class ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@pytest.fixture
+def tool_workers(monkeypatch):
+    monkeypatch.setattr(parallel_tools, "TOOL_MAX_WORKERS", 2)
+    parallel_tools.shutdown()
+    yield
+    parallel_tools.shutdown()
+
+
+def run_two_calls(lookup):
+    calls = [{"name": "lookup", "args": {"key": key}, "id": f"call_{key}"} for key in ("first", "second")]
+    model = ToolCallingFakeModel(messages=iter([AIMessage(content="", tool_calls=calls),
+                                                AIMessage(content="done")]),
+                                 disable_streaming=True)
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "test"), ("human", "{input}"), MessagesPlaceholder("agent_scratchpad")])
+    executor = ParallelToolAgentExecutor(agent=create_openai_tools_agent(model, [lookup], prompt),
+                                         tools=[lookup], return_intermediate_steps=True)
+    with tools.dataset_context(df=pd.DataFrame({"x": range(5)})):
+        return executor.invoke({"input": "q"})
+
+
+def test_two_tool_calls_run_concurrently_in_call_order(tool_workers):
+    # 두 호출이 모두 시작되어야 통과하는 장벽: 순서대로 실행하면 시간 초과로 실패
+    barrier = threading.Barrier(2, timeout=5)
+
+    @tool
+    def lookup(key: str) -> str:
+        """Look up a key."""
+        barrier.wait()
+        if key == "first":
+            time.sleep(0.2)  # 첫 호출이 나중에 끝나도 결과는 호출 순서대로
+        return f"{key}:{len(tools.get_dataframe())}:{threading.current_thread().name}"
+
+    result = run_two_calls(lookup)
+
+    observations = [observation for _, observation in result["intermediate_steps"]]
+    assert [action.tool_input["key"] for action, _ in result["intermediate_steps"]] == ["first", "second"]
+    # 작업자 스레드에서도 호출 측 데이터셋 컨텍스트를 사용
+    assert [obs.split(":")[:2] for obs in observations] == [["first", "5"], ["second", "5"]]
+    assert all(obs.split(":")[2].startswith("tool") for obs in observations)
+    assert result["output"] == "done"
+
+
+def test_single_worker_runs_calls_in_order(monkeypatch):
+    monkeypatch.setattr(parallel_tools, "TOOL_MAX_WORKERS", 1)
+    started = []
+
+    @tool
+    def lookup(key: str) -> str:
+        """Look up a key."""
+        started.append(key)
+        return f"{key}:{threading.current_thread().name}"
+
+    result = run_two_calls(lookup)
+
+    assert started == ["first", "second"]
+    assert [observation for _, observation in result["intermediate_steps"]] == [
+        f"{key}:{threading.current_thread().name}" for key in ("first", "second")]
@@ -0,0 +1,38 @@
+"""Period/Year parsing builds one calendar per frame and filters by period phrases."""
+
+import pandas as pd
+
+from agent.period_parser import get_calendar, parse_period_values, period_mask, year_mask
+
+PERIODS = ["2023.001 January 2023", "2023년 8월", "2024년 상반기", "FY2022", None, "2023년 11월"]
+
+
+def test_parse_period_formats():
+    calendar = parse_period_values(pd.Series(PERIODS, dtype=object))
+
+    assert calendar["year"].tolist() == [2023, 2023, 2024, 2022, pd.NA, 2023]
+    assert calendar["month_number"].tolist() == [1, 8, pd.NA, pd.NA, pd.NA, 11]
+    assert calendar["quarter"].tolist() == [1, 3, pd.NA, pd.NA, pd.NA, 4]
+    assert calendar["half_year"].tolist() == [1, 2, 1, pd.NA, pd.NA, 2]
+    assert calendar["yyyymm"].tolist() == [202301, 202308, pd.NA, pd.NA, pd.NA, 202311]
+
+
+def test_calendar_is_aligned_with_rows_and_built_once():
+    df = pd.DataFrame({"Period/Year": PERIODS * 2}, index=range(100, 112))
+
+    calendar = get_calendar(df)
+
+    assert len(calendar) == len(df)
+    assert calendar["year"].tolist() == [2023, 2023, 2024, 2022, pd.NA, 2023] * 2
+    assert get_calendar(df) is calendar
+
+
+def test_period_and_year_masks():
+    calendar = get_calendar(pd.DataFrame({"Period/Year": PERIODS}))
+
+    assert year_mask(calendar, "2023").tolist() == [True, True, False, False, False, True]
+    assert year_mask(calendar, "작년").tolist() == [False] * 6
+    assert period_mask(calendar, "하반기", "2023").tolist() == [False, True, False, False, False, True]
+    assert period_mask(calendar, "4분기").tolist() == [False, False, False, False, False, True]
+    assert period_mask(calendar, "1월부터 8월", 2023).tolist() == [True, True, False, False, False, False]
+    assert period_mask(calendar, "상반기").tolist() == [True, False, True, False, False, False]
@@ -0,0 +1,85 @@
+"""The LLM-free quick answer path must only answer questions a single total can answer."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.tools as tools
+from agent.dataset_registry import dataset_registry
+from agent.graph_flow import detect_metrics, quick_answer_node, query_planning_node
+from agent.plan_executor import execute_plan
+
+ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실", "열연조강사업실"], ROWS),
+        "Country": rng.choice(["한국", "중국", "일본"], ROWS),
+        "Period/Year": rng.choice(["2023년 1월", "2023년 7월", "2024년 2월"], ROWS),
+        "매출수량(M/T)": rng.integers(1, 100, ROWS),
+        "1.매출액": rng.integers(10**7, 10**8, ROWS),
+        "5.영업이익": rng.integers(10**7, 10**8, ROWS),
+        "8.세전이익": rng.integers(10**6, 10**7, ROWS),
+    })
+
+
+def plan_and_answer(df, question):
+    state = {"input": question, "dataset_handle": dataset_registry.register_dataframe(df),
+             "active_dataset_name": "test.xlsx", "chat_history": []}
+    state.update(query_planning_node(state))
+    return state, quick_answer_node(state)
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("2023년 전체 세전이익 합계", ["8.세전이익"]),
+    ("영업이익 합계", ["5.영업이익"]),
+    ("총 이익", ["5.영업이익"]),
+    ("매출수량 합계", ["매출수량(M/T)"]),
+    ("매출 합계", ["1.매출액"]),
+])
+def test_detect_metrics_prefers_most_specific_keyword(question, expected):
+    assert detect_metrics(question) == expected
+
+
+def test_pretax_profit_total_uses_pretax_metric(frame):
+    _, result = plan_and_answer(frame, "2023년 전체 세전이익 합계")
+
+    in_2023 = frame["Period/Year"].str.startswith("2023")
+    expected = tools._format_metric_value("8.세전이익", frame.loc[in_2023, "8.세전이익"].sum())
+    assert result["processing_path"] == "quick_answer_node"
+    assert "8.세전이익 합계" in result["output"]
+    assert f"**{expected}**" in result["output"]
+
+
+def test_filtered_total_is_answered_quickly(frame):
+    _, result = plan_and_answer(frame, "스테인리스 매출액 합계")
+
+    expected = tools._format_metric_value(
+        "1.매출액", frame.loc[frame["Division"] == "스테인리스사업실", "1.매출액"].sum())
+    assert result["processing_path"] == "quick_answer_node"
+    assert f"**{expected}**" in result["output"]
+
+
+@pytest.mark.parametrize("question", [
+    "사업실별 전체 매출액 합계",
+    "국가별 총 영업이익",
+    "영업이익 상위 3개 국가",
+    "매출액 순위",
+])
+def test_breakdown_questions_go_to_agent(frame, question):
+    state, result = plan_and_answer(frame, question)
+
+    assert result == {"processing_path": "agent_node"}
+    # 실행 계획 단계도 총합 하나를 미리 계산해 에이전트에 넘기지 않음
+    assert execute_plan(state["query_plan"], question, frame) is None
+
+
+def test_scalar_plan_is_pre_executed(frame):
+    state, _ = plan_and_answer(frame, "스테인리스 매출액 합계")
+
+    plan_execution = execute_plan(state["query_plan"], "스테인리스 매출액 합계", frame)
+    assert plan_execution["tool"] == "smart_query_processor"
+    assert "1.매출액" in plan_execution["observation"]
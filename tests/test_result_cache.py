@@ -0,0 +1,58 @@
+"""Result cache keys by data content, so datasets never see each other's results."""
+
+import pandas as pd
+
+import agent.result_cache as result_cache_module
+from agent.result_cache import ResultCache, cached_call, dataframe_fingerprint, normalize_params
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl_seconds=10)
+    cache.put("a", 1)
+
+    now[0] += 10
+    assert cache.get("a") == 1
+    now[0] += 0.5
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_fingerprint_follows_content_not_identity():
+    df = pd.DataFrame({"Division": ["냉연", "열연"], "1.매출액": [1, 2]})
+
+    assert dataframe_fingerprint(df) == dataframe_fingerprint(df.copy())
+    assert dataframe_fingerprint(df) != dataframe_fingerprint(df.assign(**{"1.매출액": [1, 3]}))
+
+
+def test_normalize_params_ignores_empty_values_and_whitespace():
+    assert normalize_params({"division": " 냉연 ", "country": None, "period": ""}) == \
+        normalize_params({"division": "냉연"})
+
+
+def test_cached_call_keeps_results_of_other_datasets(monkeypatch):
+    monkeypatch.setattr(result_cache_module, "result_cache", ResultCache())
+    first = pd.DataFrame({"1.매출액": [1, 2]})
+    second = pd.DataFrame({"1.매출액": [10, 20]})
+    calls = []
+
+    def total(df):
+        return lambda: calls.append(df) or int(df["1.매출액"].sum())
+
+    # 시트를 바꿔 가며 질문해도 결과가 섞이지 않고, 이전 시트 결과는 다시 계산하지 않음
+    assert cached_call(first, "total", {}, total(first)) == 3
+    assert cached_call(second, "total", {}, total(second)) == 30
+    assert cached_call(first.copy(), "total", {}, total(first)) == 3
+    assert len(calls) == 2
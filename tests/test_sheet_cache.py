@@ -0,0 +1,61 @@
+"""The on-disk sheet cache round-trips normalized sheets and evicts least recently used entries."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from agent.sheet_cache import SheetCache, _MANIFEST, content_key
+
+
+def sheet(rows=100):
+    df = pd.DataFrame({
+        "Division": pd.Series(["스테인리스사업실", "냉연사업실"] * (rows // 2), dtype="category"),
+        "1.매출액": pd.Series(range(rows), dtype="int32"),
+    })
+    df.attrs["compaction"] = {"before": 1000, "after": 400}
+    return df
+
+
+def test_round_trip_keeps_dtypes_and_attrs(tmp_path):
+    cache = SheetCache(directory=str(tmp_path))
+    key = content_key(b"workbook")
+
+    assert key not in cache and cache.load(key) is None
+    assert cache.store(key, {"1월": sheet()}, "sales.xlsx")
+
+    loaded = cache.load(key)["1월"]
+    assert key in cache
+    pd.testing.assert_frame_equal(loaded, sheet())
+    assert loaded.attrs == sheet().attrs
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_unsupported_sheet_is_not_stored(tmp_path):
+    cache = SheetCache(directory=str(tmp_path))
+
+    assert not cache.store("key", {"1월": pd.DataFrame({1: [1, 2]})})
+    assert "key" not in cache
+    # 실패한 저장의 임시 디렉터리도 남기지 않음
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SheetCache(directory=str(tmp_path))
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.store(key, {"s": sheet(2000)})
+        os.utime(os.path.join(tmp_path, key, _MANIFEST), (1000 + i, 1000 + i))
+    cache.load("old")  # 사용 시각 갱신
+
+    # 상한을 1바이트만 넘게 만들어 가장 오래 사용되지 않은 항목 하나만 제거되는지 확인
+    cache.max_bytes = cache.stats()["bytes"] - 1
+    cache.evict()
+
+    assert "used" not in cache
+    assert "old" in cache and "new" in cache
+
+
+@pytest.mark.parametrize("data", [b"a", b"b" * 1000])
+def test_content_key_is_stable(data):
+    assert content_key(data) == content_key(bytes(data))
+    assert content_key(data) != content_key(data + b"x")
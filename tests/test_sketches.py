@@ -0,0 +1,36 @@
+"""HyperLogLog and KLL sketches must stay within their advertised error bounds."""
+
+import numpy as np
+
+from agent.sketches import HyperLogLog, KLLSketch
+
+
+def test_hyperloglog_estimate_within_error_bound():
+    values = np.arange(200_000)
+    sketch = HyperLogLog()
+    sketch.update(values)
+
+    assert abs(sketch.estimate() - len(values)) / len(values) < 3 * sketch.relative_error
+
+
+def test_hyperloglog_merge_matches_single_pass():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(np.arange(0, 60_000))
+    right.update(np.arange(40_000, 100_000))
+    whole = HyperLogLog()
+    whole.update(np.arange(0, 100_000))
+
+    left.merge(right)
+    # 겹치는 값은 한 번만 세어 전체를 한 번에 본 것과 같은 추정값
+    assert left.estimate() == whole.estimate()
+
+
+def test_kll_quantile_within_rank_error():
+    values = np.random.default_rng(5).permutation(500_000).astype(float)
+    sketch = KLLSketch()
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+
+    for q in (0.1, 0.5, 0.9):
+        rank = (values < sketch.quantile(q)).mean()
+        assert abs(rank - q) < 3 * sketch.rank_error
@@ -0,0 +1,84 @@
+"""run_agent streams tool progress through the graph's custom stream and returns the final answer."""
+
+from typing import TypedDict
+
+import pandas as pd
+import pytest
+from langchain.agents import create_openai_tools_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+from langgraph.graph import END, StateGraph
+
+import agent.parallel_tools as parallel_tools
+import agent.tools as tools
+from agent.graph_flow import run_agent
+from agent.parallel_tools import ParallelToolAgentExecutor
+
+
+class ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def row_count(column: str) -> str:
+    """Count rows of the active dataset."""
+    return f"{column}: {len(tools.get_dataframe())}행"
+
+
+def executor():
+    calls = [{"name": "row_count", "args": {"column": column}, "id": f"call_{column}"}
+             for column in ("Division", "Country")]
+    model = ToolCallingFakeModel(messages=iter([AIMessage(content="", tool_calls=calls),
+                                                AIMessage(content="총 3행입니다.")]),
+                                 disable_streaming=True)
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "test"), ("human", "{input}"), MessagesPlaceholder("agent_scratchpad")])
+    return ParallelToolAgentExecutor(agent=create_openai_tools_agent(model, [row_count], prompt),
+                                     tools=[row_count])
+
+
+class State(TypedDict):
+    input: str
+    output: str
+
+
+def agent_node(state: State) -> dict:
+    with tools.dataset_context(df=pd.DataFrame({"x": range(3)})):
+        result = run_agent(executor(), {"input": state["input"]}, dataset_name="2024.xlsx")
+    return {"output": result["output"]}
+
+
+@pytest.fixture(autouse=True)
+def sequential_tools(monkeypatch):
+    monkeypatch.setattr(parallel_tools, "TOOL_MAX_WORKERS", 1)
+
+
+def test_tool_progress_is_streamed_in_call_order():
+    workflow = StateGraph(State)
+    workflow.add_node("agent", agent_node)
+    workflow.set_entry_point("agent")
+    workflow.add_edge("agent", END)
+    graph = workflow.compile()
+
+    events, updates = [], []
+    for mode, chunk in graph.stream({"input": "행 수"}, stream_mode=["custom", "updates"]):
+        (events if mode == "custom" else updates).append(chunk)
+
+    assert [(event["type"], event["tool"]) for event in events] == [
+        ("tool_start", "row_count"), ("tool_start", "row_count"),
+        ("tool_end", "row_count"), ("tool_end", "row_count")]
+    assert [event["observation"] for event in events[2:]] == ["Division: 3행", "Country: 3행"]
+    assert all(event["dataset"] == "2024.xlsx" for event in events)
+    assert updates == [{"agent": {"output": "총 3행입니다."}}]
+
+
+def test_run_agent_outside_a_graph_returns_steps():
+    with tools.dataset_context(df=pd.DataFrame({"x": range(3)})):
+        result = run_agent(executor(), {"input": "행 수"})
+
+    assert result["output"] == "총 3행입니다."
+    assert [(action.tool_input["column"], observation) for action, observation in result["intermediate_steps"]] == [
+        ("Division", "Division: 3행"), ("Country", "Country: 3행")]
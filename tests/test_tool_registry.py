@@ -0,0 +1,103 @@
+"""Registered tools must accept the arguments the agent sends, and per-request tool
+selection must keep the tools a question needs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent.dataset_profile as dataset_profile
+import agent.tools as tools
+from agent.tool_registry import (TOOL_GROUPS, TOOL_SELECTION_MIN_CONFIDENCE, registered_tools,
+                                 select_tools, tool_schema_tokens)
+
+ROWS = 5000
+
+
+@pytest.fixture
+def frame(monkeypatch):
+    # 작은 데이터로도 근사 프로파일을 사용하도록 기준 행 수를 낮춤
+    monkeypatch.setattr(dataset_profile, "PROFILE_APPROX_ROWS", 1000)
+    monkeypatch.setattr(tools, "PROFILE_APPROX_ROWS", 1000)
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "Division": rng.choice(["스테인리스사업실", "냉연사업실"], ROWS),
+        "1.매출액": rng.integers(0, 10**6, ROWS),
+    })
+
+
+def registered(name):
+    return next(t for t in registered_tools if t.name == name)
+
+
+def test_exploration_tools_expose_exact_argument():
+    assert set(registered("explore_dataset").args) == {"exact"}
+    assert set(registered("get_column_info").args) == {"column_name", "exact"}
+
+
+def test_explore_dataset_runs_with_and_without_exact(frame):
+    tool = registered("explore_dataset")
+    with tools.dataset_context(df=frame):
+        default = tool.run({})
+        exact = tool.run({"exact": True})
+
+    assert "근사 모드" in default
+    assert "근사 모드" not in exact
+    assert "1.매출액" in exact
+
+
+def test_get_column_info_accepts_plain_column_name_and_exact(frame):
+    tool = registered("get_column_info")
+    with tools.dataset_context(df=frame):
+        approximate = tool.run("1.매출액")
+        exact = tool.run({"column_name": "1.매출액", "exact": True})
+
+    assert "KLL 추정" in approximate
+    assert "KLL 추정" not in exact
+    assert f"• 중앙값: {frame['1.매출액'].median():,.0f}" in exact
+
+
+def tool_names(tools_list):
+    return {tool.name for tool in tools_list}
+
+
+SINGLE_DATASET_TOOLS = {name for group, names in TOOL_GROUPS.items() if group != "multi_dataset" for name in names}
+
+
+@pytest.mark.parametrize("intent, predicted_tools, needed", [
+    ("aggregation", ["calculate_sum", "calculate_total", "group_statistics"],
+     {"smart_query_processor", "get_total_sales_volume_by_year", "comparative_analysis_tool"}),
+    ("ranking", ["sort_by_column", "get_top_n", "calculate_rank"],
+     {"smart_query_processor", "comparative_analysis_tool", "get_unique_values"}),
+    ("trend", ["time_series_analysis", "calculate_growth"],
+     {"get_total_sales_volume_by_year", "comparative_analysis_tool"}),
+    ("comparison", ["compare_groups", "calculate_percentage", "filter_data"],
+     {"comparative_analysis_tool", "get_unique_values"}),
+])
+def test_selection_keeps_needed_tools_and_shrinks_schema(intent, predicted_tools, needed):
+    selected = select_tools(predicted_tools, dataset_count=1, confidence=0.5)
+
+    assert needed <= tool_names(selected)
+    assert not tool_names(selected) & set(TOOL_GROUPS["multi_dataset"])
+    assert tool_schema_tokens(selected)[0] < tool_schema_tokens(registered_tools)[0]
+
+
+def test_low_confidence_exposes_every_single_dataset_tool():
+    low = TOOL_SELECTION_MIN_CONFIDENCE / 2
+
+    assert tool_names(select_tools(["compare_groups"], dataset_count=1, confidence=low)) == SINGLE_DATASET_TOOLS
+    assert tool_names(select_tools(["general_analysis"], dataset_count=1)) == SINGLE_DATASET_TOOLS
+
+
+def test_multi_dataset_tools_only_with_several_datasets():
+    predicted = ["compare_datasets_summary", "compare_datasets_metrics"]
+
+    assert set(TOOL_GROUPS["multi_dataset"]) <= tool_names(select_tools(predicted, dataset_count=3, confidence=0.5))
+    assert not tool_names(select_tools(predicted, dataset_count=1, confidence=0.5)) & set(TOOL_GROUPS["multi_dataset"])
+
+
+def test_required_tools_are_always_included_in_registry_order():
+    selected = select_tools(["compare_groups"], dataset_count=1, required=["explore_dataset"], confidence=0.5)
+
+    assert "explore_dataset" in tool_names(selected)
+    order = [tool.name for tool in registered_tools]
+    assert [tool.name for tool in selected] == sorted(tool_names(selected), key=order.index)